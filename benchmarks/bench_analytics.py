@@ -0,0 +1,70 @@
+"""Benchmark graph analytics on a synthetic citation graph, compared to
+PageRank computed with pure-Python loops over an edge mapping as in
+S2Graph.edges.
+
+Papers cite earlier papers, chosen preferentially among highly cited ones.
+
+Usage: python benchmarks/bench_analytics.py [n_papers] [n_refs]
+"""
+import sys
+import time
+
+import numpy as np
+
+from s2.graph.analytics import (CitationGraph, in_degree, pagerank, hits,
+                                k_core, cocitation, coupling)
+
+
+def synthetic(n_papers: int, n_refs: int, seed: int = 0) -> CitationGraph:
+    rng = np.random.default_rng(seed)
+    src = np.repeat(np.arange(1, n_papers), n_refs)
+    # skewed towards small (older) paper indices, always earlier than src
+    dst = (src * rng.random(len(src)) ** 3).astype(np.int64)
+    nodes = [f"{i:040x}" for i in range(n_papers)]
+    return CitationGraph(nodes, src, dst)
+
+
+def pagerank_python(cites, nodes, damping=0.85, n_iter=1):
+    n = len(nodes)
+    r = dict.fromkeys(nodes, 1 / n)
+    for _ in range(n_iter):
+        dangling = sum(r[u] for u in nodes if not cites.get(u))
+        r_new = dict.fromkeys(nodes, (damping * dangling + 1 - damping) / n)
+        for u, vs in cites.items():
+            for v in vs:
+                r_new[v] += damping * r[u] / len(vs)
+        r = r_new
+    return r
+
+
+def timed(name, f):
+    t = time.perf_counter()
+    result = f()
+    print(f"{name:30s} {time.perf_counter() - t:8.3f}s")
+    return result
+
+
+def main(n_papers: int = 100000, n_refs: int = 10):
+    cg = timed("build CitationGraph", lambda: synthetic(n_papers, n_refs))
+    print(f"{cg.num_nodes} papers, {cg.num_edges} citations")
+    timed("in_degree", lambda: in_degree(cg))
+    r = timed("pagerank", lambda: pagerank(cg))
+    print(f"{'':30s} max rank {r.max():.2e}")
+    timed("hits", lambda: hits(cg))
+    core = timed("k_core", lambda: k_core(cg))
+    print(f"{'':30s} max core {core.max()}")
+    sample = cg.nodes[:1000:10]
+    timed("cocitation (100 papers)", lambda: cocitation(cg, papers=sample))
+    timed("coupling (100 papers)", lambda: coupling(cg, papers=sample))
+
+    cites = {}
+    for i in range(cg.num_nodes):
+        refs = cg.out_indices[cg.out_indptr[i]:cg.out_indptr[i + 1]]
+        if len(refs):
+            cites[cg.nodes[i]] = [cg.nodes[j] for j in refs.tolist()]
+    timed("pagerank, python (1 iteration)",
+          lambda: pagerank_python(cites, cg.nodes))
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
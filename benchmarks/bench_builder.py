@@ -0,0 +1,42 @@
+"""Benchmark S2GraphBuilder with papers fetched sequentially or in parallel,
+from a simulated API with a fixed latency per request.
+
+The graph fixture (58 papers) is built from an empty datastore, so that
+every paper is fetched.
+
+Usage: python benchmarks/bench_builder.py [latency_ms]
+"""
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from unittest import mock
+
+from s2.graph import S2Graph, S2GraphBuilder, MaxHopHopper
+from s2.store import JsonDS
+
+FIXTURES = Path(__file__).parent.parent / "tests/fixtures/graph/paper_ds"
+ROOT = '8d8844106e7bc83d49ea3544ab2dfc74cd8f258a'
+
+
+def main(latency_ms: float = 50):
+    papers = dict(JsonDS.load_papers(FIXTURES).items())
+
+    def get_s2paper(pid, **kwargs):
+        time.sleep(latency_ms / 1000)
+        return papers[pid].copy()
+
+    for workers in (1, 2, 4, 8, 16):
+        builder = S2GraphBuilder(graph=S2Graph(), hopper=MaxHopHopper(2),
+                                 queue=deque(), workers=workers, log_every=0)
+        t = time.perf_counter()
+        with mock.patch('s2.api._get_s2paper', side_effect=get_s2paper):
+            builder.from_paper_id(ROOT)
+        t = time.perf_counter() - t
+        n = len(builder.graph.edges)
+        print(f"workers={workers:2d} {n} papers in {t:6.2f}s "
+              f"({n / t:6.1f} papers/s)")
+
+
+if __name__ == "__main__":
+    main(*[float(a) for a in sys.argv[1:]])
@@ -0,0 +1,48 @@
+"""Benchmark reading and writing a JsonDS with each installed json codec.
+
+Usage: python benchmarks/bench_codec.py [n_papers] [n_references]
+"""
+import sys
+import tempfile
+import time
+
+from bench_trusted import synthetic_paper
+from s2.codec import CODECS, set_codec
+from s2.store import JsonDS
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main(n_papers: int = 20, n_refs: int = 2000):
+    papers = [synthetic_paper(i, n_refs) for i in range(n_papers)]
+    print(f"{n_papers} papers with {n_refs} citations and references each")
+    for name in CODECS:
+        try:
+            set_codec(name)
+        except ImportError:
+            print(f"{name:7s} not installed")
+            continue
+        with tempfile.TemporaryDirectory() as d:
+            ds = JsonDS.load_papers(d, trusted=True)
+
+            def write():
+                for p in papers:
+                    ds[p.paperId] = p
+
+            def read():
+                for k in ds:
+                    _ = ds[k]
+
+            w, r = timed(write), timed(read)
+        print(f"{name:7s} write: {w:.3f}s  read (trusted): {r:.3f}s")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
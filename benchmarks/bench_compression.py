@@ -0,0 +1,49 @@
+"""Benchmark disk size and read throughput of compressed JsonDS datastores.
+
+Real papers from the test fixtures are copied under different keys.
+
+Usage: python benchmarks/bench_compression.py [n_copies]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from s2.store import JsonDS
+
+FIXTURES = Path(__file__).parent.parent / "tests/fixtures/store/json/s2papers"
+SETTINGS = [(None, None), ('zlib', 1), ('zlib', None), ('gzip', 1),
+            ('gzip', None), ('lzma', 0), ('lzma', None)]
+
+
+def main(n_copies: int = 50):
+    papers = [p for _, p in JsonDS.load_papers(FIXTURES).items()]
+    print(f"{len(papers) * n_copies} papers "
+          f"({', '.join(str(len(p.citations)) for p in papers)} citations)")
+    print(f"{'compression':12s} {'level':>5s} {'size':>8s} {'ratio':>6s} "
+          f"{'write/s':>8s} {'read/s':>8s}")
+    baseline = None
+    for compression, level in SETTINGS:
+        with tempfile.TemporaryDirectory() as d:
+            ds = JsonDS.load_papers(d, enforce_id=False, trusted=True,
+                                    compression=compression,
+                                    compression_level=level)
+            t = time.perf_counter()
+            for i in range(n_copies):
+                for j, p in enumerate(papers):
+                    ds[f"{i}_{j}"] = p
+            write = time.perf_counter() - t
+            size = sum(f.stat().st_size for f in Path(d).glob("*.json"))
+            t = time.perf_counter()
+            for k in ds:
+                _ = ds[k]
+            read = time.perf_counter() - t
+        baseline = baseline or size
+        n = len(papers) * n_copies
+        print(f"{str(compression):12s} {str(level):>5s} "
+              f"{size / 2**20:7.1f}M {baseline / size:5.1f}x "
+              f"{n / write:8.1f} {n / read:8.1f}")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,57 @@
+"""Benchmark saving and loading the edges of a synthetic S2Graph with pickle
+(as S2GraphBuilder.save does) and as a binary CSRGraph file.
+
+Usage: python benchmarks/bench_persistence.py [n_papers] [n_refs]
+"""
+import pickle
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from s2.graph import S2Graph, CSRGraph
+
+
+def synthetic(n_papers: int, n_refs: int, seed: int = 0) -> S2Graph:
+    rng = random.Random(seed)
+    ids = [f"{i:040x}" for i in range(n_papers)]
+    graph = S2Graph()
+    for i, pid in enumerate(ids):
+        neighbours = graph.edges[pid]
+        for _ in range(n_refs if i else 0):
+            ref = ids[int(i * rng.random() ** 3)]
+            meta = {'intent': ['background'], 'isInfluential': False}
+            neighbours['reference'].append((ref, meta))
+            graph.edges[ref]['citation'].append((pid, dict(meta)))
+    return graph
+
+
+def timed(name, f):
+    t = time.perf_counter()
+    result = f()
+    print(f"{name:24s} {time.perf_counter() - t:8.3f}s")
+    return result
+
+
+def main(n_papers: int = 50000, n_refs: int = 10):
+    graph = synthetic(n_papers, n_refs)
+    csr = timed("CSRGraph.from_s2graph", lambda: CSRGraph.from_s2graph(graph))
+    print(f"{csr.num_nodes} papers, {csr.num_edges()} edges")
+    with tempfile.TemporaryDirectory() as d:
+        pkl, bin_ = Path(d) / "edges.pkl", Path(d) / "edges.csr"
+        timed("pickle save", lambda: pkl.write_bytes(pickle.dumps(graph)))
+        timed("pickle load", lambda: pickle.loads(pkl.read_bytes()))
+        timed("CSRGraph.save", lambda: csr.save(bin_))
+        loaded = timed("CSRGraph.load (mmap)", lambda: CSRGraph.load(bin_))
+        timed("CSRGraph.load (read)",
+              lambda: CSRGraph.load(bin_, mmap_mode=False))
+        root = csr.nodes[0]
+        timed("first neighbours (mmap)",
+              lambda: list(loaded.neighbours(root, 'citation')))
+        print(f"{'size':24s} pickle {pkl.stat().st_size / 2**20:.1f}M, "
+              f"csr {bin_.stat().st_size / 2**20:.1f}M")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,48 @@
+"""Benchmark reading papers entirely vs. only the fields needed for graph
+analytics, from the full jsons and from skeleton sidecars.
+
+Real papers from the test fixtures are copied under different keys.
+
+Usage: python benchmarks/bench_projection.py [n_copies]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from s2.store import JsonDS
+
+FIXTURES = Path(__file__).parent.parent / "tests/fixtures/store/json/s2papers"
+FIELDS = ["paperId", "year", "references.paperId", "citations.paperId"]
+
+
+def main(n_copies: int = 50):
+    papers = [p for _, p in JsonDS.load_papers(FIXTURES).items()]
+    n = len(papers) * n_copies
+    print(f"{n} papers "
+          f"({', '.join(str(len(p.citations)) for p in papers)} citations)")
+    with tempfile.TemporaryDirectory() as d:
+        ds = JsonDS.load_papers(d, enforce_id=False)
+        ds.set_many((f"{i}_{j}", p) for i in range(n_copies)
+                    for j, p in enumerate(papers))
+        for name, read in [
+            ("full", lambda: [ds[k] for k in ds]),
+            ("full, trusted", lambda: [
+                v for v in JsonDS.load_papers(d, trusted=True).values()]),
+            ("projected", lambda: list(ds.project(FIELDS))),
+        ]:
+            t = time.perf_counter()
+            read()
+            print(f"{name:20s} {n / (time.perf_counter() - t):8.1f} papers/s")
+        t = time.perf_counter()
+        ds.build_skeletons(FIELDS)
+        print(f"{'(build skeletons)':20s} "
+              f"{n / (time.perf_counter() - t):8.1f} papers/s")
+        t = time.perf_counter()
+        list(ds.project(FIELDS))
+        print(f"{'skeleton':20s} "
+              f"{n / (time.perf_counter() - t):8.1f} papers/s")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,55 @@
+"""Benchmark reading papers from a JsonDS with and without validation.
+
+Usage: python benchmarks/bench_trusted.py [n_papers] [n_references]
+"""
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from s2.models import S2Paper
+from s2.store import JsonDS
+
+
+def synthetic_paper(i: int, n_refs: int) -> S2Paper:
+    ref = dict(
+        arxivId=None, doi="10.1000/xyz", intent=["background"],
+        isInfluential=False, title="A synthetic reference", venue="ACL",
+        url="https://www.semanticscholar.org/paper/0", year=2020,
+        authors=[dict(authorId=str(a), name=f"Author {a}") for a in range(3)],
+    )
+    refs = [dict(ref, paperId=f"{j:040d}") for j in range(n_refs)]
+    return S2Paper(
+        paperId=f"{i:040x}", title="A synthetic paper", abstract="Abstract",
+        year=2021, authors=ref['authors'], citations=refs, references=refs,
+        topics=[dict(topic="Topic", topicId="1", url="u")],
+        obtained_utc=datetime.utcnow(),
+    )
+
+
+def bench(ds: JsonDS, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for k in ds:
+            _ = ds[k]
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main(n_papers: int = 20, n_refs: int = 2000):
+    with tempfile.TemporaryDirectory() as d:
+        ds = JsonDS.load_papers(d)
+        for i in range(n_papers):
+            p = synthetic_paper(i, n_refs)
+            ds[p.paperId] = p
+        validated = bench(JsonDS.load_papers(d))
+        trusted = bench(JsonDS.load_papers(d, trusted=True))
+    print(f"{n_papers} papers with {n_refs} citations and references each")
+    print(f"validated: {validated:.3f}s ({n_papers / validated:.1f} papers/s)")
+    print(f"trusted:   {trusted:.3f}s ({n_papers / trusted:.1f} papers/s)")
+    print(f"speedup:   {validated / trusted:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
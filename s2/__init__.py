@@ -1,7 +1,7 @@
 __version__ = "1.2.1a0"
 
 import logging
-from s2 import api, models
+from s2 import api, codec, models
 
 
 def _setup_logger():
@@ -0,0 +1,53 @@
+import os
+import time
+from pathlib import Path
+
+from typing import Union
+
+try:
+    import fcntl
+except ImportError: # pragma: no cover
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """ Exclusive advisory lock on a file, usable across threads and processes.
+
+    The lock is held on a file descriptor opened for each acquisition, so
+    that distinct :class:`FileLock` objects (e.g. in different threads) for
+    the same path exclude each other. While held, the descriptor is
+    available as :attr:`fd` to read or write the locked file.
+    """
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.fd = None
+
+    def acquire(self) -> None:
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT)
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else: # pragma: no cover
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.01)
+        self.fd = fd
+
+    def release(self) -> None:
+        fd, self.fd = self.fd, None
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else: # pragma: no cover
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        os.close(fd)
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
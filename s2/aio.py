@@ -0,0 +1,365 @@
+try:
+    import aiohttp
+except ImportError as e: # pragma: no cover
+    raise ImportError("s2.aio requires aiohttp, which can be installed with "
+                      "`pip install pys2[aio]`") from e
+import asyncio
+from s2 import codec
+import time
+from s2.api import build_url
+from s2.models import S2Paper, S2Author, lazy_paper
+from s2.ratelimit import RateLimiter
+from s2.retry import RetryPolicy
+from datetime import datetime
+
+from typing import (Optional, Union, Dict, Tuple, Iterable, AsyncIterator,
+                    Callable, Any)
+
+import logging
+logger = logging.getLogger('s2')
+
+
+def _build_params(params: Optional[Dict]) -> Optional[Dict]:
+    """ Convert params to strings, as done implicitly by :mod:`requests`. """
+    if params is None:
+        return None
+    return {k: str(v) for k, v in params.items()}
+
+
+async def _get(
+        s2id: str,
+        endpoint: str,
+        api_key: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        retries: int = 2,
+        wait: int = 150,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        **kwargs
+) -> Dict:
+    """ Get json for ``s2id`` from ``endpoint``, retrying based on ``retry``.
+    """
+    if session is None:
+        async with aiohttp.ClientSession() as session:
+            return await _get(s2id, endpoint, api_key, session, retries, wait,
+                              rate_limiter, retry, **kwargs)
+    if retry is None:
+        retry = RetryPolicy(retries=retries, rate_limit_wait=wait)
+    headers = dict(kwargs.pop('headers', None) or {})
+    if api_key:
+        headers['x-api-key'] = api_key
+    partner = 'x-api-key' in headers or 'x-api-key' in session.headers
+    url = build_url(s2id, endpoint=endpoint, partner=partner)
+    kwargs['params'] = _build_params(kwargs.get('params'))
+
+    start = time.monotonic()
+    attempt = 0
+    while True:
+        if rate_limiter is not None:
+            await asyncio.sleep(rate_limiter.reserve())
+        try:
+            async with session.get(url, headers=headers, **kwargs) as r:
+                if r.ok:
+                    d = codec.loads(await r.read())
+                    d['obtained_utc'] = datetime.utcnow()
+                    return d
+                reason, status = f"Error {r.status}", r.status
+                retry_after = r.headers.get('Retry-After')
+                if not retry.retry_status(r.status):
+                    logger.error(f"{reason} on {endpoint} {s2id}")
+                    r.raise_for_status()
+                error = aiohttp.ClientResponseError(
+                    r.request_info, r.history, status=r.status,
+                    message=r.reason or "", headers=r.headers
+                )
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if not retry.retry_connection_errors:
+                raise
+            reason, status, retry_after, error = repr(e), None, None, e
+
+        wait_s = retry.get_wait(attempt, retry_after, status)
+        if retry.give_up(attempt, time.monotonic() - start, wait_s):
+            logger.error(f"{reason} on {endpoint} {s2id}")
+            raise error
+        logger.warning(f"{reason} on {endpoint} {s2id}: "
+                       f" sleeping for {wait_s:.1f} seconds"
+                       f" with {retry.retries - attempt} attempts remaining.")
+        await asyncio.sleep(wait_s)
+        attempt += 1
+
+
+async def get_paper(
+        paperId: str,
+        api_key: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        return_json: bool = False,
+        retries: int = 2,
+        wait: int = 150,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        lazy: bool = False,
+        **kwargs
+) -> Union[Dict, S2Paper]:
+    """
+    Asynchronously look up information about a paper in Semantic Scholar
+    using :meth:`aiohttp.ClientSession.get`.
+    Returns a :class:`~s2.models.S2Paper` object describing the paper.
+
+    Unlike :func:`s2.api.get_paper`, waiting between retries does not block
+    the event loop.
+
+    Args:
+        paperId  (:obj:`str`):
+            Semantic Scholar paper identifier or URL
+            (see :func:`s2.api.get_paper` for accessible paper identifiers).
+        api_key  (:obj:`str`, optional):
+            A `Data Partners <https://pages.semanticscholar.org/data-partners>`_
+            API key. Overwrites API key passed through ``session``
+            for this request only.
+            Defaults to ``None``
+        session (:obj:`aiohttp.ClientSession`, optional):
+            A :class:`aiohttp.ClientSession` object, can be used to store an
+            API key and to reuse connections across requests. If not provided,
+            a session is created and closed for this request.
+            Defaults to ``None``
+        return_json (:obj:`bool`, optional):
+            Return original json from get request
+            (e.g. in case of PyS2-breaking changes to the S2 API).
+            Defaults to ``False``
+        retries (:obj:`int`, optional):
+            Number of retry attempts after rate limit is exceeded or a
+            transient server or connection error occurs.
+            Defaults to ``2``
+        wait (:obj:`int`, optional):
+            Number of seconds to wait between retries if rate limit is exceeded
+            (see :func:`s2.api.get_paper`). Defaults to ``150``.
+        rate_limiter (:class:`~s2.ratelimit.RateLimiter`, optional):
+            Rate limiter from which a token is reserved before sending each
+            request, waiting for it without blocking the event loop.
+            Defaults to ``None``
+        retry (:class:`~s2.retry.RetryPolicy`, optional):
+            Policy for retrying failed requests (see :func:`s2.api.get_paper`).
+            Defaults to ``None``
+        lazy (:obj:`bool`, optional):
+            Only validate ``citations`` and ``references`` when they are
+            accessed (see :func:`s2.api.get_paper`). Defaults to ``False``
+        **kwargs (:obj:`Dict[str, any]`, optional):
+            Keyword Args for :meth:`aiohttp.ClientSession.get`. e.g. to include
+            unknown references use
+            ``params = dict(include_unknown_references=True)``.
+            Defaults to ``{}``
+
+    Returns:
+        :class:`dict` or :class:`~s2.models.S2Paper`:
+        A :class:`~s2.models.S2Paper` or ``dict`` object describing the paper
+    """
+    d = await _get(paperId, 'paper', api_key, session, retries, wait,
+                   rate_limiter, retry, **kwargs)
+    if return_json:
+        return d
+    return lazy_paper(d) if lazy else S2Paper(**d)
+
+
+async def get_author(
+        authorId: str,
+        api_key: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        return_json: bool = False,
+        retries: int = 2,
+        wait: int = 150,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        **kwargs
+) -> Union[Dict, S2Author]:
+    """
+    Asynchronously look up information about an author in Semantic Scholar
+    using :meth:`aiohttp.ClientSession.get`.
+    Returns a :class:`~s2.models.S2Author` object describing the author.
+
+    Args:
+        authorId  (:obj:`str`):
+            Semantic Scholar author identifier.
+        api_key  (:obj:`str`, optional):
+            See :func:`get_paper`. Defaults to ``None``
+        session (:obj:`aiohttp.ClientSession`, optional):
+            See :func:`get_paper`. Defaults to ``None``
+        return_json (:obj:`bool`, optional):
+            See :func:`get_paper`. Defaults to ``False``
+        retries (:obj:`int`, optional):
+            See :func:`get_paper`. Defaults to ``2``
+        wait (:obj:`int`, optional):
+            See :func:`get_paper`. Defaults to ``150``
+        rate_limiter (:class:`~s2.ratelimit.RateLimiter`, optional):
+            See :func:`get_paper`. Defaults to ``None``
+        retry (:class:`~s2.retry.RetryPolicy`, optional):
+            See :func:`get_paper`. Defaults to ``None``
+        **kwargs (:obj:`Dict[str, any]`, optional):
+            Keyword Args for :meth:`aiohttp.ClientSession.get`.
+            Defaults to ``{}``
+
+    Returns:
+        :class:`dict` or :class:`~s2.models.S2Author`:
+        A :class:`~s2.models.S2Author` or ``dict`` object describing the author
+    """
+    d = await _get(authorId, 'author', api_key, session, retries, wait,
+                   rate_limiter, retry, **kwargs)
+    return d if return_json else S2Author(**d)
+
+
+async def _get_many(
+        get_fn: Callable,
+        s2ids: Iterable[str],
+        api_key: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        concurrency: int = 8,
+        **kwargs
+) -> AsyncIterator[Tuple[str, Any]]:
+    """ Run ``get_fn`` over ``s2ids`` with at most ``concurrency`` requests
+    in flight, yielding results as they complete.
+    """
+    if session is None:
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            async for result in _get_many(get_fn, s2ids, api_key, session,
+                                          concurrency, **kwargs):
+                yield result
+        return
+
+    def submit(s2id):
+        coro = get_fn(s2id, api_key=api_key, session=session, **kwargs)
+        return asyncio.ensure_future(coro)
+
+    s2ids = iter(s2ids)
+    pending = {}
+    for s2id in s2ids:
+        pending[submit(s2id)] = s2id
+        if len(pending) >= concurrency:
+            break
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                s2id = pending.pop(task)
+                try:
+                    yield s2id, task.result()
+                except Exception as e:
+                    yield s2id, e
+                next_s2id = next(s2ids, None)
+                if next_s2id is not None:
+                    pending[submit(next_s2id)] = next_s2id
+    finally:
+        # cancel in-flight requests if the consumer stops iterating early
+        for task in pending:
+            task.cancel()
+
+
+def get_papers(
+        paperIds: Iterable[str],
+        api_key: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        return_json: bool = False,
+        retries: int = 2,
+        wait: int = 150,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        concurrency: int = 8,
+        **kwargs
+) -> AsyncIterator[Tuple[str, Union[Dict, S2Paper, Exception]]]:
+    """
+    Asynchronously look up information about many papers in Semantic Scholar,
+    with at most ``concurrency`` requests in flight at any time.
+    Asynchronously yields ``(paperId, result)`` tuples as requests complete.
+
+    As with :func:`s2.api.get_papers`, errors are reported per paper
+    instead of aborting the batch, i.e. if the request for a paper fails
+    the exception is yielded in place of the result.
+
+    .. code-block:: python
+
+        async for pid, paper in s2.aio.get_papers(paperIds, concurrency=16):
+            ...
+
+    Args:
+        paperIds  (:obj:`Iterable[str]`):
+            Semantic Scholar paper identifiers or URLs
+            (see :func:`s2.api.get_paper` for accessible paper identifiers).
+        api_key  (:obj:`str`, optional):
+            See :func:`get_paper`. Defaults to ``None``
+        session (:obj:`aiohttp.ClientSession`, optional):
+            See :func:`get_paper`. If not provided, a session with a
+            connection pool of ``concurrency`` connections is created.
+            Defaults to ``None``
+        return_json (:obj:`bool`, optional):
+            See :func:`get_paper`. Defaults to ``False``
+        retries (:obj:`int`, optional):
+            See :func:`get_paper`. Defaults to ``2``
+        wait (:obj:`int`, optional):
+            See :func:`get_paper`. Defaults to ``150``
+        rate_limiter (:class:`~s2.ratelimit.RateLimiter`, optional):
+            See :func:`get_paper`. Defaults to ``None``
+        retry (:class:`~s2.retry.RetryPolicy`, optional):
+            See :func:`get_paper`. Defaults to ``None``
+        concurrency (:obj:`int`, optional):
+            Maximum number of concurrent requests. Defaults to ``8``
+        **kwargs (:obj:`Dict[str, any]`, optional):
+            Keyword Args for :meth:`aiohttp.ClientSession.get`.
+            Defaults to ``{}``
+
+    Returns:
+        :class:`AsyncIterator` of ``(paperId, result)`` tuples, where ``result``
+        is a :class:`~s2.models.S2Paper`, a ``dict`` or an :class:`Exception`.
+    """
+    return _get_many(get_paper, paperIds, api_key, session, concurrency,
+                     return_json=return_json, retries=retries, wait=wait,
+                     rate_limiter=rate_limiter, retry=retry, **kwargs)
+
+
+def get_authors(
+        authorIds: Iterable[str],
+        api_key: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        return_json: bool = False,
+        retries: int = 2,
+        wait: int = 150,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        concurrency: int = 8,
+        **kwargs
+) -> AsyncIterator[Tuple[str, Union[Dict, S2Author, Exception]]]:
+    """
+    Asynchronously look up information about many authors in Semantic Scholar,
+    with at most ``concurrency`` requests in flight at any time.
+    Asynchronously yields ``(authorId, result)`` tuples as requests complete.
+
+    Args:
+        authorIds  (:obj:`Iterable[str]`):
+            Semantic Scholar author identifiers.
+        api_key  (:obj:`str`, optional):
+            See :func:`get_paper`. Defaults to ``None``
+        session (:obj:`aiohttp.ClientSession`, optional):
+            See :func:`get_papers`. Defaults to ``None``
+        return_json (:obj:`bool`, optional):
+            See :func:`get_paper`. Defaults to ``False``
+        retries (:obj:`int`, optional):
+            See :func:`get_paper`. Defaults to ``2``
+        wait (:obj:`int`, optional):
+            See :func:`get_paper`. Defaults to ``150``
+        rate_limiter (:class:`~s2.ratelimit.RateLimiter`, optional):
+            See :func:`get_paper`. Defaults to ``None``
+        retry (:class:`~s2.retry.RetryPolicy`, optional):
+            See :func:`get_paper`. Defaults to ``None``
+        concurrency (:obj:`int`, optional):
+            Maximum number of concurrent requests. Defaults to ``8``
+        **kwargs (:obj:`Dict[str, any]`, optional):
+            Keyword Args for :meth:`aiohttp.ClientSession.get`.
+            Defaults to ``{}``
+
+    Returns:
+        :class:`AsyncIterator` of ``(authorId, result)`` tuples, where
+        ``result`` is a :class:`~s2.models.S2Author`, a ``dict`` or an
+        :class:`Exception`.
+    """
+    return _get_many(get_author, authorIds, api_key, session, concurrency,
+                     return_json=return_json, retries=retries, wait=wait,
+                     rate_limiter=rate_limiter, retry=retry, **kwargs)
@@ -1,17 +1,25 @@
 import requests
+from requests.adapters import HTTPAdapter
 import time
-from s2.models import S2Paper, S2Author
+from s2 import codec
+from s2.cache import ResponseCache
+from s2.models import S2Paper, S2Author, lazy_paper, construct_trusted
+from s2.ratelimit import RateLimiter
+from s2.retry import RetryPolicy
 import copy
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from concurrent.futures import FIRST_COMPLETED
 from datetime import datetime
+from itertools import islice
 
-from typing import Optional, Union, Dict, Tuple
+from typing import (Optional, Union, Dict, Tuple, Iterable, Iterator, Callable,
+                    Any, Hashable)
 
 import logging
 logger = logging.getLogger('s2')
 
-# TODO: time persistent session vs not; if noticeable performance increase
-#       then make session mandatory and remove api_key / build_url
-
 API_URL = "https://api.semanticscholar.org/v1"
 PARTNER_URL = "https://partner.semanticscholar.org/v1"
 
@@ -34,6 +42,9 @@ def build_session(
     If an api key is included in the session headers, and passed through the
     `api_key` arg, then the value in the session headers will be overwritten
     temporarily for this request.
+
+    Note that this copies ``session`` (and its connection pool) if an api key
+    is passed; :class:`S2Client` instead sends the api key with each request.
     """
     if api_key and session:
         session = copy.deepcopy(session)
@@ -44,6 +55,422 @@ def build_session(
     return session
 
 
+class SingleFlight:
+    """ Coalesces concurrent calls with the same key into a single call.
+
+    While a call for a key is in flight, other threads calling :meth:`do` with
+    the same key wait for it to complete and receive (a copy of) its result or
+    exception instead of making the call themselves.
+
+    Attributes:
+        calls (:obj:`int`):
+            Number of calls that were made.
+        coalesced (:obj:`int`):
+            Number of calls that were saved by waiting for an identical call.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """ Call ``fn`` unless a call with the same ``key`` is in flight, in
+        which case wait for and return a deep copy of its result.
+        """
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                self.calls += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            # callers may mutate the returned json
+            return copy.deepcopy(call.result)
+        result = None
+        try:
+            result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                waiters = call.waiters
+            try:
+                if waiters and call.error is None:
+                    # copied before the leader's caller can mutate it
+                    call.result = copy.deepcopy(result)
+            finally:
+                call.done.set()
+        return result
+
+    def __getstate__(self):
+        # locks can't be pickled (e.g. when saving an S2GraphBuilder)
+        return {'calls': self.calls, 'coalesced': self.coalesced}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.__dict__.update(state)
+
+
+class _Call:
+    """ A call in flight in :class:`SingleFlight`. """
+    def __init__(self):
+        self.done = threading.Event()
+        self.waiters = 0
+        self.result = None
+        self.error = None
+
+
+class S2Client:
+    """ Long-lived client for the Semantic Scholar API.
+
+    The client owns a :class:`requests.Session` with a pool of keep-alive
+    connections, so that consecutive requests (e.g. when building an
+    :class:`~s2.graph.S2Graph`) reuse connections instead of repeating TCP and
+    TLS handshakes. The API key is sent with each request instead of being
+    stored in (a copy of) the session. The module-level functions of
+    :mod:`s2.api` delegate to a default client when no ``session`` is passed.
+
+    .. code-block:: python
+
+        client = S2Client(api_key=API_KEY, retry=RetryPolicy())
+        paper = client.get_paper(pid)
+        for pid, paper in client.get_papers(paperIds, max_workers=16):
+            ...
+
+    Args:
+        api_key  (:obj:`str`, optional):
+            A `Data Partners <https://pages.semanticscholar.org/data-partners>`_
+            API key (see :any:`using_an_api_key`). Defaults to ``None``
+        session (:obj:`requests.Session`, optional):
+            Session used to send requests, which is not modified by the
+            client. If not provided, a session with a connection pool of
+            ``pool_maxsize`` connections is created. Defaults to ``None``
+        pool_maxsize (:obj:`int`, optional):
+            Maximum number of connections kept alive per host, which should
+            be at least the number of threads using the client.
+            Defaults to ``10``
+        timeout (:obj:`float` or :obj:`tuple`, optional):
+            Connect and read timeouts in seconds for each request
+            (see :meth:`requests.Session.request`); timed out requests are
+            retried based on ``retry``. Defaults to ``(10, 120)``
+        rate_limiter (:class:`~s2.ratelimit.RateLimiter`, optional):
+            Default rate limiter for requests (see :func:`get_paper`).
+            Defaults to ``None``
+        retry (:class:`~s2.retry.RetryPolicy`, optional):
+            Default retry policy for requests (see :func:`get_paper`).
+            Defaults to :class:`~s2.retry.RetryPolicy` defaults.
+        cache (:class:`~s2.cache.ResponseCache`, optional):
+            Default response cache for requests (see :func:`get_paper`).
+            Defaults to ``None``
+        single_flight (:obj:`bool` or :class:`SingleFlight`, optional):
+            Coalesce concurrent identical requests (e.g. from threads
+            expanding overlapping parts of a graph) into a single request
+            whose result is shared by all callers. The number of requests
+            saved is counted in :attr:`single_flight`. Defaults to ``True``
+
+    Attributes:
+        single_flight (:class:`SingleFlight`, optional):
+            Coalesces concurrent identical requests, if enabled.
+    """
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 session: Optional[requests.Session] = None,
+                 pool_maxsize: int = 10,
+                 timeout: Optional[Union[float, Tuple[float, float]]] = (10, 120),
+                 rate_limiter: Optional[RateLimiter] = None,
+                 retry: Optional[RetryPolicy] = None,
+                 cache: Optional[ResponseCache] = None,
+                 single_flight: Union[bool, 'SingleFlight'] = True,
+                 ):
+        if session is None:
+            session = requests.Session()
+            # one pool per host (public and partner api)
+            adapter = HTTPAdapter(pool_connections=2,
+                                  pool_maxsize=pool_maxsize)
+            session.mount('https://', adapter)
+        self.session = session
+        self.api_key = api_key
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.retry = retry or RetryPolicy()
+        self.cache = cache
+        if single_flight is True:
+            single_flight = SingleFlight()
+        self.single_flight = single_flight or None
+
+    def close(self) -> None:
+        """ Close the connections of the session. """
+        self.session.close()
+
+    def __enter__(self) -> 'S2Client':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _get(
+            self,
+            s2id: str,
+            endpoint: str,
+            api_key: Optional[str] = None,
+            rate_limiter: Optional[RateLimiter] = None,
+            retry: Optional[RetryPolicy] = None,
+            cache: Optional[ResponseCache] = None,
+            **kwargs
+    ) -> Dict:
+        """ Get json for ``s2id`` from ``endpoint``, retrying based on
+        ``retry``.
+        """
+        api_key = api_key or self.api_key
+        rate_limiter = rate_limiter or self.rate_limiter
+        retry = retry or self.retry
+        cache = self.cache if cache is None else cache
+        if api_key:
+            kwargs['headers'] = dict(kwargs.get('headers') or {})
+            kwargs['headers']['x-api-key'] = api_key
+        partner = bool(api_key) or 'x-api-key' in self.session.headers
+        url = build_url(s2id, endpoint=endpoint, partner=partner)
+        kwargs.setdefault('timeout', self.timeout)
+
+        def fetch():
+            return self._fetch(url, s2id, endpoint, rate_limiter, retry,
+                               cache, **kwargs)
+        if self.single_flight is None:
+            return fetch()
+        params = kwargs.get('params') or {}
+        headers = kwargs.get('headers') or {}
+        # responses depend on the api key sent in the headers
+        key = (url,
+               tuple(sorted((str(k), str(v)) for k, v in params.items())),
+               tuple(sorted((str(k), str(v)) for k, v in headers.items())))
+        return self.single_flight.do(key, fetch)
+
+    def _fetch(
+            self,
+            url: str,
+            s2id: str,
+            endpoint: str,
+            rate_limiter: Optional[RateLimiter],
+            retry: RetryPolicy,
+            cache: Optional[ResponseCache],
+            **kwargs
+    ) -> Dict:
+        """ Get json from ``url`` (or ``cache``), retrying based on ``retry``.
+        """
+        entry = None
+        if cache is not None:
+            entry = cache.get(url, kwargs.get('params'))
+            if entry is not None and entry.fresh:
+                return entry.json()
+            if entry is not None:
+                kwargs['headers'] = dict(kwargs.get('headers') or {})
+                kwargs['headers'].update(entry.conditional_headers())
+
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            r, error = None, None
+            try:
+                r = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not retry.retry_connection_errors:
+                    raise
+                error = e
+
+            if r is not None and r.status_code == 304 and entry is not None:
+                # stale cached response was revalidated by the server
+                entry = cache.refresh(url, kwargs.get('params'), entry)
+                return entry.json()
+            if r is not None and r.ok:
+                d = codec.loads(r.content)
+                d['obtained_utc'] = datetime.utcnow()
+                if cache is not None:
+                    cache.set(url, kwargs.get('params'), r.content,
+                              d['obtained_utc'], r.headers.get('ETag'),
+                              r.headers.get('Last-Modified'))
+                return d
+
+            reason = f"Error {r.status_code}" if error is None else repr(error)
+            if error is not None or retry.retry_status(r.status_code):
+                retry_after, status = (None, None) if r is None else \
+                    (r.headers.get('Retry-After'), r.status_code)
+                wait_s = retry.get_wait(attempt, retry_after, status)
+                if not retry.give_up(attempt, time.monotonic() - start, wait_s):
+                    logger.warning(f"{reason} on {endpoint} {s2id}: "
+                                   f" sleeping for {wait_s:.1f} seconds"
+                                   f" with {retry.retries - attempt} attempts"
+                                   f" remaining.")
+                    time.sleep(wait_s)
+                    attempt += 1
+                    continue
+
+            logger.error(f"{reason} on {endpoint} {s2id}")
+            if error is not None:
+                raise error
+            r.raise_for_status()
+
+    def get_paper(
+            self,
+            paperId: str,
+            return_json: bool = False,
+            api_key: Optional[str] = None,
+            rate_limiter: Optional[RateLimiter] = None,
+            retry: Optional[RetryPolicy] = None,
+            cache: Optional[ResponseCache] = None,
+            lazy: bool = False,
+            trusted: bool = False,
+            **kwargs
+    ) -> Union[Dict, S2Paper]:
+        """ Look up information about a paper in Semantic Scholar.
+        See :func:`s2.api.get_paper`; ``api_key``, ``rate_limiter``,
+        ``retry`` and ``cache`` override the client defaults for this request.
+        """
+        d = self._get(paperId, 'paper', api_key, rate_limiter, retry, cache,
+                      **kwargs)
+        if return_json:
+            return d
+        if trusted:
+            return construct_trusted(S2Paper, d)
+        return lazy_paper(d) if lazy else S2Paper(**d)
+
+    def get_author(
+            self,
+            authorId: str,
+            return_json: bool = False,
+            api_key: Optional[str] = None,
+            rate_limiter: Optional[RateLimiter] = None,
+            retry: Optional[RetryPolicy] = None,
+            cache: Optional[ResponseCache] = None,
+            **kwargs
+    ) -> Union[Dict, S2Author]:
+        """ Look up information about an author in Semantic Scholar.
+        See :func:`s2.api.get_author`; ``api_key``, ``rate_limiter``,
+        ``retry`` and ``cache`` override the client defaults for this request.
+        """
+        d = self._get(authorId, 'author', api_key, rate_limiter, retry, cache,
+                      **kwargs)
+        return d if return_json else S2Author(**d)
+
+    def _get_many(
+            self,
+            get_fn: Callable,
+            s2ids: Iterable[str],
+            max_workers: int = 8,
+            **kwargs
+    ) -> Iterator[Tuple[str, Any]]:
+        """ Fan out ``get_fn`` over ``s2ids`` with a bounded thread pool.
+
+        At most ``2 * max_workers`` requests are submitted at any time so that
+        arbitrarily long iterables of identifiers can be consumed lazily.
+        """
+        s2ids = iter(s2ids)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            def submit(s2id):
+                return executor.submit(get_fn, s2id, **kwargs)
+            pending = {submit(i): i for i in islice(s2ids, 2 * max_workers)}
+            while pending:
+                done, _ = wait_futures(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    s2id = pending.pop(future)
+                    try:
+                        yield s2id, future.result()
+                    except Exception as e:
+                        yield s2id, e
+                for s2id in islice(s2ids, len(done)):
+                    pending[submit(s2id)] = s2id
+
+    def get_papers(
+            self,
+            paperIds: Iterable[str],
+            return_json: bool = False,
+            max_workers: int = 8,
+            **kwargs
+    ) -> Iterator[Tuple[str, Union[Dict, S2Paper, Exception]]]:
+        """ Look up information about many papers concurrently.
+        See :func:`s2.api.get_papers`; ``**kwargs`` are passed to
+        :meth:`get_paper`.
+        """
+        return self._get_many(self.get_paper, paperIds, max_workers,
+                              return_json=return_json, **kwargs)
+
+    def get_authors(
+            self,
+            authorIds: Iterable[str],
+            return_json: bool = False,
+            max_workers: int = 8,
+            **kwargs
+    ) -> Iterator[Tuple[str, Union[Dict, S2Author, Exception]]]:
+        """ Look up information about many authors concurrently.
+        See :func:`s2.api.get_authors`; ``**kwargs`` are passed to
+        :meth:`get_author`.
+        """
+        return self._get_many(self.get_author, authorIds, max_workers,
+                              return_json=return_json, **kwargs)
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+_session_flights = weakref.WeakKeyDictionary()
+
+
+def default_client() -> S2Client:
+    """ The :class:`S2Client` used by :mod:`s2.api` functions when no
+    ``session`` is passed, created on first use.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = S2Client()
+        return _default_client
+
+
+def _client(
+        session: Optional[requests.Session] = None,
+        max_workers: Optional[int] = None,
+) -> S2Client:
+    """ Get a client wrapping ``session`` (without modifying it), or the
+    default client; batches of requests get their own connection pool.
+    """
+    if session is not None:
+        # coalesce identical requests across calls using the same session
+        with _default_client_lock:
+            single_flight = _session_flights.get(session)
+            if single_flight is None:
+                single_flight = _session_flights[session] = SingleFlight()
+        return S2Client(session=session, single_flight=single_flight)
+    if max_workers is not None:
+        return S2Client(pool_maxsize=max_workers)
+    return default_client()
+
+
+def _closing(client: S2Client, results: Iterator) -> Iterator:
+    """ Yield ``results``, then close ``client`` (also if the iterator is
+    closed or garbage collected before it is exhausted).
+    """
+    try:
+        yield from results
+    finally:
+        client.close()
+
+
+def _legacy_retry(retries: int, wait: int) -> RetryPolicy:
+    """ Retry policy for the ``retries`` and ``wait`` arguments, where
+    ``wait`` only applies to rate limits.
+    """
+    return RetryPolicy(retries=retries, rate_limit_wait=wait)
+
+
 def get_paper(
         paperId: str,
         api_key: Optional[str] = None,
@@ -51,6 +478,11 @@ def get_paper(
         return_json: bool = False,
         retries: int = 2,
         wait: int = 150,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        cache: Optional[ResponseCache] = None,
+        lazy: bool = False,
+        trusted: bool = False,
         **kwargs
 ) -> Union[Dict, S2Paper]:
     """
@@ -85,7 +517,8 @@ def get_paper(
             (e.g. in case of PyS2-breaking changes to the S2 API).
             Defaults to ``False``
         retries (:obj:`int`, optional):
-            Number of retry attempts after rate limit is exceeded.
+            Number of retry attempts after rate limit is exceeded or a
+            transient server or connection error occurs.
             Defaults to ``2``
         wait (:obj:`int`, optional):
             Number of seconds to wait between retries if rate limit is exceeded
@@ -93,6 +526,30 @@ def get_paper(
             This can be safely lowered with access to the `Data Partners
             <https://pages.semanticscholar.org/data-partners>`_ API
             (see :any:`using_an_api_key`)
+        rate_limiter (:class:`~s2.ratelimit.RateLimiter`, optional):
+            Rate limiter from which a token is acquired before sending each
+            request (including retries), e.g. shared across threads to stay
+            within the rate limit instead of waiting after exceeding it.
+            Defaults to ``None``
+        retry (:class:`~s2.retry.RetryPolicy`, optional):
+            Policy deciding which failed requests are retried (rate limits,
+            transient server and connection errors) and how long to wait in
+            between, with exponential backoff and jitter. Overrides
+            ``retries`` and ``wait``, which otherwise define a policy waiting
+            ``wait`` seconds between each of ``retries`` attempts.
+            Defaults to ``None``
+        cache (:class:`~s2.cache.ResponseCache`, optional):
+            On-disk cache of responses; fresh cached responses are returned
+            without sending a request. Defaults to ``None``
+        lazy (:obj:`bool`, optional):
+            Only validate ``citations`` and ``references`` when they are
+            accessed (see :class:`~s2.models.LazyReferences`), which is much
+            faster and lighter for highly cited papers, especially if only
+            their ``paperIds()`` are needed. Defaults to ``False``
+        trusted (:obj:`bool`, optional):
+            Create the :class:`~s2.models.S2Paper` without validation
+            (see :func:`~s2.models.construct_trusted`), trusting the API to
+            return well-formed data. Defaults to ``False``
         **kwargs (:obj:`Dict[str, any]`, optional):
             Keyword Args for :meth:`requests.Session.get`. e.g. to include
             unknown references use
@@ -103,29 +560,10 @@ def get_paper(
         :class:`dict` or :class:`~s2.models.S2Paper`:
         A :class:`~s2.models.S2Paper` or ``dict`` object describing the paper
     """
-    session = build_session(session, api_key)
-    partner = 'x-api-key' in session.headers
-    url = build_url(paperId, endpoint='paper', partner=partner)
-    r = session.get(url, **kwargs)
-
-    if r.ok:
-        d = r.json()
-        d['obtained_utc'] = datetime.utcnow()
-        if return_json:
-            return d
-        else:
-            return S2Paper(**d)
-    # I found I was getting 403 Forbidden errors when exceeding rate limits
-    elif r.status_code in [429, 403] and retries > 0:
-        logger.warning(f"Error {r.status_code} on paper {paperId}: "
-                       f" sleeping for {wait} seconds"
-                       f" with {retries} attempts remaining.")
-        time.sleep(wait)
-        return get_paper(paperId, api_key, session, return_json,
-                         retries-1, wait, **kwargs)
-    else:
-        logger.error(f"Error {r.status_code} on paper {paperId}")
-        r.raise_for_status()
+    return _client(session).get_paper(
+        paperId, return_json, api_key, rate_limiter,
+        retry or _legacy_retry(retries, wait), cache, lazy, trusted, **kwargs
+    )
 
 
 def get_author(
@@ -135,6 +573,9 @@ def get_author(
         return_json: bool = False,
         retries: int = 2,
         wait: int = 150,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        cache: Optional[ResponseCache] = None,
         **kwargs
 ) -> Union[Dict, S2Author]:
     """
@@ -158,7 +599,8 @@ def get_author(
             (e.g. in case of PyS2-breaking changes to the S2 API).
             Defaults to ``False``
         retries (:obj:`int`, optional):
-            Number of retry attempts after rate limit is exceeded.
+            Number of retry attempts after rate limit is exceeded or a
+            transient server or connection error occurs.
             Defaults to ``2``
         wait (:obj:`int`, optional):
             Number of seconds to wait between retries if rate limit is exceeded
@@ -166,6 +608,21 @@ def get_author(
             This can be safely lowered with access to the `Data Partners
             <https://pages.semanticscholar.org/data-partners>`_ API
             (see :any:`using_an_api_key`)
+        rate_limiter (:class:`~s2.ratelimit.RateLimiter`, optional):
+            Rate limiter from which a token is acquired before sending each
+            request (including retries), e.g. shared across threads to stay
+            within the rate limit instead of waiting after exceeding it.
+            Defaults to ``None``
+        retry (:class:`~s2.retry.RetryPolicy`, optional):
+            Policy deciding which failed requests are retried (rate limits,
+            transient server and connection errors) and how long to wait in
+            between, with exponential backoff and jitter. Overrides
+            ``retries`` and ``wait``, which otherwise define a policy waiting
+            ``wait`` seconds between each of ``retries`` attempts.
+            Defaults to ``None``
+        cache (:class:`~s2.cache.ResponseCache`, optional):
+            On-disk cache of responses; fresh cached responses are returned
+            without sending a request. Defaults to ``None``
         **kwargs (:obj:`Dict[str, any]`, optional):
             Keyword Args for :meth:`requests.Session.get`.
              Defaults to ``{}``
@@ -174,29 +631,148 @@ def get_author(
         :class:`dict` or :class:`~s2.models.S2Author`:
         A :class:`~s2.models.S2Author` or ``dict`` object describing the author
     """
-    session = build_session(session, api_key)
-    partner = 'x-api-key' in session.headers
-    url = build_url(authorId, endpoint='author', partner=partner)
-    r = session.get(url, **kwargs)
-
-    if r.ok:
-        d = r.json()
-        d['obtained_utc'] = datetime.utcnow()
-        if return_json:
-            return d
-        else:
-            return S2Author(**d)
-    # I found I was getting 403 Forbidden errors when exceeding rate limits
-    elif r.status_code in [429, 403] and retries > 0:
-        logger.warning(f"Error {r.status_code} on author {authorId}: "
-                       f" sleeping for {wait} seconds"
-                       f" with {retries} attempts remaining.")
-        time.sleep(wait)
-        return get_author(authorId, api_key, session, return_json,
-                          retries-1, wait, **kwargs)
-    else:
-        logger.error(f"Error {r.status_code} on author {authorId}")
-        r.raise_for_status()
+    return _client(session).get_author(
+        authorId, return_json, api_key, rate_limiter,
+        retry or _legacy_retry(retries, wait), cache, **kwargs
+    )
+
+
+def get_papers(
+        paperIds: Iterable[str],
+        api_key: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        return_json: bool = False,
+        retries: int = 2,
+        wait: int = 150,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        cache: Optional[ResponseCache] = None,
+        max_workers: int = 8,
+        **kwargs
+) -> Iterator[Tuple[str, Union[Dict, S2Paper, Exception]]]:
+    """
+    Look up information about many papers in Semantic Scholar concurrently,
+    using a pool of threads sharing a single :class:`requests.Session`.
+    Yields ``(paperId, result)`` tuples as requests complete, so the order of
+    results may differ from the order of ``paperIds``.
+
+    Errors are reported per paper instead of aborting the batch: if the
+    request for a paper fails (e.g. with a :class:`requests.HTTPError` for
+    missing papers), the exception is yielded in place of the result.
+
+    Args:
+        paperIds  (:obj:`Iterable[str]`):
+            Semantic Scholar paper identifiers or URLs
+            (see :func:`get_paper` for accessible paper identifiers).
+            This can be a generator, as identifiers are consumed lazily.
+        api_key  (:obj:`str`, optional):
+            See :func:`get_paper`. Defaults to ``None``
+        session (:obj:`requests.Session`, optional):
+            See :func:`get_paper`. Note that it is shared by all threads;
+            if not provided, a session with a connection pool of
+            ``max_workers`` connections is created, and closed once all
+            results are yielded. Defaults to ``None``
+        return_json (:obj:`bool`, optional):
+            See :func:`get_paper`. Defaults to ``False``
+        retries (:obj:`int`, optional):
+            See :func:`get_paper`. Defaults to ``2``
+        wait (:obj:`int`, optional):
+            See :func:`get_paper`. Defaults to ``150``
+        rate_limiter (:class:`~s2.ratelimit.RateLimiter`, optional):
+            See :func:`get_paper`. Shared by all threads. Defaults to ``None``
+        retry (:class:`~s2.retry.RetryPolicy`, optional):
+            See :func:`get_paper`. Defaults to ``None``
+        cache (:class:`~s2.cache.ResponseCache`, optional):
+            See :func:`get_paper`. Defaults to ``None``
+        max_workers (:obj:`int`, optional):
+            Maximum number of concurrent requests. Defaults to ``8``
+        **kwargs (:obj:`Dict[str, any]`, optional):
+            Keyword Args for :meth:`requests.Session.get`, or ``lazy`` and
+            ``trusted`` (see :func:`get_paper`).
+            Defaults to ``{}``
+
+    Returns:
+        :class:`Iterator` of ``(paperId, result)`` tuples, where ``result``
+        is a :class:`~s2.models.S2Paper`, a ``dict`` or an :class:`Exception`.
+    """
+    client = _client(session, max_workers)
+    results = client.get_papers(
+        paperIds, return_json, max_workers, api_key=api_key,
+        rate_limiter=rate_limiter, retry=retry or _legacy_retry(retries, wait),
+        cache=cache, **kwargs
+    )
+    if session is None:
+        # the connection pool created for this batch
+        results = _closing(client, results)
+    return results
+
+
+def get_authors(
+        authorIds: Iterable[str],
+        api_key: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        return_json: bool = False,
+        retries: int = 2,
+        wait: int = 150,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        cache: Optional[ResponseCache] = None,
+        max_workers: int = 8,
+        **kwargs
+) -> Iterator[Tuple[str, Union[Dict, S2Author, Exception]]]:
+    """
+    Look up information about many authors in Semantic Scholar concurrently,
+    using a pool of threads sharing a single :class:`requests.Session`.
+    Yields ``(authorId, result)`` tuples as requests complete, so the order of
+    results may differ from the order of ``authorIds``.
+
+    Errors are reported per author instead of aborting the batch: if the
+    request for an author fails (e.g. with a :class:`requests.HTTPError` for
+    missing authors), the exception is yielded in place of the result.
+
+    Args:
+        authorIds  (:obj:`Iterable[str]`):
+            Semantic Scholar author identifiers.
+            This can be a generator, as identifiers are consumed lazily.
+        api_key  (:obj:`str`, optional):
+            See :func:`get_author`. Defaults to ``None``
+        session (:obj:`requests.Session`, optional):
+            See :func:`get_author`. Note that it is shared by all threads;
+            if not provided, a session with a connection pool of
+            ``max_workers`` connections is created, and closed once all
+            results are yielded. Defaults to ``None``
+        return_json (:obj:`bool`, optional):
+            See :func:`get_author`. Defaults to ``False``
+        retries (:obj:`int`, optional):
+            See :func:`get_author`. Defaults to ``2``
+        wait (:obj:`int`, optional):
+            See :func:`get_author`. Defaults to ``150``
+        rate_limiter (:class:`~s2.ratelimit.RateLimiter`, optional):
+            See :func:`get_author`. Shared by all threads. Defaults to ``None``
+        retry (:class:`~s2.retry.RetryPolicy`, optional):
+            See :func:`get_author`. Defaults to ``None``
+        cache (:class:`~s2.cache.ResponseCache`, optional):
+            See :func:`get_author`. Defaults to ``None``
+        max_workers (:obj:`int`, optional):
+            Maximum number of concurrent requests. Defaults to ``8``
+        **kwargs (:obj:`Dict[str, any]`, optional):
+            Keyword Args for :meth:`requests.Session.get`.
+            Defaults to ``{}``
+
+    Returns:
+        :class:`Iterator` of ``(authorId, result)`` tuples, where ``result``
+        is a :class:`~s2.models.S2Author`, a ``dict`` or an :class:`Exception`.
+    """
+    client = _client(session, max_workers)
+    results = client.get_authors(
+        authorIds, return_json, max_workers, api_key=api_key,
+        rate_limiter=rate_limiter, retry=retry or _legacy_retry(retries, wait),
+        cache=cache, **kwargs
+    )
+    if session is None:
+        # the connection pool created for this batch
+        results = _closing(client, results)
+    return results
 
 
 # TODO: update public functions to return dict
@@ -0,0 +1,196 @@
+from s2 import codec
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlencode
+
+from typing import Optional, Union, Dict
+
+
+class CacheEntry:
+    """ A cached API response.
+
+    Attributes:
+        body (:obj:`bytes`):
+            Body of the response.
+        obtained_utc (:class:`~datetime.datetime`):
+            UTC datetime when the response was obtained (or last revalidated).
+        etag (:obj:`str`, optional):
+            ``ETag`` header of the response.
+        last_modified (:obj:`str`, optional):
+            ``Last-Modified`` header of the response.
+        fresh (:obj:`bool`):
+            If the entry is younger than the ``ttl`` of the cache.
+    """
+    def __init__(self, body: bytes, obtained_utc: datetime,
+                 etag: Optional[str] = None,
+                 last_modified: Optional[str] = None,
+                 fresh: bool = True):
+        self.body = body
+        self.obtained_utc = obtained_utc
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresh = fresh
+
+    def json(self) -> Dict:
+        """ Parse the body, setting ``obtained_utc`` to when it was obtained.
+        """
+        d = codec.loads(self.body)
+        d['obtained_utc'] = self.obtained_utc
+        return d
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """ Headers to revalidate the entry with a conditional request. """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """ On-disk cache of API responses, bounded in size with LRU eviction.
+
+    Responses are keyed by URL and query parameters (e.g.
+    ``include_unknown_references``) and stored in ``cache_dir``, one file per
+    response, so that repeated crawls are served from local disk instead of
+    rate-limited requests. Entries obtained more than ``ttl`` ago are stale:
+    if the server sent an ``ETag`` or ``Last-Modified`` header, they are
+    revalidated with a conditional request, otherwise they are fetched again.
+
+    .. code-block:: python
+
+        cache = ResponseCache("s2cache", ttl=timedelta(days=7))
+        paper = s2.api.get_paper(pid, cache=cache)
+
+    Args:
+        cache_dir (str or :class:`~pathlib.Path`):
+            Directory where responses are stored. It is created if it does
+            not exist, otherwise previously cached responses are reused.
+        ttl (:obj:`float` or :class:`~datetime.timedelta`, optional):
+            Time to live of cached responses (in seconds if a number), based
+            on when they were obtained from the API. Defaults to 30 days.
+        max_size (:obj:`int`, optional):
+            Maximum size of the cache in bytes, beyond which the least
+            recently used responses are evicted. Defaults to 1GB.
+    """
+    _SUFFIX = '.cache'
+
+    def __init__(self,
+                 cache_dir: Union[str, Path],
+                 ttl: Union[float, timedelta] = timedelta(days=30),
+                 max_size: Optional[int] = 2**30,
+                 ):
+        self.cache_dir = Path(cache_dir).absolute()
+        self.cache_dir.mkdir(exist_ok=True, parents=True)
+        if not isinstance(ttl, timedelta):
+            ttl = timedelta(seconds=ttl)
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        # least recently used first
+        self._sizes = OrderedDict()
+        self._size = 0
+        files = self.cache_dir.glob(f"*{self._SUFFIX}")
+        files = [(f.stat(), f) for f in files]
+        for st, f in sorted(files, key=lambda x: x[0].st_mtime):
+            self._sizes[f.stem] = st.st_size
+            self._size += st.st_size
+
+    @property
+    def size(self) -> int:
+        """ Total size of cached responses in bytes. """
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict] = None) -> str:
+        """ Cache key for a request with ``url`` and query ``params``. """
+        if params:
+            items = sorted((str(k), str(v)) for k, v in params.items())
+            url = f"{url}?{urlencode(items)}"
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self._SUFFIX}"
+
+    def get(self, url: str, params: Optional[Dict] = None
+            ) -> Optional[CacheEntry]:
+        """ Get the cached response for a request, or ``None`` if missing. """
+        key = self.key(url, params)
+        f = self._path(key)
+        try:
+            data = f.read_bytes()
+        except FileNotFoundError:
+            return None
+        header, body = data.split(b'\n', 1)
+        meta = json.loads(header)
+        obtained_utc = datetime.utcfromtimestamp(meta['obtained_utc'])
+        fresh = datetime.utcnow() - obtained_utc < self.ttl
+        with self._lock:
+            if key in self._sizes:
+                self._sizes.move_to_end(key)
+        try:
+            os.utime(f)
+        except FileNotFoundError: # pragma: no cover
+            pass
+        return CacheEntry(body, obtained_utc, meta.get('etag'),
+                          meta.get('last_modified'), fresh)
+
+    def set(self, url: str, params: Optional[Dict], body: bytes,
+            obtained_utc: Optional[datetime] = None,
+            etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> None:
+        """ Cache the response for a request, evicting least recently used
+        responses if ``max_size`` is exceeded.
+        """
+        obtained_utc = obtained_utc or datetime.utcnow()
+        timestamp = (obtained_utc - datetime(1970, 1, 1)).total_seconds()
+        meta = {'url': url, 'params': params, 'obtained_utc': timestamp,
+                'etag': etag, 'last_modified': last_modified}
+        data = json.dumps(meta, default=str).encode('utf-8') + b'\n' + body
+        key = self.key(url, params)
+        f = self._path(key)
+        tmp = f.with_name(f"{f.name}.{os.getpid()}.{threading.get_ident()}")
+        tmp.write_bytes(data)
+        os.replace(str(tmp), str(f))
+        with self._lock:
+            self._size += len(data) - self._sizes.pop(key, 0)
+            self._sizes[key] = len(data)
+            self._evict()
+
+    def refresh(self, url: str, params: Optional[Dict],
+                entry: CacheEntry) -> CacheEntry:
+        """ Mark a revalidated entry as obtained now. """
+        entry = CacheEntry(entry.body, datetime.utcnow(), entry.etag,
+                           entry.last_modified, True)
+        self.set(url, params, entry.body, entry.obtained_utc, entry.etag,
+                 entry.last_modified)
+        return entry
+
+    def _evict(self) -> None:
+        while self.max_size is not None and self._size > self.max_size:
+            key, size = self._sizes.popitem(last=False)
+            self._size -= size
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError: # pragma: no cover
+                pass
+
+    def clear(self) -> None:
+        """ Remove all cached responses. """
+        with self._lock:
+            for key in self._sizes:
+                try:
+                    self._path(key).unlink()
+                except FileNotFoundError: # pragma: no cover
+                    pass
+            self._sizes.clear()
+            self._size = 0
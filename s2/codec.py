@@ -0,0 +1,158 @@
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
+
+from typing import Any, Dict, Union, Optional, Type
+
+
+class JsonCodec(ABC):
+    """ Serializes and deserializes jsons for :mod:`s2.api` and
+    :mod:`s2.store`.
+
+    Subclasses implement :meth:`loads` and :meth:`dumps` with a specific
+    json library. Values that are not natively serializable (e.g. the
+    ``obtained_utc`` :class:`~datetime.datetime` of models) are encoded like
+    :meth:`pydantic.BaseModel.json` does, i.e. ``datetime`` as ISO 8601
+    strings, which are parsed back into ``datetime`` by the models.
+    """
+    name: str = ''
+
+    @abstractmethod
+    def loads(self, s: Union[bytes, str]) -> Any:
+        """ Deserialize a json document. """
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        """ Serialize ``obj`` into a UTF-8 encoded json document. """
+
+    def dumps_model(self, m: BaseModel) -> bytes:
+        """ Serialize a model (e.g. :class:`.S2Paper`), equivalent to
+        ``m.json().encode()``.
+        """
+        return self.dumps(m.dict())
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}()"
+
+
+class StdlibCodec(JsonCodec):
+    """ :class:`JsonCodec` using the standard library :mod:`json` module. """
+    name = 'json'
+
+    def loads(self, s: Union[bytes, str]) -> Any:
+        return json.loads(s)
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, default=pydantic_encoder).encode('utf-8')
+
+
+class OrjsonCodec(JsonCodec):
+    """ :class:`JsonCodec` using `orjson <https://github.com/ijl/orjson>`_.
+    """
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def loads(self, s: Union[bytes, str]) -> Any:
+        return self._orjson.loads(s)
+
+    def dumps(self, obj: Any) -> bytes:
+        # naive datetimes are serialized like datetime.isoformat
+        return self._orjson.dumps(obj, default=pydantic_encoder)
+
+
+class UjsonCodec(JsonCodec):
+    """ :class:`JsonCodec` using `ujson <https://github.com/ultrajson/ultrajson>`_
+    (version 5.4 or later).
+    """
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def loads(self, s: Union[bytes, str]) -> Any:
+        return self._ujson.loads(s)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._ujson.dumps(obj, default=_encode, ensure_ascii=False,
+                                 escape_forward_slashes=False).encode('utf-8')
+
+
+def _encode(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return pydantic_encoder(obj)
+
+
+CODECS: Dict[str, Type[JsonCodec]] = {
+    'json': StdlibCodec,
+    'orjson': OrjsonCodec,
+    'ujson': UjsonCodec,
+}
+
+_codec: JsonCodec = StdlibCodec()
+
+
+def _fastest_codec() -> JsonCodec:
+    for name in ('orjson', 'ujson'):
+        try:
+            return CODECS[name]()
+        except ImportError:
+            pass
+    return StdlibCodec()
+
+
+def get_codec() -> JsonCodec:
+    """ Get the :class:`JsonCodec` currently used by PyS2. """
+    return _codec
+
+
+def set_codec(codec: Union[str, JsonCodec]) -> JsonCodec:
+    """ Set the :class:`JsonCodec` used by :mod:`s2.api` and the datastores in
+    :mod:`s2.store` (and the deprecated :mod:`s2.db`), returning the previous
+    codec.
+
+    .. code-block:: python
+
+        s2.codec.set_codec("orjson")
+
+    Jsons written with one codec can be read with any other.
+
+    Args:
+        codec (:obj:`str` or :class:`JsonCodec`):
+            Either a :class:`JsonCodec` instance, ``"json"`` (standard
+            library, the default), ``"orjson"``, ``"ujson"``, or ``"auto"``
+            for the fastest of these that is installed.
+    """
+    global _codec
+    previous = _codec
+    if isinstance(codec, JsonCodec):
+        _codec = codec
+    elif codec == 'auto':
+        _codec = _fastest_codec()
+    elif codec in CODECS:
+        try:
+            _codec = CODECS[codec]()
+        except ImportError as e:
+            raise ImportError(f"{codec} must be installed to use it as "
+                              f"json codec") from e
+    else:
+        raise ValueError(f"Unknown json codec {codec!r}; expected one of "
+                         f"{', '.join(CODECS)} or 'auto'")
+    return previous
+
+
+def loads(s: Union[bytes, str], codec: Optional[JsonCodec] = None) -> Any:
+    """ Deserialize a json document with the current (or given) codec. """
+    return (codec or _codec).loads(s)
+
+
+def dumps(obj: Any, codec: Optional[JsonCodec] = None) -> bytes:
+    """ Serialize ``obj`` to json bytes with the current (or given) codec. """
+    return (codec or _codec).dumps(obj)
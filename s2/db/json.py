@@ -1,13 +1,14 @@
+from s2 import codec
 from s2.models import S2Paper, S2Author
+from s2.store.manifest import KeyManifest
 from typing import MutableMapping
 from pathlib import Path
-import json
 import warnings
 
 import logging
 logger = logging.getLogger("s2")
 
-from typing import Iterator, Union
+from typing import Iterator, Union, Set
 
 PaperId = str
 AuthorId = str
@@ -47,14 +48,26 @@ class JsonS2PaperDB(MutableMapping):
     Attributes:
         paperIds (`set` of `str`):
             In-memory lookup of existing keys, updated whenever a key is
-            added or removed. Will likely be updated to something less scrappy.
+            added or removed, and persisted in ``{json_dir}/.manifest`` so
+            that ``json_dir`` is only listed until the manifest is created by
+            the first write, or when it is older than ``json_dir`` (or by
+            :meth:`rebuild_manifest`).
     """
     def __init__(self, json_dir: Union[str, Path], enforce_id: bool = True):
         warnings.warn("s2.db is deprecated; please use s2.store instead")
         self.json_dir = Path(json_dir).absolute()
         self.json_dir.mkdir(exist_ok=True, parents=True)
         self.enforce_id = enforce_id
-        self.paperIds = set([f.stem for f in self.json_dir.glob("*.json")])
+        self.manifest = KeyManifest(self.json_dir / ".manifest")
+        self.paperIds = self.manifest.keys(self._scan)
+
+    def _scan(self) -> Set[str]:
+        return set([f.stem for f in self.json_dir.glob("*.json")])
+
+    def rebuild_manifest(self) -> None:
+        """ Rebuild the manifest of keys by listing ``json_dir``. """
+        self.paperIds = self._scan()
+        self.manifest.write(self.paperIds)
 
     def _check_key_type(self, k: PaperId):
         if type(k) is not str:
@@ -81,12 +94,16 @@ class JsonS2PaperDB(MutableMapping):
         self._check_file_exists(f)
         self.paperIds.remove(k)
         f.unlink()
+        if not self.manifest.exists():
+            self.rebuild_manifest()
+        else:
+            self.manifest.remove(k)
 
     def __getitem__(self, k: PaperId) -> S2Paper:
         self._check_key_type(k)
         f = (self.json_dir / f"{k}.json")
         self._check_file_exists(f)
-        return S2Paper(**json.loads(f.read_text()))
+        return S2Paper(**codec.loads(f.read_bytes()))
 
     def __len__(self) -> int:
         return len(self.paperIds)
@@ -100,8 +117,12 @@ class JsonS2PaperDB(MutableMapping):
         if self.enforce_id:
             self._check_key_value(k, v)
         f = (self.json_dir / f"{k}.json")
-        f.write_text(v.json())
-        self.paperIds.add(k)
+        f.write_bytes(codec.get_codec().dumps_model(v))
+        if not self.manifest.exists():
+            self.rebuild_manifest()
+        elif k not in self.paperIds:
+            self.paperIds.add(k)
+            self.manifest.add(k)
 
 
 class JsonS2AuthorDB(MutableMapping):
@@ -138,13 +159,25 @@ class JsonS2AuthorDB(MutableMapping):
     Attributes:
         authorIds (`set` of `str`):
             In-memory lookup of existing keys, updated whenever a key is
-            added or removed. Will likely be updated to something less scrappy.
+            added or removed, and persisted in ``{json_dir}/.manifest`` so
+            that ``json_dir`` is only listed until the manifest is created by
+            the first write, or when it is older than ``json_dir`` (or by
+            :meth:`rebuild_manifest`).
     """
     def __init__(self, json_dir: Union[str, Path], enforce_id: bool = True):
         self.json_dir = Path(json_dir).absolute()
         self.json_dir.mkdir(exist_ok=True, parents=True)
         self.enforce_id = enforce_id
-        self.authorIds = set([f.stem for f in self.json_dir.glob("*.json")])
+        self.manifest = KeyManifest(self.json_dir / ".manifest")
+        self.authorIds = self.manifest.keys(self._scan)
+
+    def _scan(self) -> Set[str]:
+        return set([f.stem for f in self.json_dir.glob("*.json")])
+
+    def rebuild_manifest(self) -> None:
+        """ Rebuild the manifest of keys by listing ``json_dir``. """
+        self.authorIds = self._scan()
+        self.manifest.write(self.authorIds)
 
     def _check_key_type(self, k: AuthorId):
         if type(k) is not str:
@@ -171,12 +204,16 @@ class JsonS2AuthorDB(MutableMapping):
         self._check_file_exists(f)
         self.authorIds.remove(k)
         f.unlink()
+        if not self.manifest.exists():
+            self.rebuild_manifest()
+        else:
+            self.manifest.remove(k)
 
     def __getitem__(self, k: AuthorId) -> S2Author:
         self._check_key_type(k)
         f = (self.json_dir / f"{k}.json")
         self._check_file_exists(f)
-        return S2Author(**json.loads(f.read_text()))
+        return S2Author(**codec.loads(f.read_bytes()))
 
     def __len__(self) -> int:
         return len(self.authorIds)
@@ -190,5 +227,9 @@ class JsonS2AuthorDB(MutableMapping):
         if self.enforce_id:
             self._check_key_value(k, v)
         f = (self.json_dir / f"{k}.json")
-        f.write_text(v.json())
-        self.authorIds.add(k)
\ No newline at end of file
+        f.write_bytes(codec.get_codec().dumps_model(v))
+        if not self.manifest.exists():
+            self.rebuild_manifest()
+        elif k not in self.authorIds:
+            self.authorIds.add(k)
+            self.manifest.add(k)
\ No newline at end of file
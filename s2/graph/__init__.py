@@ -8,3 +8,4 @@ from s2.graph.graph import GraphPath, GraphPathT, S2Graph
 
 from s2.graph.hopper import *
 from s2.graph.builder import S2GraphBuilder
+from s2.graph.csr import CSRGraph
\ No newline at end of file
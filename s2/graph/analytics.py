@@ -0,0 +1,326 @@
+try:
+    import numpy as np
+except ImportError as e: # pragma: no cover
+    raise ImportError("s2.graph.analytics requires numpy, which can be "
+                      "installed with `pip install pys2[numpy]`") from e
+from s2.graph.graph import S2Graph, PaperIdT
+from s2.graph.csr import CSRGraph
+from bisect import bisect_left
+
+from typing import Dict, List, Tuple, Union, Optional, Iterable
+
+import logging
+logger = logging.getLogger('s2')
+
+
+def _unique(keys: np.ndarray) -> np.ndarray:
+    """ Sorted unique values, faster than :func:`numpy.unique` for large
+    arrays of integers in recent versions.
+    """
+    keys = np.sort(keys)
+    if not len(keys):
+        return keys
+    return keys[np.concatenate([[True], keys[1:] != keys[:-1]])]
+
+
+def _csr(rows: np.ndarray, cols: np.ndarray, n: int
+         ) -> Tuple[np.ndarray, np.ndarray]:
+    """ CSR offsets and column indices of edges sorted by row. """
+    order = np.argsort(rows, kind='stable')
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols[order].astype(np.int32)
+
+
+def _gather(indptr: np.ndarray, indices: np.ndarray, rows: np.ndarray
+            ) -> np.ndarray:
+    """ Concatenated neighbours of ``rows``, without looping in Python. """
+    starts, ends = indptr[rows], indptr[rows + 1]
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if not total:
+        return indices[:0]
+    # position of each gathered element in indices
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return indices[offsets + np.arange(total)]
+
+
+class CitationGraph:
+    """NumPy adjacency of the citations between the papers of a graph.
+
+    An edge from ``u`` to ``v`` means that paper ``u`` cites paper ``v``,
+    whether it was recorded as a ``"reference"`` of ``u`` or as a
+    ``"citation"`` of ``v`` (duplicates are merged). Papers are identified by
+    their index in :attr:`nodes`, which are sorted; the results of analytics
+    are arrays aligned with :attr:`nodes` (see :meth:`as_dict`).
+
+    .. code-block:: python
+
+        from s2.graph.analytics import CitationGraph, pagerank
+
+        cg = CitationGraph.from_graph(builder.graph)
+        scores = cg.as_dict(pagerank(cg))
+
+    Args:
+        nodes (:obj:`list` of :class:`PaperId`):
+            Sorted identifiers of the papers.
+        src (:obj:`numpy.ndarray`):
+            Indices of citing papers.
+        dst (:obj:`numpy.ndarray`):
+            Indices of cited papers, aligned with ``src``.
+
+    Attributes:
+        out_indptr, out_indices (:obj:`numpy.ndarray`):
+            Papers cited by paper ``i``, in CSR format, i.e.
+            ``out_indices[out_indptr[i]:out_indptr[i+1]]``.
+        in_indptr, in_indices (:obj:`numpy.ndarray`):
+            Papers citing paper ``i``, in CSR format.
+    """
+    def __init__(self, nodes: List[PaperIdT], src: np.ndarray,
+                 dst: np.ndarray):
+        self.nodes = nodes
+        n = len(nodes)
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        keys = _unique(src * n + dst)
+        src, dst = keys // n, keys % n
+        self.out_indptr, self.out_indices = _csr(src, dst, n)
+        self.in_indptr, self.in_indices = _csr(dst, src, n)
+
+    @classmethod
+    def from_graph(cls, graph: Union[S2Graph, CSRGraph]) -> 'CitationGraph':
+        """ Citations between the papers of an :class:`S2Graph` or
+        :class:`CSRGraph`.
+        """
+        if not isinstance(graph, CSRGraph):
+            graph = CSRGraph.from_s2graph(
+                graph, edge_types=('reference', 'citation'))
+        n = graph.num_nodes
+        src, dst = [], []
+        for edge_type, (offsets, targets, _) in graph.adjacency.items():
+            if edge_type not in ('reference', 'citation'):
+                continue
+            offsets = np.frombuffer(offsets, dtype=np.uint64).astype(np.int64)
+            sources = np.repeat(np.arange(n, dtype=np.int64),
+                                np.diff(offsets))
+            targets = np.frombuffer(targets, dtype=np.uint32).astype(np.int64)
+            if edge_type == 'reference':
+                src.append(sources)
+                dst.append(targets)
+            else:
+                src.append(targets)
+                dst.append(sources)
+        empty = np.zeros(0, dtype=np.int64)
+        return cls(graph.nodes, np.concatenate(src or [empty]),
+                   np.concatenate(dst or [empty]))
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.out_indices)
+
+    def node_id(self, paperId: PaperIdT) -> int:
+        """ Index of a paper in :attr:`nodes`. """
+        i = bisect_left(self.nodes, paperId)
+        if i == len(self.nodes) or self.nodes[i] != paperId:
+            raise KeyError(paperId)
+        return i
+
+    def as_dict(self, values: np.ndarray) -> Dict[PaperIdT, float]:
+        """ Map the values of an array aligned with :attr:`nodes` to their
+        :class:`PaperId`.
+        """
+        return dict(zip(self.nodes, values.tolist()))
+
+
+def in_degree(cg: CitationGraph) -> np.ndarray:
+    """ Number of citations of each paper within the graph. """
+    return np.diff(cg.in_indptr)
+
+
+def out_degree(cg: CitationGraph) -> np.ndarray:
+    """ Number of references of each paper within the graph. """
+    return np.diff(cg.out_indptr)
+
+
+def pagerank(cg: CitationGraph, damping: float = 0.85, tol: float = 1e-6,
+             max_iter: int = 100) -> np.ndarray:
+    """ PageRank of each paper, computed by power iteration.
+
+    The rank of papers without references within the graph is distributed
+    uniformly to all papers.
+
+    Args:
+        cg (:class:`CitationGraph`):
+            Citation graph.
+        damping (:obj:`float`, optional):
+            Probability of following a citation rather than jumping to a
+            random paper. Defaults to ``0.85``.
+        tol (:obj:`float`, optional):
+            Convergence tolerance per paper, on the L1 norm of the change of
+            ranks. Defaults to ``1e-6``.
+        max_iter (:obj:`int`, optional):
+            Maximum number of iterations. Defaults to ``100``.
+
+    Returns:
+        :obj:`numpy.ndarray`: Ranks summing to 1, aligned with
+        :attr:`CitationGraph.nodes`.
+    """
+    n = cg.num_nodes
+    if not n:
+        return np.zeros(0)
+    out_deg = out_degree(cg)
+    dangling = out_deg == 0
+    src = np.repeat(np.arange(n), out_deg)
+    dst = cg.out_indices
+    inv_deg = 1.0 / np.maximum(out_deg, 1)
+    r = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        spread = np.bincount(dst, weights=(r * inv_deg)[src], minlength=n)
+        r_new = damping * spread + \
+            (damping * r[dangling].sum() + 1 - damping) / n
+        err = np.abs(r_new - r).sum()
+        r = r_new
+        if err < n * tol:
+            break
+    else:
+        logger.warning(f'PageRank did not converge in {max_iter} iterations')
+    return r
+
+
+def hits(cg: CitationGraph, tol: float = 1e-8, max_iter: int = 100
+         ) -> Tuple[np.ndarray, np.ndarray]:
+    """ HITS hub and authority scores of each paper.
+
+    Papers citing good authorities are good hubs (e.g. surveys), and papers
+    cited by good hubs are good authorities.
+
+    Args:
+        cg (:class:`CitationGraph`):
+            Citation graph.
+        tol (:obj:`float`, optional):
+            Convergence tolerance per paper, on the L1 norm of the change of
+            hub scores. Defaults to ``1e-8``.
+        max_iter (:obj:`int`, optional):
+            Maximum number of iterations. Defaults to ``100``.
+
+    Returns:
+        :obj:`tuple` of :obj:`numpy.ndarray`: Hub and authority scores,
+        each summing to 1, aligned with :attr:`CitationGraph.nodes`.
+    """
+    n = cg.num_nodes
+    if not cg.num_edges:
+        return np.zeros(n), np.zeros(n)
+    src = np.repeat(np.arange(n), out_degree(cg))
+    dst = cg.out_indices
+    h = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        a = np.bincount(dst, weights=h[src], minlength=n)
+        a /= a.sum()
+        h_new = np.bincount(src, weights=a[dst], minlength=n)
+        h_new /= h_new.sum()
+        err = np.abs(h_new - h).sum()
+        h = h_new
+        if err < n * tol:
+            break
+    else:
+        logger.warning(f'HITS did not converge in {max_iter} iterations')
+    a = np.bincount(dst, weights=h[src], minlength=n)
+    return h, a / a.sum()
+
+
+def k_core(cg: CitationGraph) -> np.ndarray:
+    """ Core number of each paper, i.e. the largest ``k`` such that the
+    paper belongs to a subgraph where every paper has at least ``k``
+    citations or references (ignoring direction and self-citations).
+    """
+    n = cg.num_nodes
+    src = np.repeat(np.arange(n), out_degree(cg))
+    dst = cg.out_indices.astype(np.int64)
+    keep = src != dst
+    # undirected, without duplicates of mutual citations
+    keys = _unique(np.concatenate([src[keep] * n + dst[keep],
+                                     dst[keep] * n + src[keep]]))
+    indptr, indices = _csr(keys // n, keys % n, n)
+    degree = np.diff(indptr)
+    core = np.zeros(n, dtype=np.int64)
+    active = np.ones(n, dtype=bool)
+    k = 0
+    while active.any():
+        k = max(k, int(degree[active].min()))
+        # peel papers of degree <= k, then their neighbours whose degree
+        # dropped to k, until none remain
+        peel = np.flatnonzero(active & (degree <= k))
+        while len(peel):
+            core[peel] = k
+            active[peel] = False
+            neighbours = _gather(indptr, indices, peel)
+            neighbours, counts = np.unique(neighbours, return_counts=True)
+            degree[neighbours] -= counts
+            peel = neighbours[active[neighbours] & (degree[neighbours] <= k)]
+    return core
+
+
+def _top_k(cg: CitationGraph, i: int, first: Tuple[np.ndarray, np.ndarray],
+           second: Tuple[np.ndarray, np.ndarray], k: int
+           ) -> List[Tuple[PaperIdT, int]]:
+    """ Papers with the most paths of two hops from ``i`` through ``first``
+    then ``second``, with their number of paths.
+    """
+    hop = _gather(*first, np.array([i]))
+    others = _gather(*second, hop.astype(np.int64))
+    others = others[others != i]
+    if not len(others):
+        return []
+    ids, counts = np.unique(others, return_counts=True)
+    # most paths first, ties broken by PaperId (nodes are sorted)
+    order = np.lexsort((ids, -counts))[:k]
+    return [(cg.nodes[j], int(c))
+            for j, c in zip(ids[order].tolist(), counts[order].tolist())]
+
+
+def _per_paper(cg: CitationGraph, papers: Optional[Iterable[PaperIdT]],
+               first: Tuple[np.ndarray, np.ndarray],
+               second: Tuple[np.ndarray, np.ndarray], k: int
+               ) -> Dict[PaperIdT, List[Tuple[PaperIdT, int]]]:
+    ids = range(cg.num_nodes) if papers is None else \
+        [cg.node_id(p) for p in papers]
+    return {cg.nodes[i]: _top_k(cg, i, first, second, k) for i in ids}
+
+
+def cocitation(cg: CitationGraph, k: int = 10,
+               papers: Optional[Iterable[PaperIdT]] = None,
+               ) -> Dict[PaperIdT, List[Tuple[PaperIdT, int]]]:
+    """ Papers most often cited together with each paper.
+
+    Args:
+        cg (:class:`CitationGraph`):
+            Citation graph.
+        k (:obj:`int`, optional):
+            Number of co-cited papers per paper. Defaults to ``10``.
+        papers (:obj:`Iterable` of :class:`PaperId`, optional):
+            Papers for which to find co-cited papers. Defaults to all papers.
+
+    Returns:
+        :obj:`dict`: For each paper, a list of at most ``k`` co-cited papers
+        with the number of papers citing both, most co-cited first.
+    """
+    return _per_paper(cg, papers, (cg.in_indptr, cg.in_indices),
+                      (cg.out_indptr, cg.out_indices), k)
+
+
+def coupling(cg: CitationGraph, k: int = 10,
+             papers: Optional[Iterable[PaperIdT]] = None,
+             ) -> Dict[PaperIdT, List[Tuple[PaperIdT, int]]]:
+    """ Papers sharing the most references with each paper (bibliographic
+    coupling). See :func:`cocitation` for arguments.
+
+    Returns:
+        :obj:`dict`: For each paper, a list of at most ``k`` coupled papers
+        with their number of shared references, most coupled first.
+    """
+    return _per_paper(cg, papers, (cg.out_indptr, cg.out_indices),
+                      (cg.in_indptr, cg.in_indices), k)
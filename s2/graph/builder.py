@@ -5,13 +5,17 @@ from s2.graph import GraphHopper, MaxHopHopper, S2Graph, EdgeType, GraphPath, Pa
 from collections import deque
 import requests
 import hashlib
+import json
+import os
 from pathlib import Path
 from datetime import datetime
 import time
 import pickle
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, Future
+from itertools import islice
 
-from typing import Optional, Dict, Deque, Set, Union, List
+from typing import Optional, Dict, Deque, Set, Union, List, Any
 
 
 import logging
@@ -22,7 +26,6 @@ logger.setLevel(logging.INFO)
 # TODO: docstring
 # TODO: hopper in method or attribute?
 # TODO: currently scraping ~1 paper/s; profile to find bottleneck
-# TODO: look into batch/async requests
 
 
 class S2GraphBuilder:
@@ -31,7 +34,7 @@ class S2GraphBuilder:
     Args:
         graph:
             The :class:`S2Graph` object to build or
-            continue buiding.
+            continue buiding. Defaults to a new :class:`S2Graph`.
         hopper:
             The :class:`GraphHopper` object that
             defines the strategy for building the citation
@@ -40,7 +43,7 @@ class S2GraphBuilder:
             A queue of papers that remain to be added. Everytime
             a paper is added, all its neighbours are added to the
             queue and the ``hopper`` will decide whether these papers
-            should also be added.
+            should also be added. Defaults to a new :obj:`deque`.
         discovered_from:
             A dictionary for reconstructing graph paths.
         not_found:
@@ -52,23 +55,59 @@ class S2GraphBuilder:
             Log updates every x paper added.
         save_path:
             Where to save progress in event of interruption.
+        journal_path:
+            If given, every change made to the builder when adding a paper
+            (papers pushed to or popped from the queue, ``discovered_from``
+            entries, edges, ``not_found`` papers) is appended to this
+            journal file, one line per paper. If the journal exists, it is
+            replayed when the builder is created (or loaded with
+            :meth:`load`, from where it was when saved), so that a build
+            killed at any point (e.g. out of memory or preempted) can be
+            resumed by creating the builder again with the same arguments.
+            If interrupted while adding a paper, its changes are undone
+            before the builder is saved, and the paper is added again.
+            Papers themselves are saved in ``graph.papers``, which should
+            be a persistent :class:`S2DataStore` to avoid fetching them again.
+            The journal is closed with :meth:`close`, or when the builder is
+            used as a context manager.
+        journal_every:
+            Write the journal to disk every x paper added.
+        journal_interval:
+            Write the journal to disk at least every x seconds while papers
+            are added.
+        workers:
+            Number of threads fetching papers from the API in parallel.
+            Papers at the front of the queue are fetched ahead of time,
+            while papers are still added one at a time in the order of the
+            queue, so that hopper decisions, ``discovered_from`` and edges
+            are the same as when fetching papers sequentially (``1``).
+            Any ``session`` or ``rate_limiter`` in ``api_kwargs`` is shared
+            by the threads.
+        prefetch:
+            Number of papers at the front of the queue being fetched ahead
+            of time with ``workers``. Defaults to ``4 * workers``.
         **api_kwargs:
             Additional kwargs for the ::`` module.
     """
     def __init__(self,
-                 graph: S2Graph = S2Graph(),
+                 graph: Optional[S2Graph] = None,
                  hopper: GraphHopper = MaxHopHopper(1),
-                 queue: Deque = deque(),
+                 queue: Optional[Deque] = None,
                  discovered_from: Dict[PaperId, HopFrom] = None,
                  not_found: Set = None,
                  colliding_paperIds: Dict[PaperId, Set[PaperId]] = None,
                  log_every: int = 10,
                  save_path: Union[str, Path] = None,
+                 journal_path: Union[str, Path] = None,
+                 journal_every: int = 100,
+                 journal_interval: float = 5.0,
+                 workers: int = 1,
+                 prefetch: Optional[int] = None,
                  **api_kwargs
                  ):
-        self.graph = graph
+        self.graph = S2Graph() if graph is None else graph
         self.hopper = hopper
-        self.queue = queue
+        self.queue = deque() if queue is None else queue
         self.discovered_from = discovered_from or {}
         self.not_found = not_found or set()
         self.colliding_paperIds = colliding_paperIds or defaultdict(set)
@@ -77,6 +116,178 @@ class S2GraphBuilder:
         self.save_path = Path(save_path or self._default_save_path())
         self.api_kwargs = api_kwargs or {}
 
+        self.workers = workers
+        self.prefetch = prefetch
+        # papers being fetched ahead of time by build_from_queue
+        self._prefetched: Dict[PaperId, Future] = {}
+
+        self.journal_path = Path(journal_path) if journal_path else None
+        self.journal_every = journal_every
+        self.journal_interval = journal_interval
+        # size of the journal already applied to this builder
+        self._journal_offset = 0
+        self._open_journal()
+
+    def _open_journal(self) -> None:
+        self._journal = None
+        # paper being added and its changes, and changes of added papers not
+        # yet written to the journal
+        self._adding: Optional[PaperId] = None
+        self._step: Optional[Dict[str, Any]] = None
+        self._journal_buffer: List[bytes] = []
+        self._journal_flushed = time.monotonic()
+        if self.journal_path is None:
+            return
+        if self.journal_path.exists():
+            self._replay_journal()
+        self._journal = open(self.journal_path, 'ab')
+
+    def _replay_journal(self) -> None:
+        """ Apply the changes in the journal after ``_journal_offset``. """
+        n = 0
+        with open(self.journal_path, 'rb') as f:
+            f.seek(self._journal_offset)
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError
+                    step = json.loads(line)
+                except ValueError:
+                    # step interrupted while being written
+                    break
+                self._apply_step(step)
+                self._journal_offset += len(line)
+                n += 1
+        if self._journal_offset < self.journal_path.stat().st_size:
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(self._journal_offset)
+        logger.info(f'Replayed {n} steps from {self.journal_path}')
+
+    def _apply_step(self, step: Dict[str, Any]) -> None:
+        for a, b in step.get('c', ()):
+            self.colliding_paperIds[a].add(b)
+            self.colliding_paperIds[b].add(a)
+        for pid, source, edge_type in step.get('q', ()):
+            self.queue.append(pid)
+            self.discovered_from[pid] = (source, edge_type)
+        for pid, source, edge_type, ref in step.get('u', ()):
+            if pid not in self.graph.papers:
+                self.graph.papers[pid] = S2Paper(**ref)
+            self.discovered_from[pid] = (source, edge_type)
+        for source, edge_type, pid, intent, influential in step.get('e', ()):
+            edge_meta = {'intent': intent, 'isInfluential': influential}
+            self.graph.edges[source][edge_type] += [(pid, edge_meta)]
+        pid = step.get('p')
+        if pid is not None:
+            if not self.queue or self.queue[0] != pid:
+                raise ValueError(f'Journal {self.journal_path} does not '
+                                 f'match the queue of the builder at {pid}')
+            if step.get('nf'):
+                self.not_found.add(pid)
+            else:
+                _ = self.graph.edges[pid]
+            _ = self.queue.popleft()
+
+    def _record(self, key: str, change: List) -> None:
+        """ Record a change of the paper being added, for the journal or to
+        undo it with :meth:`_rollback`.
+        """
+        if self._step is None:
+            self._step = {}
+        self._step.setdefault(key, []).append(change)
+
+    def _commit(self, pid: Optional[PaperId] = None,
+                not_found: bool = False) -> None:
+        """ Finish the journal step of a paper, which was popped from the
+        queue, and write the journal if it is due.
+        """
+        step = self._step or {}
+        self._step = None
+        self._adding = None
+        if self.journal_path is None:
+            return
+        if pid is not None:
+            step['p'] = pid
+        if not_found:
+            step['nf'] = True
+        self._journal_buffer.append(json.dumps(step).encode('utf-8') + b'\n')
+        if len(self._journal_buffer) >= self.journal_every or \
+                time.monotonic() - self._journal_flushed >= \
+                self.journal_interval:
+            self.flush_journal()
+
+    def _rollback(self) -> None:
+        """ Undo the changes of the paper being added when interrupted, so
+        that the builder is as it was before the paper (and as written in
+        the journal) and adds the paper again when resumed.
+        """
+        step = self._step or {}
+        pid = self._adding
+        self._step = None
+        self._adding = None
+        for source, edge_type, *_ in reversed(step.get('e', ())):
+            _ = self.graph.edges[source][edge_type].pop()
+        for child, _, _ in reversed(step.get('q', ())):
+            _ = self.queue.pop()
+            del self.discovered_from[child]
+        # unknown papers are added again as they were
+        if pid is not None:
+            if pid in self.graph.edges and \
+                    not any(self.graph.edges[pid].values()):
+                del self.graph.edges[pid]
+            if not self.queue or self.queue[0] != pid:
+                self.queue.appendleft(pid)
+        if 'c' in step:
+            # the papers with inconsistent identifiers are already saved
+            # and won't be fetched again
+            self._step = {'c': step['c']}
+            self._commit()
+
+    def flush_journal(self) -> None:
+        """ Write the journal of papers already added to disk. """
+        self._journal_flushed = time.monotonic()
+        if self._journal is None or not self._journal_buffer:
+            return
+        data = b''.join(self._journal_buffer)
+        self._journal.write(data)
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._journal_offset += len(data)
+        self._journal_buffer.clear()
+
+    def close(self) -> None:
+        """ Write the journal to disk and close it. """
+        self.flush_journal()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def __enter__(self) -> 'S2GraphBuilder':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __getstate__(self):
+        # only changes written to the journal are part of the saved state;
+        # changes of the paper being added are replayed from the journal
+        # or made again
+        self.flush_journal()
+        state = self.__dict__.copy()
+        for k in ('_journal', '_adding', '_step', '_journal_buffer',
+                  '_journal_flushed', '_prefetched'):
+            state.pop(k, None)
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault('journal_path', None)
+        state.setdefault('_journal_offset', 0)
+        state.setdefault('workers', 1)
+        state.setdefault('prefetch', None)
+        state['_prefetched'] = {}
+        self.__dict__.update(state)
+        self._open_journal()
+
     def _default_save_path(self) -> str:
         t = time.time()
         f = datetime.utcfromtimestamp(t).strftime('%Y%m%d-%H%M%S-%f')[:-3]
@@ -121,10 +332,15 @@ class S2GraphBuilder:
         try:
             return self.graph.papers[paperId]
         except KeyError:
-            s2_paper = api._get_s2paper(paperId, **self.api_kwargs)
+            future = self._prefetched.pop(paperId, None)
+            if future is not None:
+                s2_paper = future.result()
+            else:
+                s2_paper = api._get_s2paper(paperId, **self.api_kwargs)
             if s2_paper.paperId != paperId: # pragma: no cover
                 self.colliding_paperIds[paperId].add(s2_paper.paperId)
                 self.colliding_paperIds[s2_paper.paperId].add(paperId)
+                self._record('c', [paperId, s2_paper.paperId])
                 self.graph.papers[s2_paper.paperId] = s2_paper
                 s2_paper.paperId = paperId
             self.graph.papers[paperId] = s2_paper
@@ -142,23 +358,25 @@ class S2GraphBuilder:
         if pid and pid not in self.discovered_from:
             self.queue.append(pid)
             self.discovered_from[pid] = (source, edge_type)
+            self._record('q', [pid, source, edge_type])
 
         # The ref does not have an S2 identifier; hash it to create one
         # Note: the resulting pid is 40-chars long as with S2Paper identifiers
         if not pid:
-            hash = hashlib.md5(ref.json().encode('utf-8')).hexdigest()
+            ref_json = ref.json()
+            hash = hashlib.md5(ref_json.encode('utf-8')).hexdigest()
             pid = f'unknown_{hash}'
             self.graph.papers[pid] = S2Paper(**ref.dict())
             self.discovered_from[pid] = (source, edge_type)
+            self._record('u', [pid, source, edge_type, json.loads(ref_json)])
 
         # Create a new edge from the source node to the ref
         # TODO: type and document edge metadata dict?
-        # TODO: prevent duplicates in case of error/restart?
-        #      probably a try-except block with intermediary values that can
-        #      be added/removed; however, the worst that can happen is
-        #      duplicated edges which are easy to filter post-hoc
+        # edges are removed by _rollback if adding the source is interrupted
         edge_meta = {'intent': ref.intent, 'isInfluential': ref.isInfluential}
         self.graph.edges[source][edge_type] += [(pid, edge_meta)]
+        self._record('e', [source, edge_type, pid, ref.intent,
+                           ref.isInfluential])
 
     def from_paper_id(self, paperId: str):
         """ Construct :class:`S2Graph` from :class:`PaperId` based on
@@ -172,12 +390,40 @@ class S2GraphBuilder:
         if paperId not in self.discovered_from:
             self.queue.append(paperId)
             self.discovered_from[paperId] = ("", None)
+            self._record('q', [paperId, "", None])
+            self._commit()
         self.build_from_queue()
 
+    def _prefetch_queue(self, executor: ThreadPoolExecutor) -> None:
+        """ Start fetching papers at the front of the queue that aren't in
+        ``graph.papers``.
+        """
+        n = self.prefetch or 4 * self.workers
+        for pid in islice(self.queue, n):
+            if pid not in self._prefetched and pid not in self.graph.papers:
+                self._prefetched[pid] = executor.submit(
+                    api._get_s2paper, pid, **self.api_kwargs)
+
     def build_from_queue(self):
+        if self.workers > 1:
+            executor = ThreadPoolExecutor(self.workers)
+            try:
+                self._build_from_queue(executor)
+            finally:
+                for future in self._prefetched.values():
+                    future.cancel()
+                self._prefetched.clear()
+                executor.shutdown(wait=False)
+        else:
+            self._build_from_queue()
+
+    def _build_from_queue(self, executor: Optional[ThreadPoolExecutor] = None):
         while self.queue:
             try:
                 pid = self.queue[0]
+                self._adding = pid
+                if executor is not None:
+                    self._prefetch_queue(executor)
                 num_papers = len(self.graph.edges)
                 if self.log_every and (num_papers % self.log_every == 0):
                     logger.info(f'Queue: {len(self.queue)}, '
@@ -194,14 +440,17 @@ class S2GraphBuilder:
                 # only pop the paper once everything else is done to allow
                 # retrying if code execution is interrupted.
                 _ = self.queue.popleft()
+                self._commit(pid)
 
             # error handling
             except requests.HTTPError as e: # pragma: no cover
                 if e.response.status_code == 404:
                     self.not_found.add(pid)
                     _ = self.queue.popleft()
+                    self._commit(pid, not_found=True)
                     logger.warning(f'Paper not found: {pid}')
                 else:
+                    self._rollback()
                     self.save()
                     logger.critical(
                         f'Aborting S2Graph construction on: {pid}\n',
@@ -210,13 +459,19 @@ class S2GraphBuilder:
                     raise e
 
             except Exception as e: # pragma: no cover
+                self._rollback()
                 self.save()
                 logger.critical(
                     f'Aborting S2Graph construction on: {pid}\n',
                     exc_info=True
                 )
                 raise e
-            except KeyboardInterrupt: # pragma: no cover
+            except KeyboardInterrupt:
+                self._rollback()
                 self.save()
                 logger.warning(f'Interrupted S2Graph construction on: {pid}\n')
                 raise KeyboardInterrupt
+            except BaseException: # pragma: no cover
+                self._rollback()
+                raise
+        self.flush_journal()
@@ -0,0 +1,375 @@
+from s2.graph.graph import (S2Graph, PaperIdT, EdgeTypeT, EdgeMetaT, EdgeMapT,
+                            EdgeTypeValues, edge_factory)
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+import json
+import mmap
+import os
+import sys
+from pathlib import Path
+
+from typing import Dict, Tuple, Iterator, Optional, Sequence, Union
+
+# citation intents packed in edge flags, in order
+INTENTS = ('background', 'methodology', 'result')
+# edge flags
+INFLUENTIAL = 1
+INFLUENTIAL_UNKNOWN = 2
+INTENT_UNKNOWN = 4
+_INTENT_SHIFT = 3
+
+# offsets of neighbours in targets for each node, targets, and edge flags
+Adjacency = Tuple[array, array, array]
+
+MAGIC = b"S2CSR\x00\x00\x01"
+_ALIGN = 8
+
+
+def pack_meta(meta: EdgeMetaT) -> int:
+    """ Pack the ``intent`` and ``isInfluential`` of an edge in one byte. """
+    flags = 0
+    influential = meta.get('isInfluential')
+    if influential is None:
+        flags |= INFLUENTIAL_UNKNOWN
+    elif influential:
+        flags |= INFLUENTIAL
+    intent = meta.get('intent')
+    if intent is None:
+        flags |= INTENT_UNKNOWN
+    else:
+        for i, x in enumerate(INTENTS):
+            if x in intent:
+                flags |= 1 << (_INTENT_SHIFT + i)
+    return flags
+
+
+def unpack_meta(flags: int) -> EdgeMetaT:
+    """ Inverse of :func:`pack_meta`. """
+    if flags & INTENT_UNKNOWN:
+        intent = None
+    else:
+        intent = [x for i, x in enumerate(INTENTS)
+                  if flags & (1 << (_INTENT_SHIFT + i))]
+    if flags & INFLUENTIAL_UNKNOWN:
+        influential = None
+    else:
+        influential = bool(flags & INFLUENTIAL)
+    return {'intent': intent, 'isInfluential': influential}
+
+
+class _NodeTable(Sequence):
+    """ Read-only sequence of :class:`PaperId` stored as concatenated utf-8
+    strings, e.g. in a memory-mapped file.
+    """
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]],
+                   'utf-8')
+
+    def __iter__(self) -> Iterator[PaperIdT]:
+        blob, offsets = self._blob, self._offsets
+        for i in range(len(self)):
+            yield str(blob[offsets[i]:offsets[i + 1]], 'utf-8')
+
+
+class CSRGraph:
+    """Frozen, compact representation of the edges of an :class:`S2Graph`.
+
+    Papers are interned as integer node ids, which index a sorted table of
+    their :class:`PaperId`. The neighbours of each :class:`EdgeType` are
+    stored in compressed sparse row (CSR) format, i.e. an array of target
+    node ids where the neighbours of node ``i`` are at
+    ``targets[offsets[i]:offsets[i+1]]``, with the ``intent`` and
+    ``isInfluential`` of each edge packed in an array of bytes (see
+    :func:`pack_meta`). Each edge thus takes 5 bytes instead of the several
+    Python objects of :attr:`S2Graph.edges`.
+
+    .. code-block:: python
+
+        csr = CSRGraph.from_s2graph(builder.graph)
+        for paperId in csr.neighbours(root, "citation"):
+            ...
+
+    Note:
+        Intents other than those of :data:`INTENTS` are dropped, and intents
+        of an edge are listed in the order of :data:`INTENTS`.
+
+    Graphs can be saved to a compact binary file with :meth:`save`, which
+    :meth:`load` memory-maps for a near-instant open, sharing its pages
+    between processes reading the same file.
+
+    Args:
+        nodes (:obj:`Sequence` of :class:`PaperId`):
+            Sorted identifiers of all papers, which are sources or targets
+            of edges.
+        added (:obj:`array`):
+            ``1`` for each node that was added to the graph (i.e. is a key
+            of :attr:`S2Graph.edges`), or else ``0``.
+        adjacency (:obj:`dict` of :class:`EdgeType` to :obj:`tuple`):
+            Offsets (of size ``len(nodes) + 1``), targets and flags of the
+            edges of each :class:`EdgeType`.
+    """
+    def __init__(self,
+                 nodes: Sequence[PaperIdT],
+                 added: array,
+                 adjacency: Dict[EdgeTypeT, Adjacency],
+                 ):
+        self.nodes = nodes
+        self.added = added
+        self.adjacency = adjacency
+        # file memory-mapped by load, if any
+        self.path: Optional[Path] = None
+
+    def save(self, path: Union[str, Path]) -> None:
+        """ Save the graph to a binary file.
+
+        The file starts with :data:`MAGIC`, the size of a json header, and
+        the header describing the position of each array in the file, which
+        are aligned to 8 bytes in the byte order of the machine: the
+        offsets of each :class:`PaperId` in a blob of concatenated utf-8
+        strings, then the arrays of :attr:`added` and :attr:`adjacency`.
+        The file is written to a temporary file which is then renamed, so
+        that processes which memory-mapped a previous version keep reading
+        it consistently.
+        """
+        path = Path(path)
+        blobs = [pid.encode('utf-8') for pid in self.nodes]
+        node_offsets = array('Q', [0])
+        for b in blobs:
+            node_offsets.append(node_offsets[-1] + len(b))
+        arrays = [('nodes/offsets', node_offsets),
+                  ('nodes/blob', array('B', b"".join(blobs))),
+                  ('added', self.added)]
+        del blobs
+        for edge_type, adjacency in self.adjacency.items():
+            for name, a in zip(('offsets', 'targets', 'flags'), adjacency):
+                arrays.append((f'{edge_type}/{name}', a))
+        header, position = {}, 0
+        for name, a in arrays:
+            # arrays of loaded graphs may be memoryviews
+            typecode = getattr(a, 'typecode', None) or a.format
+            header[name] = [position, len(a), typecode]
+            position += -(-len(a) * a.itemsize // _ALIGN) * _ALIGN
+        header = json.dumps({'byteorder': sys.byteorder,
+                             'edge_types': list(self.adjacency),
+                             'arrays': header}).encode('utf-8')
+        header += b" " * (-len(header) % _ALIGN)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, 'wb') as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, 'little'))
+            f.write(header)
+            for _, a in arrays:
+                b = memoryview(a).cast('B')
+                f.write(b)
+                f.write(bytes(-len(b) % _ALIGN))
+        os.replace(str(tmp), str(path))
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap_mode: bool = True
+             ) -> 'CSRGraph':
+        """ Load a graph saved with :meth:`save`.
+
+        Args:
+            path (str or :class:`~pathlib.Path`):
+                Path of the file.
+            mmap_mode (`bool`, optional):
+                Memory-map the file read-only instead of reading it, so that
+                opening is near-instant regardless of the size of the graph,
+                and only the pages that are accessed are read (and shared
+                with other processes). Arrays are then read-only
+                :obj:`memoryview` objects, and :attr:`nodes` decodes
+                identifiers on access. Defaults to ``True``.
+        """
+        path = Path(path)
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a CSRGraph file")
+            size = int.from_bytes(f.read(8), 'little')
+            header = json.loads(f.read(size))
+            start = len(MAGIC) + 8 + size
+            swap = header['byteorder'] != sys.byteorder
+            if mmap_mode and not swap:
+                buffer = memoryview(mmap.mmap(f.fileno(), 0,
+                                              access=mmap.ACCESS_READ))
+            else:
+                buffer = memoryview(f.read())
+                start = 0
+
+        def get(name):
+            position, n, typecode = header['arrays'][name]
+            itemsize = array(typecode).itemsize
+            b = buffer[start + position:start + position + n * itemsize]
+            if mmap_mode and not swap:
+                return b.cast(typecode)
+            a = array(typecode)
+            a.frombytes(b)
+            if swap:
+                a.byteswap()
+            return a
+
+        if mmap_mode and not swap:
+            nodes = _NodeTable(get('nodes/offsets'), get('nodes/blob'))
+        else:
+            nodes = list(_NodeTable(get('nodes/offsets'), get('nodes/blob')))
+        adjacency = {edge_type: tuple(get(f'{edge_type}/{name}') for name in
+                                      ('offsets', 'targets', 'flags'))
+                     for edge_type in header['edge_types']}
+        graph = cls(nodes, get('added'), adjacency)
+        if mmap_mode and not swap:
+            graph.path = path.absolute()
+        return graph
+
+    def __getstate__(self):
+        # memory-mapped graphs are reopened (e.g. by other processes)
+        # rather than copied
+        if self.path is not None:
+            return {'path': self.path}
+        return self.__dict__.copy()
+
+    def __setstate__(self, state):
+        if 'nodes' not in state:
+            state = self.load(state['path']).__dict__
+        self.__dict__.update(state)
+
+    @classmethod
+    def from_s2graph(cls, graph: S2Graph,
+                     edge_types: Optional[Sequence[EdgeTypeT]] = None
+                     ) -> 'CSRGraph':
+        """ Build a :class:`CSRGraph` from the edges of ``graph``.
+
+        Args:
+            graph (:class:`S2Graph`):
+                Graph to convert.
+            edge_types (:obj:`Sequence` of :class:`EdgeType`, optional):
+                Types of edges to convert. Defaults to all of them.
+        """
+        edges = graph.edges
+        edge_types = EdgeTypeValues if edge_types is None else edge_types
+        ids = set(edges)
+        for neighbours in edges.values():
+            for edge_type in edge_types:
+                ids.update(pid for pid, _ in neighbours.get(edge_type, ()))
+        nodes = sorted(ids)
+        del ids
+        # only used while building; lookups use bisect afterwards
+        node_ids = {pid: i for i, pid in enumerate(nodes)}
+        added = array('B', bytes(len(nodes)))
+        for pid in edges:
+            added[node_ids[pid]] = 1
+
+        adjacency = {}
+        for edge_type in edge_types:
+            offsets = array('Q', [0])
+            targets, flags = array('I'), array('B')
+            for pid in nodes:
+                neighbours = edges[pid] if added[node_ids[pid]] else None
+                if neighbours:
+                    for target, meta in neighbours.get(edge_type, ()):
+                        targets.append(node_ids[target])
+                        flags.append(pack_meta(meta))
+                offsets.append(len(targets))
+            adjacency[edge_type] = (offsets, targets, flags)
+        return cls(nodes, added, adjacency)
+
+    def to_edges(self) -> EdgeMapT:
+        """ Convert back to the :class:`EdgeMap` of an :class:`S2Graph`. """
+        edges = defaultdict(edge_factory)
+        for i, pid in enumerate(self.nodes):
+            if not self.added[i]:
+                continue
+            neighbours = edges[pid]
+            for edge_type, (offsets, targets, flags) in \
+                    self.adjacency.items():
+                neighbours[edge_type] = [
+                    (self.nodes[targets[j]], unpack_meta(flags[j]))
+                    for j in range(offsets[i], offsets[i + 1])]
+        return edges
+
+    @property
+    def num_nodes(self) -> int:
+        """ Number of papers, including papers that were not added. """
+        return len(self.nodes)
+
+    def num_edges(self, edge_type: Optional[EdgeTypeT] = None) -> int:
+        """ Number of edges of ``edge_type``, or of all types. """
+        if edge_type is not None:
+            return len(self.adjacency[edge_type][1])
+        return sum(len(t) for _, t, _ in self.adjacency.values())
+
+    @property
+    def nbytes(self) -> int:
+        """ Size of the edge arrays in bytes (excluding the node table). """
+        return len(self.added) + sum(
+            sum(len(a) * a.itemsize for a in arrays)
+            for arrays in self.adjacency.values())
+
+    def node_id(self, paperId: PaperIdT) -> int:
+        """ Integer id of a paper, raising :obj:`KeyError` if it isn't a
+        node of the graph.
+        """
+        i = bisect_left(self.nodes, paperId)
+        if i == len(self.nodes) or self.nodes[i] != paperId:
+            raise KeyError(paperId)
+        return i
+
+    def paper_id(self, i: int) -> PaperIdT:
+        """ :class:`PaperId` of a node id. """
+        return self.nodes[i]
+
+    def neighbour_ids(self, i: int, edge_type: EdgeTypeT
+                      ) -> Sequence[int]:
+        """ Node ids of the neighbours of node ``i``. """
+        offsets, targets, _ = self.adjacency[edge_type]
+        return targets[offsets[i]:offsets[i + 1]]
+
+    def neighbours(self, paperId: PaperIdT, edge_type: EdgeTypeT
+                   ) -> Iterator[PaperIdT]:
+        """ Iterate over the :class:`PaperId` of the neighbours of a paper.
+        """
+        for j in self.neighbour_ids(self.node_id(paperId), edge_type):
+            yield self.nodes[j]
+
+    def edges(self, paperId: PaperIdT, edge_type: EdgeTypeT
+              ) -> Iterator[Tuple[PaperIdT, EdgeMetaT]]:
+        """ Iterate over the neighbours of a paper with the meta-information
+        of their edge, as in :attr:`S2Graph.edges`.
+        """
+        i = self.node_id(paperId)
+        offsets, targets, flags = self.adjacency[edge_type]
+        for j in range(offsets[i], offsets[i + 1]):
+            yield self.nodes[targets[j]], unpack_meta(flags[j])
+
+    def degree(self, paperId: PaperIdT, edge_type: EdgeTypeT) -> int:
+        """ Number of neighbours of a paper. """
+        i = self.node_id(paperId)
+        offsets = self.adjacency[edge_type][0]
+        return offsets[i + 1] - offsets[i]
+
+    def __contains__(self, paperId: PaperIdT) -> bool:
+        """ Whether a paper was added to the graph. """
+        try:
+            return bool(self.added[self.node_id(paperId)])
+        except KeyError:
+            return False
+
+    def __iter__(self) -> Iterator[PaperIdT]:
+        """ Iterate over papers that were added to the graph. """
+        return (pid for pid, a in zip(self.nodes, self.added) if a)
+
+    def __len__(self) -> int:
+        """ Number of papers that were added to the graph. """
+        return sum(self.added)
@@ -1,6 +1,9 @@
 from pydantic import BaseModel, validator
+from pydantic.datetime_parse import parse_datetime
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON
 from datetime import datetime
-from typing import List, Optional, Iterable
+from typing import (List, Optional, Iterable, Iterator, Dict, Union, Any,
+                    Type, TypeVar, Tuple)
 
 # TODO: go through these and add validators for str/lists
 
@@ -202,3 +205,184 @@ class S2Author(BaseModel):
     papers: Optional[List[S2AuthorPaper]]
     url: Optional[str]
     obtained_utc: Optional[datetime]
+
+
+class LazyReferences(list):
+    """
+    List of :class:`.S2Reference` that are only validated when accessed.
+
+    Used for the ``citations`` and ``references`` of papers obtained with
+    ``lazy=True`` (see :func:`s2.api.get_paper`), as validating tens of
+    thousands of nested objects for highly cited papers dominates the time
+    and memory spent obtaining them. Items are stored as the original dicts
+    until they are accessed (e.g. by indexing or iterating), at which point
+    they are validated once and replaced by a :class:`.S2Reference`.
+    Methods that compare, sort or copy items (e.g. ``sort``, ``index`` or
+    ``+``) validate all items first.
+    """
+    def __init__(self, refs: Iterable[Union[Dict, S2Reference]] = ()):
+        super().__init__(refs)
+
+    def _validate(self, i: int) -> S2Reference:
+        ref = list.__getitem__(self, i)
+        if not isinstance(ref, S2Reference):
+            ref = S2Reference(**ref)
+            list.__setitem__(self, i, ref)
+        return ref
+
+    def _validate_all(self) -> None:
+        for i in range(len(self)):
+            self._validate(i)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._validate(j) for j in range(*i.indices(len(self)))]
+        return self._validate(i)
+
+    def __iter__(self) -> Iterator[S2Reference]:
+        for i in range(len(self)):
+            yield self._validate(i)
+
+    def __reversed__(self) -> Iterator[S2Reference]:
+        for i in reversed(range(len(self))):
+            yield self._validate(i)
+
+    def __contains__(self, ref: Any) -> bool:
+        return any(r == ref for r in self)
+
+    def pop(self, i: int = -1) -> S2Reference:
+        ref = self._validate(i)
+        list.pop(self, i)
+        return ref
+
+    def index(self, ref: Any, *args) -> int:
+        self._validate_all()
+        return list.index(self, ref, *args)
+
+    def count(self, ref: Any) -> int:
+        self._validate_all()
+        return list.count(self, ref)
+
+    def remove(self, ref: Any) -> None:
+        self._validate_all()
+        list.remove(self, ref)
+
+    def sort(self, *args, **kwargs) -> None:
+        self._validate_all()
+        list.sort(self, *args, **kwargs)
+
+    def __add__(self, other: List) -> List[S2Reference]:
+        self._validate_all()
+        return list.__add__(self, other)
+
+    def __radd__(self, other: List) -> List[S2Reference]:
+        return other + list(self)
+
+    def __mul__(self, n: int) -> List[S2Reference]:
+        self._validate_all()
+        return list.__mul__(self, n)
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other: Any) -> bool:
+        self._validate_all()
+        return list.__eq__(self, other)
+
+    def __ne__(self, other: Any) -> bool:
+        self._validate_all()
+        return list.__ne__(self, other)
+
+    __hash__ = None
+
+    def copy(self) -> 'LazyReferences':
+        return LazyReferences(list.__iter__(self))
+
+    def paperIds(self) -> List[Optional[str]]:
+        """ The ``paperId`` of each reference, without validating them. """
+        return [r.paperId if isinstance(r, S2Reference) else r.get('paperId')
+                for r in list.__iter__(self)]
+
+    def __repr__(self) -> str:
+        return f"LazyReferences({list(self)!r})"
+
+
+def lazy_paper(d: Dict) -> S2Paper:
+    """
+    Create a :class:`S2Paper` from a dict, deferring the validation of its
+    ``citations`` and ``references`` to when they are accessed
+    (see :class:`LazyReferences`).
+    """
+    d = dict(d)
+    refs = {k: d.pop(k) for k in ('citations', 'references') if k in d}
+    paper = S2Paper(**d)
+    for k, v in refs.items():
+        if v is not None:
+            # validate_assignment is disabled, so this skips validation
+            setattr(paper, k, LazyReferences(v))
+        else:
+            setattr(paper, k, None)
+    return paper
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+_ConstructPlan = Tuple[Dict[str, Any], frozenset, List[Tuple[str, str, Any]]]
+_CONSTRUCT_PLANS: Dict[Type[BaseModel], _ConstructPlan] = {}
+
+
+def _construct_plan(model: Type[BaseModel]) -> _ConstructPlan:
+    """ Defaults, field names, and fields whose values must be converted when
+    constructing ``model`` without validation, cached per model.
+    """
+    plan = _CONSTRUCT_PLANS.get(model)
+    if plan is None:
+        defaults, convert = {}, []
+        for name, field in model.__fields__.items():
+            # defaults of these models are all immutable (None)
+            defaults[name] = field.default
+            if isinstance(field.type_, type) and \
+                    issubclass(field.type_, BaseModel):
+                if field.shape == SHAPE_LIST:
+                    convert.append((name, 'model_list', field.type_))
+                elif field.shape == SHAPE_SINGLETON:
+                    convert.append((name, 'model', field.type_))
+            elif field.type_ is datetime:
+                convert.append((name, 'datetime', field.type_))
+        plan = (defaults, frozenset(defaults), convert)
+        _CONSTRUCT_PLANS[model] = plan
+    return plan
+
+
+def construct_trusted(model: Type[ModelT], d: Dict) -> ModelT:
+    """
+    Create an instance of ``model`` (e.g. :class:`S2Paper`) from trusted data
+    without validation, recursively constructing nested models.
+
+    This is much faster than ``model(**d)``, e.g. when loading papers with
+    thousands of references that were validated before being saved to an
+    :class:`~s2.store.S2DataStore`. Unlike :meth:`pydantic.BaseModel.construct`,
+    nested models (e.g. :class:`S2Reference`) are created instead of being
+    left as dicts, and ``datetime`` fields are parsed from ISO 8601 strings.
+    Unknown keys are ignored and missing keys are set to ``None``. Note that
+    values are otherwise used as is, so data that was not produced by these
+    models (e.g. edited by hand) should be validated instead.
+    """
+    defaults, names, convert = _construct_plan(model)
+    fields_set = set(names.intersection(d))
+    values = dict(defaults)
+    for name in fields_set:
+        values[name] = d[name]
+    for name, kind, type_ in convert:
+        v = values[name]
+        if v is None:
+            continue
+        if kind == 'model_list':
+            values[name] = [construct_trusted(type_, x) for x in v]
+        elif kind == 'model':
+            values[name] = construct_trusted(type_, v)
+        elif not isinstance(v, datetime):
+            values[name] = parse_datetime(v)
+    # equivalent to model.construct, minus the overhead of copying defaults
+    m = model.__new__(model)
+    object.__setattr__(m, '__dict__', values)
+    object.__setattr__(m, '__fields_set__', fields_set)
+    return m
@@ -0,0 +1,150 @@
+from s2._lock import FileLock
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from typing import Tuple, Union, Iterator
+
+
+class RateLimiter:
+    """ Thread-safe token bucket to proactively stay within API rate limits.
+
+    Instead of reacting to rate limit errors after the fact, the same
+    :class:`RateLimiter` can be passed to every :mod:`s2.api` (or
+    :mod:`s2.aio`) call, which will wait for a token before sending each
+    request, so that throughput stays pinned at the quota.
+
+    Tokens are replenished continuously at ``rate / period`` tokens per second,
+    up to ``burst`` tokens. Requests that cannot be served immediately reserve
+    a future token, so that concurrent callers are served in order.
+
+    .. code-block:: python
+
+        limiter = RateLimiter.public()
+        for pid in paperIds:
+            paper = s2.api.get_paper(pid, rate_limiter=limiter)
+
+    Args:
+        rate (:obj:`int`, optional):
+            Number of requests allowed per ``period``. Defaults to ``100``.
+        period (:obj:`float`, optional):
+            Length of the rate limit window in seconds. Defaults to ``300``.
+        burst (:obj:`int`, optional):
+            Maximum number of tokens that can accumulate while idle. The
+            default of ``1`` spaces requests evenly, which also respects
+            sliding rate limit windows. Defaults to ``1``.
+    """
+    def __init__(self, rate: int = 100, period: float = 300, burst: int = 1):
+        if rate <= 0 or period <= 0 or burst < 1:
+            raise ValueError("rate and period must be positive "
+                             "and burst must be at least 1")
+        self.rate = rate
+        self.period = period
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._state = (float(burst), self._clock())
+
+    @classmethod
+    def public(cls) -> 'RateLimiter':
+        """ Rate limiter for the public API (100 requests per 5 minutes). """
+        return cls(rate=100, period=300)
+
+    @staticmethod
+    def _clock() -> float:
+        return time.monotonic()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            yield
+
+    def _get_state(self) -> Tuple[float, float]:
+        return self._state
+
+    def _set_state(self, tokens: float, t: float) -> None:
+        self._state = (tokens, t)
+
+    def reserve(self) -> float:
+        """ Reserve a token and return how many seconds to wait before using
+        it, without waiting. Useful for waiting without blocking, e.g. with
+        :func:`asyncio.sleep`.
+        """
+        with self._locked():
+            tokens, t = self._get_state()
+            now = max(self._clock(), t)
+            tokens += (now - t) * self.rate / self.period
+            tokens = min(self.burst, tokens) - 1
+            self._set_state(tokens, now)
+        return max(0.0, -tokens * self.period / self.rate)
+
+    def acquire(self) -> None:
+        """ Wait until a token is available. """
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def __getstate__(self):
+        # locks can't be pickled (e.g. when saving an S2GraphBuilder)
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class FileRateLimiter(RateLimiter):
+    """ :class:`RateLimiter` shared across processes via a local file.
+
+    The state of the token bucket is stored in ``path`` and updated under an
+    exclusive file lock, so that any number of processes on the same host
+    (e.g. several crawlers using the same API key) share the same quota.
+
+    Args:
+        path (str or :class:`~pathlib.Path`):
+            File storing the state of the token bucket. It is created if it
+            does not exist.
+        rate (:obj:`int`, optional):
+            See :class:`RateLimiter`. Defaults to ``100``.
+        period (:obj:`float`, optional):
+            See :class:`RateLimiter`. Defaults to ``300``.
+        burst (:obj:`int`, optional):
+            See :class:`RateLimiter`. Defaults to ``1``.
+    """
+    _STATE = struct.Struct('<dd')
+
+    def __init__(self, path: Union[str, Path], rate: int = 100,
+                 period: float = 300, burst: int = 1):
+        super().__init__(rate=rate, period=period, burst=burst)
+        self.path = Path(path).absolute()
+        self._fd = None
+
+    @staticmethod
+    def _clock() -> float:
+        # monotonic clocks are not comparable across processes
+        return time.time()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock, FileLock(self.path) as flock:
+            self._fd = flock.fd
+            try:
+                yield
+            finally:
+                self._fd = None
+
+    def _get_state(self) -> Tuple[float, float]:
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        b = os.read(self._fd, self._STATE.size)
+        if len(b) != self._STATE.size:
+            # new file: start with a full bucket
+            return (float(self.burst), self._clock())
+        return self._STATE.unpack(b)
+
+    def _set_state(self, tokens: float, t: float) -> None:
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.write(self._fd, self._STATE.pack(tokens, t))
@@ -0,0 +1,139 @@
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from typing import Optional, Iterable
+
+# statuses of the S2 API when exceeding rate limits
+RATE_LIMIT_STATUSES = frozenset({403, 429})
+
+
+class RetryPolicy:
+    """ Decides whether and how long to wait before retrying a request.
+
+    Waits grow exponentially with each attempt, i.e.
+    ``wait * backoff ** attempt`` seconds capped at ``max_wait``, with
+    random jitter to avoid synchronised retries across workers. If the server
+    sends a ``Retry-After`` header, the wait is at least as long as requested.
+
+    The default policy retries rate limited requests and transient server
+    errors a few times in quick succession. The ``retries=2, wait=150``
+    arguments of :func:`s2.api.get_paper` correspond to
+    ``RetryPolicy(2, rate_limit_wait=150)``, i.e. previous versions of PyS2
+    waiting 150 seconds when exceeding rate limits, while transient server
+    and connection errors are retried within seconds. Subclasses can override
+    :meth:`retry_status` and :meth:`get_wait` for custom strategies.
+
+    Args:
+        retries (:obj:`int`, optional):
+            Maximum number of retry attempts. Defaults to ``5``.
+        wait (:obj:`float`, optional):
+            Number of seconds to wait before the first retry.
+            Defaults to ``1``.
+        backoff (:obj:`float`, optional):
+            Factor by which the wait increases after each attempt.
+            Defaults to ``2``.
+        max_wait (:obj:`float`, optional):
+            Maximum number of seconds to wait between attempts, not counting
+            ``Retry-After``. Defaults to ``300``.
+        jitter (:obj:`float`, optional):
+            Fraction of each wait that is randomised, from ``0`` (no jitter)
+            to ``1`` (wait uniformly between ``0`` and the computed wait).
+            Defaults to ``0.5``.
+        max_elapsed (:obj:`float`, optional):
+            Give up instead of waiting if more than ``max_elapsed`` seconds
+            would have passed since the first attempt. Defaults to ``None``.
+        statuses (:obj:`Iterable[int]`, optional):
+            HTTP status codes that are retried. Note that the S2 API can
+            return ``403`` when exceeding rate limits.
+            Defaults to ``(403, 429, 500, 502, 503, 504)``.
+        retry_connection_errors (:obj:`bool`, optional):
+            Retry on connection errors (e.g. connection resets) and timeouts.
+            Defaults to ``True``.
+        respect_retry_after (:obj:`bool`, optional):
+            Wait at least as long as the ``Retry-After`` header of the response.
+            Defaults to ``True``.
+        rate_limit_wait (:obj:`float`, optional):
+            Fixed number of seconds to wait before retrying requests that
+            exceeded rate limits (``403`` and ``429``), instead of the
+            exponential wait used for other errors. Defaults to ``None``.
+    """
+    def __init__(self,
+                 retries: int = 5,
+                 wait: float = 1,
+                 backoff: float = 2,
+                 max_wait: Optional[float] = 300,
+                 jitter: float = 0.5,
+                 max_elapsed: Optional[float] = None,
+                 statuses: Iterable[int] = (403, 429, 500, 502, 503, 504),
+                 retry_connection_errors: bool = True,
+                 respect_retry_after: bool = True,
+                 rate_limit_wait: Optional[float] = None,
+                 ):
+        self.retries = retries
+        self.wait = wait
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self.jitter = jitter
+        self.max_elapsed = max_elapsed
+        self.statuses = frozenset(statuses)
+        self.retry_connection_errors = retry_connection_errors
+        self.respect_retry_after = respect_retry_after
+        self.rate_limit_wait = rate_limit_wait
+
+    def retry_status(self, status: int) -> bool:
+        """ Whether a response with HTTP status code ``status`` is retried. """
+        return status in self.statuses
+
+    def get_wait(self, attempt: int, retry_after: Optional[str] = None,
+                 status: Optional[int] = None) -> float:
+        """ Number of seconds to wait before retry number ``attempt + 1``.
+
+        Args:
+            attempt (:obj:`int`):
+                Number of retries already attempted.
+            retry_after (:obj:`str`, optional):
+                Value of the ``Retry-After`` header of the response, if any.
+            status (:obj:`int`, optional):
+                HTTP status code of the response, if any (``None`` for
+                connection errors).
+        """
+        if self.rate_limit_wait is not None and \
+                status in RATE_LIMIT_STATUSES:
+            wait = self.rate_limit_wait
+        else:
+            wait = self.wait * self.backoff ** attempt
+            if self.max_wait is not None:
+                wait = min(wait, self.max_wait)
+            wait *= 1 - self.jitter * random.random()
+        if self.respect_retry_after and retry_after:
+            wait = max(wait, parse_retry_after(retry_after))
+        return wait
+
+    def give_up(self, attempt: int, elapsed: float, wait: float) -> bool:
+        """ Whether to stop retrying, given the number of retries already
+        attempted, the seconds elapsed since the first attempt, and the
+        seconds to wait before the next attempt.
+        """
+        if attempt >= self.retries:
+            return True
+        if self.max_elapsed is not None and elapsed + wait > self.max_elapsed:
+            return True
+        return False
+
+
+def parse_retry_after(retry_after: str) -> float:
+    """ Parse a ``Retry-After`` header (delay in seconds or HTTP date) into a
+    number of seconds, or ``0`` if it can't be parsed.
+    """
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError, IndexError):
+        return 0.0
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
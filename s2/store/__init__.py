@@ -1,2 +1,6 @@
 from s2.store.base import S2DataStore, S2Model, S2ModelT, S2Identifier
-from s2.store.json import JsonDS
\ No newline at end of file
+from s2.store.json import JsonDS
+from s2.store.sqlite import SqliteDS
+from s2.store.log import LogDS
+from s2.store.cached import CachedDS, CacheStats
+from s2.store.indexed import IndexedDS
\ No newline at end of file
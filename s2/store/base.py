@@ -1,5 +1,11 @@
-from s2.models import S2Paper, S2Author
-from typing import MutableMapping, Iterator, TypeVar, Type, Union
+from s2 import codec
+from s2.models import S2Paper, S2Author, construct_trusted
+from s2.store.compression import compress, decompress, check_compression
+from s2.store.projection import (Projection, parse_fields, project,
+                                 project_model)
+from itertools import islice
+from typing import (MutableMapping, Iterator, TypeVar, Type, Union, Dict,
+                    Iterable, Mapping, Tuple, Optional)
 
 PaperId = str
 AuthorId = str
@@ -61,6 +67,98 @@ class S2DataStore(MutableMapping[S2Identifier,S2Model]):
             raise KeyError(f"Provided key {k} for {self.s2model.__name__} "
                            f"with S2 Identifier {s2id}")
 
+    def get(self, k: S2Identifier, default: Optional[S2Model] = None,
+            fields: Optional[Iterable[str]] = None) -> Optional[S2Model]:
+        """ Get the object for ``k``, or ``default`` if it doesn't exist.
+
+        Args:
+            k (:obj:`str`):
+                Key of the object.
+            default (optional):
+                Returned if ``k`` doesn't exist. Defaults to ``None``.
+            fields (:obj:`Iterable[str]`, optional):
+                Only load these fields of the object, e.g. ``["paperId",
+                "year", "references.paperId"]`` where ``"references.paperId"``
+                only loads the ``paperId`` of each reference. Other fields
+                are set to ``None``, and loaded fields are not validated
+                (see :func:`~s2.models.construct_trusted`). Defaults to
+                ``None`` to load all fields.
+        """
+        if fields is None:
+            return super().get(k, default)
+        return self.get_many([k], fields=fields).get(k, default)
+
+    def get_many(self, keys: Iterable[S2Identifier],
+                 fields: Optional[Iterable[str]] = None,
+                 ) -> Dict[S2Identifier, S2Model]:
+        """ Get the objects for ``keys``, omitting keys that don't exist.
+        See :meth:`get` for ``fields``.
+
+        Subclasses may override this (and :meth:`set_many` and
+        :meth:`delete_many`) to reduce the overhead per object, e.g. by
+        skipping unrequested ``fields`` of serialized objects.
+        """
+        objects = {}
+        for k in keys:
+            try:
+                objects[k] = self[k]
+            except KeyError:
+                pass
+        if fields is not None:
+            projection = parse_fields(fields)
+            objects = {k: project_model(v, projection)
+                       for k, v in objects.items()}
+        return objects
+
+    def project(self, fields: Iterable[str],
+                keys: Optional[Iterable[S2Identifier]] = None,
+                batch_size: int = 1000,
+                ) -> Iterator[Tuple[S2Identifier, S2Model]]:
+        """ Iterate over objects with only some of their ``fields`` loaded
+        (see :meth:`get`), which is much faster than loading entire objects
+        when e.g. only the citations between papers are needed.
+
+        .. code-block:: python
+
+            for k, p in pds.project(["year", "references.paperId"]):
+                ...
+
+        Args:
+            fields (:obj:`Iterable[str]`):
+                Fields to load.
+            keys (:obj:`Iterable[str]`, optional):
+                Keys of the objects, omitting keys that don't exist.
+                Defaults to all objects.
+            batch_size (:obj:`int`, optional):
+                Number of objects loaded at once with :meth:`get_many`.
+                Defaults to ``1000``.
+        """
+        fields = list(fields)
+        keys = iter(self if keys is None else keys)
+        while True:
+            batch = list(islice(keys, batch_size))
+            if not batch:
+                break
+            yield from self.get_many(batch, fields=fields).items()
+
+    def set_many(self, items: Union[Mapping[S2Identifier, S2Model],
+                                    Iterable[Tuple[S2Identifier, S2Model]]]
+                 ) -> None:
+        """ Set objects from a mapping or an iterable of key-value pairs. """
+        if isinstance(items, Mapping):
+            items = items.items()
+        for k, v in items:
+            self[k] = v
+
+    def delete_many(self, keys: Iterable[S2Identifier]) -> None:
+        """ Delete the objects for ``keys``, ignoring keys that don't exist.
+        """
+        for k in keys:
+            try:
+                del self[k]
+            except KeyError:
+                pass
+
     def __contains__(self, k: S2Identifier) -> bool: ... # type: ignore[override]
 
     def __delitem__(self, k: S2Identifier) -> None: ...
@@ -72,3 +170,42 @@ class S2DataStore(MutableMapping[S2Identifier,S2Model]):
     def __iter__(self) -> Iterator[S2Identifier]: ...
 
     def __setitem__(self, k: S2Identifier, v: S2Model) -> None: ...
+
+
+
+class SerializedDS(S2DataStore):
+    """ Base class for datastores of objects serialized with :mod:`s2.codec`,
+    such as :class:`.JsonDS`, :class:`.SqliteDS` and :class:`.LogDS` (see
+    their documentation for ``enforce_id``, ``trusted``, ``compression`` and
+    ``compression_level``).
+    """
+    def __init__(self,
+                 s2model: S2ModelT = S2Paper,
+                 enforce_id: Optional[bool] = True,
+                 trusted: bool = False,
+                 compression: Optional[str] = None,
+                 compression_level: Optional[int] = None,
+                 ):
+        super().__init__(s2model=s2model)
+        self.enforce_id = enforce_id
+        self.trusted = trusted
+        check_compression(compression)
+        self.compression = compression
+        self.compression_level = compression_level
+
+    def _decode(self, b: bytes, projection: Optional[Projection] = None
+                ) -> S2Model:
+        d = codec.loads(decompress(b))
+        if projection is not None:
+            return construct_trusted(self.s2model, project(d, projection))
+        if self.trusted:
+            return construct_trusted(self.s2model, d)
+        return self.s2model(**d)
+
+    def _encode(self, k: S2Identifier, v: S2Model) -> bytes:
+        self._check_key_type(k)
+        self._check_value_type(v)
+        if self.enforce_id:
+            self._check_s2id(k, v)
+        return compress(codec.get_codec().dumps_model(v), self.compression,
+                        self.compression_level)
@@ -0,0 +1,282 @@
+from s2.store import S2DataStore, S2Identifier, S2Model
+from s2.store.projection import parse_fields, project_model
+from s2.models import S2Paper, S2Author
+import threading
+import weakref
+from collections import OrderedDict
+
+from typing import Optional, Callable, Dict, Iterable, Iterator
+
+
+def approx_size(v: S2Model) -> int:
+    """ Rough estimate of the memory used by an object in bytes, based on the
+    number of nested objects (e.g. citations and references).
+    """
+    if isinstance(v, S2Paper):
+        n = len(v.citations or ()) + len(v.references or ())
+        return 2048 + 1024 * n + 256 * len(v.authors or ())
+    if isinstance(v, S2Author):
+        return 1024 + 512 * len(v.papers or ())
+    return 1024
+
+
+def _write_back(store: S2DataStore, dirty: Dict) -> None:
+    if dirty:
+        store.set_many(dirty)
+        dirty.clear()
+
+
+class CacheStats:
+    """ Statistics of a :class:`CachedDS`.
+
+    Attributes:
+        hits (:obj:`int`):
+            Number of objects read from the cache.
+        misses (:obj:`int`):
+            Number of objects read from the underlying datastore.
+        evictions (:obj:`int`):
+            Number of objects evicted from the cache.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """ Set all statistics to zero. """
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """ Fraction of reads served from the cache. """
+        n = self.hits + self.misses
+        return self.hits / n if n else 0.0
+
+    def __repr__(self):
+        return (f"CacheStats(hits={self.hits}, misses={self.misses}, "
+                f"evictions={self.evictions}, hit_rate={self.hit_rate:.2f})")
+
+
+class CachedDS(S2DataStore):
+    """Wraps an :class:`S2DataStore` with an in-memory LRU cache of objects.
+
+    Objects that are read repeatedly (e.g. highly cited papers when
+    building a graph) are only read and validated once, until they are
+    evicted. The cache is bounded by a number of objects and/or an
+    approximate size in bytes.
+
+    .. code-block:: python
+
+        papers = CachedDS(JsonDS.load_papers("pds"), max_entries=10000)
+        graph = S2Graph(papers=papers)
+        ...
+        print(papers.stats)
+
+    Note:
+        Objects are shared between the cache and callers, so they should be
+        copied (e.g. with ``paper.copy(deep=True)``) before being modified
+        without setting them again.
+
+    Args:
+        store (:class:`S2DataStore`):
+            Datastore to cache, e.g. a :class:`.JsonDS`.
+        max_entries (`int`, optional):
+            Maximum number of cached objects, or ``None`` for no limit.
+            Defaults to ``10000``.
+        max_bytes (`int`, optional):
+            Maximum approximate size of cached objects in bytes, or ``None``
+            for no limit. Defaults to ``None``.
+        write_back (`bool`, optional):
+            If ``True``, objects that are set are only written to ``store``
+            when they are evicted or when calling :meth:`flush` (also when
+            pickled or garbage collected), which is faster when the same
+            objects are set repeatedly. Otherwise they are written
+            immediately (write-through). Defaults to ``False``.
+        sizeof (`Callable`, optional):
+            Function returning the size of an object in bytes for
+            ``max_bytes``. Defaults to :func:`approx_size`.
+
+    Attributes:
+        stats (:class:`CacheStats`):
+            Hits, misses and evictions of the cache.
+    """
+    def __init__(self,
+                 store: S2DataStore,
+                 max_entries: Optional[int] = 10000,
+                 max_bytes: Optional[int] = None,
+                 write_back: bool = False,
+                 sizeof: Callable[[S2Model], int] = approx_size,
+                 ):
+        super().__init__(s2model=store.s2model)
+        self.store = store
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.write_back = write_back
+        self.sizeof = sizeof
+        self.stats = CacheStats()
+        self._init_cache()
+
+    def _init_cache(self):
+        self._lock = threading.RLock()
+        # least recently used first
+        self._cache: Dict[S2Identifier, S2Model] = OrderedDict()
+        self._sizes: Dict[S2Identifier, int] = {}
+        self._size = 0
+        # objects set but not yet written to the store
+        self._dirty: Dict[S2Identifier, S2Model] = {}
+        self._finalizer = weakref.finalize(self, _write_back, self.store,
+                                           self._dirty)
+
+    @property
+    def size(self) -> int:
+        """ Approximate size of cached objects in bytes. """
+        return self._size
+
+    def flush(self) -> None:
+        """ Write objects that were set (with ``write_back``) to ``store``.
+        """
+        with self._lock:
+            _write_back(self.store, self._dirty)
+        flush = getattr(self.store, 'flush', None)
+        if flush is not None:
+            flush()
+
+    def clear_cache(self) -> None:
+        """ Flush and remove all objects from the cache. """
+        with self._lock:
+            self.flush()
+            self._cache.clear()
+            self._sizes.clear()
+            self._size = 0
+
+    def __getstate__(self):
+        # locks can't be pickled (e.g. when saving an S2GraphBuilder),
+        # and cached objects are already saved in the underlying store
+        self.flush()
+        state = self.__dict__.copy()
+        for k in ('_lock', '_cache', '_sizes', '_size', '_dirty',
+                  '_finalizer'):
+            del state[k]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_cache()
+
+    def _cache_put(self, k: S2Identifier, v: S2Model) -> None:
+        size = self.sizeof(v) if self.max_bytes is not None else 0
+        self._size += size - self._sizes.pop(k, 0)
+        self._cache[k] = v
+        self._cache.move_to_end(k)
+        self._sizes[k] = size
+        while self._cache and (
+                (self.max_entries is not None
+                 and len(self._cache) > self.max_entries)
+                or (self.max_bytes is not None and self._size > self.max_bytes)
+        ):
+            k_old, v_old = self._cache.popitem(last=False)
+            self._size -= self._sizes.pop(k_old)
+            self.stats.evictions += 1
+            if self._dirty.pop(k_old, None) is not None:
+                self.store[k_old] = v_old
+
+    def _cache_pop(self, k: S2Identifier) -> None:
+        if self._cache.pop(k, None) is not None:
+            self._size -= self._sizes.pop(k)
+        self._dirty.pop(k, None)
+
+    def __contains__(self, k):
+        return k in self._cache or k in self.store
+
+    def __delitem__(self, k):
+        self._check_key_type(k)
+        with self._lock:
+            dirty = k in self._dirty
+            self._cache_pop(k)
+            try:
+                del self.store[k]
+            except KeyError:
+                if not dirty:
+                    raise
+
+    def __getitem__(self, k):
+        with self._lock:
+            v = self._cache.get(k)
+            if v is not None:
+                self._cache.move_to_end(k)
+                self.stats.hits += 1
+                return v
+        v = self.store[k]
+        with self._lock:
+            self.stats.misses += 1
+            self._cache_put(k, v)
+        return v
+
+    def __len__(self):
+        with self._lock:
+            _write_back(self.store, self._dirty)
+            return len(self.store)
+
+    def __iter__(self) -> Iterator[S2Identifier]:
+        with self._lock:
+            _write_back(self.store, self._dirty)
+        return iter(self.store)
+
+    def __setitem__(self, k: S2Identifier, v: S2Model):
+        with self._lock:
+            if self.write_back:
+                self._check_key_type(k)
+                self._check_value_type(v)
+                if getattr(self.store, 'enforce_id', False):
+                    self._check_s2id(k, v)
+                self._dirty[k] = v
+            else:
+                self.store[k] = v
+            self._cache_put(k, v)
+
+    def get_many(self, keys: Iterable[S2Identifier],
+                 fields: Optional[Iterable[str]] = None,
+                 ) -> Dict[S2Identifier, S2Model]:
+        """ Get the objects for ``keys``, omitting keys that don't exist.
+        See :meth:`get` for ``fields``; objects with only some fields loaded
+        are projected from cached objects if possible, but are not cached.
+        """
+        if fields is not None:
+            return self._get_projected(keys, fields)
+        objects, missing = {}, []
+        with self._lock:
+            for k in keys:
+                v = self._cache.get(k)
+                if v is None:
+                    missing.append(k)
+                else:
+                    self._cache.move_to_end(k)
+                    self.stats.hits += 1
+                    objects[k] = v
+        found = self.store.get_many(missing)
+        with self._lock:
+            self.stats.misses += len(missing)
+            for k, v in found.items():
+                self._cache_put(k, v)
+        objects.update(found)
+        return objects
+
+    def _get_projected(self, keys: Iterable[S2Identifier],
+                       fields: Iterable[str]) -> Dict[S2Identifier, S2Model]:
+        fields = list(fields)
+        projection = parse_fields(fields)
+        objects, missing = {}, []
+        with self._lock:
+            for k in keys:
+                v = self._cache.get(k)
+                if v is None:
+                    missing.append(k)
+                else:
+                    self.stats.hits += 1
+                    objects[k] = v
+        objects = {k: project_model(v, projection)
+                   for k, v in objects.items()}
+        objects.update(self.store.get_many(missing, fields=fields))
+        with self._lock:
+            self.stats.misses += len(missing)
+        return objects
@@ -0,0 +1,53 @@
+import gzip
+import lzma
+import zlib
+
+from typing import Optional
+
+COMPRESSIONS = ('gzip', 'lzma', 'zlib')
+
+
+def compress(b: bytes, compression: Optional[str] = None,
+             level: Optional[int] = None) -> bytes:
+    """ Compress a serialized object for a datastore.
+
+    Args:
+        b (:obj:`bytes`):
+            Serialized object.
+        compression (:obj:`str`, optional):
+            One of ``"gzip"``, ``"lzma"``, ``"zlib"``, or ``None`` to leave
+            ``b`` uncompressed. Defaults to ``None``.
+        level (:obj:`int`, optional):
+            Compression level (``preset`` for ``"lzma"``), trading off speed
+            for size. Defaults to the default of the compression library.
+    """
+    if compression is None:
+        return b
+    if compression == 'gzip':
+        return gzip.compress(b, 9 if level is None else level)
+    if compression == 'lzma':
+        return lzma.compress(b, preset=level)
+    if compression == 'zlib':
+        return zlib.compress(b, -1 if level is None else level)
+    check_compression(compression)
+
+
+def decompress(b: bytes) -> bytes:
+    """ Decompress a serialized object, detecting its compression from its
+    first bytes so that datastores can mix compressed and uncompressed
+    objects (e.g. after changing their compression).
+    """
+    if b[:2] == b'\x1f\x8b':
+        return gzip.decompress(b)
+    if b[:6] == b'\xfd7zXZ\x00':
+        return lzma.decompress(b)
+    # zlib header: deflate (8) with a window size and a checksum
+    if b[:1] == b'\x78' and int.from_bytes(b[:2], 'big') % 31 == 0:
+        return zlib.decompress(b)
+    return b
+
+
+def check_compression(compression: Optional[str]) -> None:
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression {compression!r}; expected one "
+                         f"of {', '.join(COMPRESSIONS)} or None")
@@ -0,0 +1,277 @@
+from s2.store import S2DataStore, S2Identifier, S2Model
+from s2.models import S2Paper
+import sqlite3
+import threading
+import weakref
+
+from typing import (Union, Optional, Dict, Iterator, Iterable, Mapping, Any,
+                    List, Tuple, Set, Sequence)
+from pathlib import Path
+
+INDEX_FIELDS = ('doi', 'arxivId', 'corpusId', 'year', 'venue', 'authorId')
+# fields indexed as integers; others are strings
+_INT_FIELDS = ('corpusId', 'year')
+
+
+def _index_values(v: S2Paper, fields: Sequence[str]
+                  ) -> List[Tuple[str, Any]]:
+    """ (field, value) pairs under which a paper is indexed. """
+    values = []
+    for field in fields:
+        if field == 'authorId':
+            for a in v.authors or ():
+                if a.authorId:
+                    values.append((field, a.authorId))
+            continue
+        x = getattr(v, field)
+        if x is None or x == '':
+            continue
+        if field == 'doi':
+            # DOIs are case insensitive
+            x = x.lower()
+        values.append((field, x))
+    return list(dict.fromkeys(values))
+
+
+def _query_value(field: str, x: Any) -> Any:
+    """ Convert a queried value to the type under which ``field`` is
+    indexed, e.g. ``"2007"`` to ``2007`` for ``year``.
+    """
+    if field in _INT_FIELDS:
+        if isinstance(x, str) and x.strip().isdigit():
+            return int(x)
+        if isinstance(x, int) and not isinstance(x, bool):
+            return x
+        raise TypeError(f"{field} must be an int, not {x!r}")
+    if not isinstance(x, str):
+        raise TypeError(f"{field} must be a str, not {x!r}")
+    # DOIs are case insensitive
+    return x.lower() if field == 'doi' else x
+
+
+class IndexedDS(S2DataStore):
+    """Wraps a datastore of papers with secondary indexes.
+
+    Papers can be found by their DOI, arXiv identifier, corpus identifier,
+    year, venue or authors without reading every paper of the datastore.
+    The indexes are stored in a SQLite database and updated whenever papers
+    are set or deleted through this wrapper; if the wrapped datastore is
+    modified otherwise, call :meth:`reindex`.
+
+    .. code-block:: python
+
+        pds = IndexedDS(JsonDS.load_papers("pds"), "pds_index.sqlite")
+        pds.find(doi="10.1145/2591062.2591139")
+        pds.find(authorId="144794037", year=range(2000, 2010))
+
+    Args:
+        store (:class:`S2DataStore`):
+            Datastore of :class:`.S2Paper` to index, e.g. a :class:`.JsonDS`.
+        index_path (str or :class:`~pathlib.Path`):
+            Path of the SQLite database storing the indexes. If it does not
+            exist, it is created and ``store`` is indexed.
+        fields (`Sequence[str]`, optional):
+            :class:`.S2Paper` fields to index, among ``"doi"``,
+            ``"arxivId"``, ``"corpusId"``, ``"year"``, ``"venue"`` and
+            ``"authorId"`` (the ``authorId`` of any of the ``authors``).
+            Defaults to all of them.
+    """
+    def __init__(self,
+                 store: S2DataStore,
+                 index_path: Union[str, Path],
+                 fields: Sequence[str] = INDEX_FIELDS,
+                 ):
+        if store.s2model is not S2Paper:
+            raise TypeError(f"Only datastores of S2Paper can be indexed, "
+                            f"not {store.s2model.__name__}")
+        unknown = set(fields) - set(INDEX_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown index fields {sorted(unknown)}; "
+                             f"expected {', '.join(INDEX_FIELDS)}")
+        super().__init__(s2model=S2Paper)
+        self.store = store
+        self.index_path = Path(index_path).absolute()
+        self.index_path.parent.mkdir(exist_ok=True, parents=True)
+        self.fields = tuple(fields)
+        self._connect()
+        indexed = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'fields'").fetchone()
+        if indexed is None or indexed[0] != ",".join(self.fields):
+            self.reindex()
+
+    def _connect(self):
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.index_path),
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta "
+                               "(key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS postings "
+                               "(field TEXT, value, k TEXT, "
+                               "PRIMARY KEY (field, value, k)) WITHOUT ROWID")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS postings_k "
+                               "ON postings (k)")
+        self._finalizer = weakref.finalize(self, self._conn.close)
+
+    def close(self) -> None:
+        """ Close the index database (and ``store``, if it can be closed). """
+        with self._lock:
+            self._finalizer()
+        close = getattr(self.store, 'close', None)
+        if close is not None:
+            close()
+
+    def __enter__(self) -> 'IndexedDS':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def flush(self) -> None:
+        """ Flush ``store``, if it can be flushed. """
+        flush = getattr(self.store, 'flush', None)
+        if flush is not None:
+            flush()
+
+    def __getstate__(self):
+        # connections can't be pickled (e.g. when saving an S2GraphBuilder)
+        state = self.__dict__.copy()
+        for k in ('_lock', '_conn', '_finalizer'):
+            del state[k]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._connect()
+
+    def _index(self, items: Iterable[Tuple[S2Identifier, S2Paper]]) -> None:
+        """ Replace the postings of papers, in a single transaction. """
+        with self._lock, self._conn:
+            for k, v in items:
+                self._conn.execute("DELETE FROM postings WHERE k = ?", (k,))
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO postings VALUES (?, ?, ?)",
+                    ((f, x, k) for f, x in _index_values(v, self.fields)))
+
+    def reindex(self, batch_size: int = 1000) -> None:
+        """ Rebuild the indexes by reading every paper of ``store``. """
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM postings")
+                self._conn.execute("DELETE FROM meta")
+            batch = []
+            for k in self.store:
+                batch.append(k)
+                if len(batch) >= batch_size:
+                    self._index(self.store.get_many(batch).items())
+                    batch = []
+            self._index(self.store.get_many(batch).items())
+            with self._conn:
+                self._conn.execute("INSERT INTO meta VALUES ('fields', ?)",
+                                   (",".join(self.fields),))
+
+    def find(self, **criteria: Any) -> Set[S2Identifier]:
+        """ Find the keys of papers matching all ``criteria``.
+
+        Each criterion is an indexed field with either a value, or an
+        iterable of values (e.g. a ``range`` of years) of which any can
+        match. Values of ``year`` and ``corpusId`` can be given as integers
+        or digit strings, and values of other fields are strings.
+
+        .. code-block:: python
+
+            pds.find(arxivId="1407.5648")
+            pds.find(venue="ICSE", year=[2013, 2014])
+
+        Returns:
+            :obj:`set` of :obj:`str`: Keys of matching papers.
+        """
+        if not criteria:
+            raise ValueError("At least one criterion is required")
+        keys = None
+        for field, value in criteria.items():
+            if field not in self.fields:
+                raise ValueError(f"{field} is not indexed; "
+                                 f"indexed fields are {', '.join(self.fields)}")
+            if isinstance(value, (str, int)):
+                values = [value]
+            else:
+                values = list(value)
+            values = [_query_value(field, x) for x in values]
+            found = set()
+            with self._lock:
+                # stay below the maximum number of sql variables
+                for i in range(0, len(values), 500):
+                    chunk = values[i:i + 500]
+                    query = ",".join("?" * len(chunk))
+                    found.update(k for k, in self._conn.execute(
+                        f"SELECT k FROM postings WHERE field = ? "
+                        f"AND value IN ({query})", [field] + chunk))
+            keys = found if keys is None else keys & found
+            if not keys:
+                break
+        return keys
+
+    def value_counts(self, field: str) -> Dict[Any, int]:
+        """ Number of papers for each indexed value of ``field``, e.g. the
+        number of papers per year.
+        """
+        if field not in self.fields:
+            raise ValueError(f"{field} is not indexed; "
+                             f"indexed fields are {', '.join(self.fields)}")
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT value, COUNT(*) FROM postings WHERE field = ? "
+                "GROUP BY value", (field,)))
+
+    def __contains__(self, k):
+        return k in self.store
+
+    def __delitem__(self, k):
+        del self.store[k]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM postings WHERE k = ?", (k,))
+
+    def __getitem__(self, k):
+        return self.store[k]
+
+    def __len__(self):
+        return len(self.store)
+
+    def __iter__(self) -> Iterator[S2Identifier]:
+        return iter(self.store)
+
+    def __setitem__(self, k: S2Identifier, v: S2Model):
+        self.store[k] = v
+        self._index([(k, v)])
+
+    def get_many(self, keys: Iterable[S2Identifier],
+                 fields: Optional[Iterable[str]] = None,
+                 ) -> Dict[S2Identifier, S2Model]:
+        """ Get the objects for ``keys``, omitting keys that don't exist.
+        See :meth:`get` for ``fields``.
+        """
+        return self.store.get_many(keys, fields=fields)
+
+    def set_many(self, items: Union[Mapping[S2Identifier, S2Model],
+                                    Iterable[Tuple[S2Identifier, S2Model]]]
+                 ) -> None:
+        """ Set objects from a mapping or an iterable of key-value pairs,
+        indexing them in a single transaction.
+        """
+        if isinstance(items, Mapping):
+            items = items.items()
+        items = list(items)
+        self.store.set_many(items)
+        self._index(items)
+
+    def delete_many(self, keys: Iterable[S2Identifier]) -> None:
+        """ Delete the objects for ``keys``, ignoring keys that don't exist.
+        """
+        keys = list(keys)
+        self.store.delete_many(keys)
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM postings WHERE k = ?",
+                                   ((k,) for k in keys))
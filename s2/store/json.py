@@ -1,59 +1,559 @@
-from s2.store import S2DataStore, S2Identifier, S2ModelT, S2Model
-from s2.models import S2Paper
+from s2._lock import FileLock
+from s2.store.base import SerializedDS, S2Identifier, S2ModelT, S2Model
+from s2 import codec
+from s2.store.manifest import KeyManifest
+from s2.store.compression import decompress
+from s2.store.projection import Projection, parse_fields, project, covers
+from s2.models import S2Paper, construct_trusted
+import hashlib
 import json
+import os
+import threading
+from contextlib import contextmanager
+from itertools import islice
 
-from typing import Union, Optional, Type
+from typing import (Union, Optional, Type, Set, Dict, Iterable, Mapping,
+                    Tuple, Iterator, Sequence)
 from pathlib import Path
 
 
-class JsonDS(S2DataStore):
+class JsonDS(SerializedDS):
+    """Dict-like interface to store S2 objects as jsons.
+
+    Args:
+        json_dir (str or :class:`~pathlib.Path`):
+            Directory where objects are saved as ``{json_dir}/{k}.json``
+            (see ``shard_depth``). If the directory does not exist, it will
+            be created.
+        enforce_id (`bool`, optional):
+            Enforce that a key be equal to the S2 identifier of the object
+            (if it exists; see :any:`saving_unknown`). Defaults to ``True``.
+        s2model (:class:`.S2Paper` or :class:`.S2Author`, optional):
+            Type of the stored objects; prefer using :meth:`load_papers` or
+            :meth:`load_authors`. Defaults to :class:`.S2Paper`.
+        trusted (`bool`, optional):
+            Skip validation when reading objects, which were validated before
+            being saved (see :func:`~s2.models.construct_trusted`). This is
+            considerably faster for papers with many references, but should
+            only be used if the jsons are not modified outside of PyS2.
+            Defaults to ``False``.
+        shard_depth (`int`, optional):
+            Number of nested subdirectories in which objects are sharded,
+            named after successive pairs of hex digits of the md5 hash of
+            their key, e.g. ``{json_dir}/ab/cd/{k}.json`` for ``2``. This
+            keeps directories small (at most 256 entries per level) when
+            storing millions of objects, which many filesystems handle
+            poorly in a single directory. The layout is saved in
+            ``{json_dir}/.layout`` when sharded; use :meth:`migrate` to change
+            the layout of an existing datastore. Defaults to the saved
+            layout, or ``0`` (a flat directory) for new datastores.
+        compression (`str`, optional):
+            Compress stored objects with ``"gzip"``, ``"lzma"`` or ``"zlib"``
+            (see :func:`~s2.store.compression.compress`), which typically
+            reduces the size of papers with many references by 5 to 10
+            times. Objects are decompressed based on their content, so the
+            compression of an existing datastore can be changed at any time.
+            Defaults to ``None``.
+        compression_level (`int`, optional):
+            Level of ``compression``, trading off speed for size.
+            Defaults to the default level of the compression library.
+        fsync (`bool`, optional):
+            Sync objects to disk when they are written, so that they survive
+            power failures and operating system crashes. Objects are always
+            written to a temporary file which is renamed once complete, so
+            that interrupted writes can't leave truncated jsons, but without
+            syncing they might only reach the disk after some time. Syncing
+            is expensive; use :meth:`set_many` to sync objects in batches.
+            Defaults to ``False``.
+        multi_writer (`bool`, optional):
+            Allow several instances (e.g. in different processes on the same
+            host) to write to ``json_dir`` concurrently. Updates of objects
+            and of the manifest are serialized with a lock file
+            (``{json_dir}/.lock``), and keys added or removed by other
+            instances are observed from the manifest when a key is not found
+            or when listing keys (see :meth:`refresh`). All instances writing
+            to ``json_dir`` must use this mode. Defaults to ``False``.
+        skeleton (`Sequence[str]`, optional):
+            Fields (see :meth:`get`) saved in a small sidecar next to each
+            object, ``{k}.skeleton``, e.g. ``["paperId", "year",
+            "references.paperId", "citations.paperId"]`` for graph analytics.
+            Objects read with fields covered by the skeleton are loaded from
+            their sidecar instead of parsing the entire object. The fields
+            are saved in ``{json_dir}/.skeleton_fields``; changing them (or
+            passing ``[]`` to remove sidecars) rewrites the sidecars of all
+            objects.
+            Defaults to the saved fields, or ``None`` for no sidecars.
+
+    Attributes:
+        s2ids (`set` of `str`):
+            In-memory lookup of existing keys, loaded from a manifest
+            (``{json_dir}/.manifest``) which is updated whenever a key is
+            added or removed, instead of listing ``json_dir`` every time the
+            datastore is opened. The manifest is created from ``json_dir``
+            the first time an object is set or deleted (datastores that are
+            only read are listed instead), and rebuilt when opened if
+            ``json_dir`` was modified after it, e.g. by adding files outside
+            of PyS2. Files added to shards of ``json_dir`` aren't detected;
+            see :meth:`check_manifest` and :meth:`rebuild_manifest`.
+    """
+    MANIFEST = ".manifest"
+    LAYOUT = ".layout"
+    LOCK = ".lock"
+    SKELETON = ".skeleton_fields"
 
     def __init__(self,
                  json_dir: Union[str, Path],
                  enforce_id: Optional[bool] = True,
-                 s2model: S2ModelT = S2Paper
+                 s2model: S2ModelT = S2Paper,
+                 trusted: bool = False,
+                 shard_depth: Optional[int] = None,
+                 compression: Optional[str] = None,
+                 compression_level: Optional[int] = None,
+                 fsync: bool = False,
+                 multi_writer: bool = False,
+                 skeleton: Optional[Sequence[str]] = None,
                  ):
-        super().__init__(s2model=s2model)
+        super().__init__(s2model, enforce_id, trusted, compression,
+                         compression_level)
         self.json_dir = Path(json_dir).absolute()
         self.json_dir.mkdir(exist_ok=True, parents=True)
-        self.enforce_id = enforce_id
-        # TODO: check if this slows things down considerably
-        self.s2ids = set([f.stem for f in self.json_dir.glob("*.json")])
+        self.fsync = fsync
+        self.multi_writer = multi_writer
+        self.manifest = KeyManifest(self.json_dir / self.MANIFEST)
+        layout = self._read_layout()
+        self.shard_depth = layout.get('shard_depth', 0)
+        self.skeleton = self._read_skeleton()
+        with self._locked():
+            if 'migrating_from' in layout and self.manifest.exists():
+                # keys are unchanged by migrations, which leave the directory
+                # modified after the manifest and objects in both layouts
+                self.s2ids = self.manifest.load()
+            else:
+                self.s2ids = self.manifest.keys(self._scan)
+        if 'migrating_from' in layout:
+            # resume interrupted migration
+            self.shard_depth = layout['migrating_from']
+            self.migrate(layout['shard_depth'])
+        if shard_depth is not None and shard_depth != self.shard_depth:
+            if self.s2ids:
+                raise ValueError(
+                    f"{self.json_dir} has shard_depth={self.shard_depth}; "
+                    f"use migrate({shard_depth}) to change its layout")
+            self.migrate(shard_depth)
+        if skeleton is not None and list(skeleton) != (self.skeleton or []):
+            self.build_skeletons(skeleton)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        if self.multi_writer:
+            with FileLock(self.json_dir / self.LOCK):
+                yield
+        else:
+            yield
+
+    def refresh(self) -> None:
+        """ Update :attr:`s2ids` with keys added or removed by other
+        instances since the manifest was last read. This is only needed in
+        ``multi_writer`` mode, where it is called automatically when a key is
+        not found (with :keyword:`in`) and before listing keys (with
+        :func:`len` or iterating).
+        """
+        if not self.manifest.update(self.s2ids):
+            # manifest was compacted, rebuilt or not created yet
+            with self._locked():
+                self.s2ids = self.manifest.keys(self._scan)
+
+    def _record(self, added: Iterable[S2Identifier] = (),
+                removed: Iterable[S2Identifier] = ()) -> None:
+        """ Record added and removed keys in :attr:`s2ids` and the manifest.
+        """
+        if not self.manifest.exists():
+            # created by the first write; objects are already written
+            self._rebuild_manifest()
+        elif self.multi_writer:
+            # keys may have been modified by other instances
+            self.manifest.add(*added)
+            self.manifest.remove(*removed)
+            # already locked
+            if not self.manifest.update(self.s2ids):
+                self.s2ids = self.manifest.load()
+            self.manifest.compact(self.s2ids)
+        else:
+            added = [k for k in dict.fromkeys(added) if k not in self.s2ids]
+            removed = [k for k in dict.fromkeys(removed) if k in self.s2ids]
+            self.s2ids.update(added)
+            self.s2ids.difference_update(removed)
+            self.manifest.add(*added)
+            self.manifest.remove(*removed)
+            self.manifest.compact(self.s2ids)
+
+    def _read_layout(self) -> Dict:
+        try:
+            return json.loads((self.json_dir / self.LAYOUT).read_text())
+        except FileNotFoundError:
+            return {}
+
+    def _write_layout(self, layout: Dict) -> None:
+        f = self.json_dir / self.LAYOUT
+        tmp = f.with_name(f"{f.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(layout))
+        os.replace(str(tmp), str(f))
+
+    def _read_skeleton(self) -> Optional[list]:
+        try:
+            return json.loads((self.json_dir / self.SKELETON).read_text())
+        except FileNotFoundError:
+            return None
+
+    def build_skeletons(self, fields: Optional[Sequence[str]] = None
+                        ) -> None:
+        """ Change the fields of the ``skeleton`` sidecars, and write the
+        sidecars of all objects.
+
+        Args:
+            fields (`Sequence[str]`, optional):
+                Fields of the sidecars, or ``[]`` to remove them.
+                Defaults to the current ``skeleton``.
+        """
+        fields = self.skeleton if fields is None else list(fields)
+        f = self.json_dir / self.SKELETON
+        if not fields:
+            f_tmp = None
+        else:
+            f_tmp = f.with_name(f"{f.name}.{os.getpid()}.tmp")
+            f_tmp.write_text(json.dumps(fields))
+        # sidecars are maintained by writes from here on
+        self.skeleton = fields or None
+        if f_tmp is not None:
+            os.replace(str(f_tmp), str(f))
+        for k in list(self):
+            sidecar = self._skeleton_path(self._path(k))
+            if fields:
+                try:
+                    b = self._path(k).read_bytes()
+                except FileNotFoundError:
+                    continue
+                tmp = self._write_tmp(sidecar, self._encode_skeleton(
+                    codec.loads(decompress(b))))
+                os.replace(str(tmp), str(sidecar))
+            else:
+                try:
+                    sidecar.unlink()
+                except FileNotFoundError:
+                    pass
+        if not fields:
+            try:
+                f.unlink()
+            except FileNotFoundError:
+                pass
+        # keys are unchanged
+        self.manifest.touch()
+
+    @staticmethod
+    def _skeleton_path(f: Path) -> Path:
+        return f.with_suffix(".skeleton")
+
+    def _encode_skeleton(self, v: Union[S2Model, Dict]) -> bytes:
+        projection = parse_fields(self.skeleton)
+        if not isinstance(v, dict):
+            v = v.dict(include=set(projection))
+        # fields are saved with each sidecar, in case they change while
+        # the sidecar is written
+        return codec.dumps({'fields': self.skeleton,
+                            'v': project(v, projection)})
+
+    def _unlink_skeleton(self, f: Path) -> None:
+        if self.skeleton:
+            try:
+                self._skeleton_path(f).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _path(self, k: S2Identifier, shard_depth: Optional[int] = None
+              ) -> Path:
+        shard_depth = self.shard_depth if shard_depth is None else shard_depth
+        if not shard_depth:
+            return self.json_dir / f"{k}.json"
+        h = hashlib.md5(k.encode('utf-8')).hexdigest()
+        shards = [h[2*i:2*i+2] for i in range(shard_depth)]
+        return self.json_dir.joinpath(*shards, f"{k}.json")
+
+    def _scan(self) -> Set[str]:
+        pattern = "/".join(["??"] * self.shard_depth + ["*.json"])
+        return set([f.stem for f in self.json_dir.glob(pattern)])
+
+    def migrate(self, shard_depth: int) -> None:
+        """ Move the stored jsons to a layout with ``shard_depth`` levels
+        of subdirectories (``0`` for a flat directory).
+
+        .. code-block:: python
+
+            pds = JsonDS.load_papers("pds")
+            pds.migrate(shard_depth=2)
+
+        The migration is resumed when the datastore is opened again if it is
+        interrupted. It should not run while other processes use the
+        datastore.
+        """
+        source_depth = self.shard_depth
+        self._write_layout({'shard_depth': shard_depth,
+                            'migrating_from': source_depth})
+        self.shard_depth = shard_depth
+        for k in self.s2ids:
+            src = self._path(k, source_depth)
+            dst = self._path(k, shard_depth)
+            if src == dst:
+                continue
+            dst.parent.mkdir(exist_ok=True, parents=True)
+            try:
+                os.replace(str(src), str(dst))
+            except FileNotFoundError:
+                # already moved
+                pass
+            if self.skeleton:
+                try:
+                    os.replace(str(self._skeleton_path(src)),
+                               str(self._skeleton_path(dst)))
+                except FileNotFoundError:
+                    pass
+        if source_depth > shard_depth:
+            # remove emptied shards, deepest first
+            for depth in range(source_depth, shard_depth, -1):
+                for d in self.json_dir.glob("/".join(["??"] * depth)):
+                    try:
+                        d.rmdir()
+                    except OSError:
+                        pass
+        if shard_depth:
+            self._write_layout({'shard_depth': shard_depth})
+        else:
+            (self.json_dir / self.LAYOUT).unlink()
+        # keys are unchanged
+        self.manifest.touch()
+
+    def check_manifest(self) -> Dict[str, Set[str]]:
+        """ Compare the keys in the manifest to the files in ``json_dir``.
+
+        Returns:
+            :obj:`dict`: Keys that are ``"missing"`` from the manifest, i.e.
+            files that were added outside of PyS2, and keys in the manifest
+            that are ``"stale"`` because their file no longer exists.
+        """
+        files = self._scan()
+        return {'missing': files - self.s2ids, 'stale': self.s2ids - files}
+
+    def rebuild_manifest(self) -> None:
+        """ Rebuild the manifest by listing the files in ``json_dir``. """
+        with self._locked():
+            self._rebuild_manifest()
+
+    def _rebuild_manifest(self) -> None:
+        self.s2ids = self._scan()
+        self.manifest.write(self.s2ids)
 
     def _check_file_exists(self, f: Union[str, Path]):
         if not Path(f).exists():
             raise KeyError(f"{f.stem} (No such file '{f}')")
 
+    def _write_tmp(self, f: Path, b: bytes) -> Path:
+        """ Write ``b`` to a temporary file next to ``f``. """
+        tmp = f.with_name(f".{f.name}.{os.getpid()}.{threading.get_ident()}"
+                          f".tmp")
+        try:
+            tmp.write_bytes(b)
+        except FileNotFoundError:
+            if not self.shard_depth:
+                raise
+            tmp.parent.mkdir(exist_ok=True, parents=True)
+            tmp.write_bytes(b)
+        return tmp
+
+    @staticmethod
+    def _fsync(paths: Iterable[Path]) -> None:
+        for p in paths:
+            if p.is_dir() and os.name != 'posix':
+                # directories can't be opened (or synced) on windows
+                continue
+            fd = os.open(str(p), os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
     def __contains__(self, k):
-        return k in self.s2ids
+        if k in self.s2ids:
+            return True
+        if self.multi_writer:
+            self.refresh()
+            return k in self.s2ids
+        return False
 
     def __delitem__(self, k):
         self._check_key_type(k)
-        f = (self.json_dir / f"{k}.json")
-        self._check_file_exists(f)
-        self.s2ids.remove(k)
-        f.unlink()
+        f = self._path(k)
+        with self._locked():
+            self._check_file_exists(f)
+            f.unlink()
+            self._unlink_skeleton(f)
+            self._record(removed=[k])
+        if self.fsync:
+            self._fsync([f.parent])
 
     def __getitem__(self, k):
         self._check_key_type(k)
-        f = (self.json_dir / f"{k}.json")
+        f = self._path(k)
         self._check_file_exists(f)
-        d = json.loads(f.read_bytes())
-        # TODO: figure out how to use construct and keep nested models
-        return self.s2model(**d)
+        return self._decode(f.read_bytes())
 
     def __len__(self):
+        if self.multi_writer:
+            self.refresh()
         return len(self.s2ids)
 
     def __iter__(self):
+        if self.multi_writer:
+            self.refresh()
+            # keys may be modified by other instances while iterating
+            return iter(list(self.s2ids))
         return self.s2ids.__iter__()
 
     def __setitem__(self, k: S2Identifier, v: S2Model):
-        self._check_key_type(k)
-        self._check_value_type(v)
-        if self.enforce_id:
-            self._check_s2id(k, v)
-        f = (self.json_dir / f"{k}.json")
-        f.write_text(v.json())
-        self.s2ids.add(k)
+        f = self._path(k)
+        tmps = {f: self._write_tmp(f, self._encode(k, v))}
+        if self.skeleton:
+            tmps[self._skeleton_path(f)] = self._write_tmp(
+                self._skeleton_path(f), self._encode_skeleton(v))
+        if self.fsync:
+            self._fsync(tmps.values())
+        with self._locked():
+            self._replace(tmps)
+            self._record(added=[k])
+        if self.fsync:
+            self._fsync([f.parent])
+
+    def _replace(self, tmps: Dict[Path, Path]) -> None:
+        """ Rename temporary files of objects and their sidecars. """
+        for f, tmp in tmps.items():
+            if f.suffix == ".json":
+                # an interruption leaves a missing rather than stale sidecar
+                self._unlink_skeleton(f)
+        for f, tmp in tmps.items():
+            if f.suffix == ".json":
+                os.replace(str(tmp), str(f))
+        for f, tmp in tmps.items():
+            if f.suffix != ".json":
+                os.replace(str(tmp), str(f))
+
+    def _read_skeleton_of(self, f: Path, projection: Projection
+                          ) -> Optional[S2Model]:
+        """ Read a projected object from its sidecar, if it exists and
+        covers ``projection``.
+        """
+        try:
+            d = codec.loads(self._skeleton_path(f).read_bytes())
+        except FileNotFoundError:
+            return None
+        if not covers(parse_fields(d['fields']), projection):
+            return None
+        return construct_trusted(self.s2model, project(d['v'], projection))
+
+    def get_many(self, keys: Iterable[S2Identifier],
+                 fields: Optional[Iterable[str]] = None,
+                 ) -> Dict[S2Identifier, S2Model]:
+        """ Get the objects for ``keys``, omitting keys that don't exist.
+        See :meth:`get` for ``fields``, which are read from the ``skeleton``
+        sidecars when they cover them.
+        """
+        projection = None if fields is None else parse_fields(fields)
+        use_skeleton = projection is not None and bool(self.skeleton) and \
+            covers(parse_fields(self.skeleton), projection)
+        objects = {}
+        for k in keys:
+            if k not in self:
+                continue
+            f = self._path(k)
+            if use_skeleton:
+                v = self._read_skeleton_of(f, projection)
+                if v is not None:
+                    objects[k] = v
+                    continue
+            try:
+                b = f.read_bytes()
+            except FileNotFoundError:
+                continue
+            objects[k] = self._decode(b, projection)
+        return objects
+
+    def set_many(self, items: Union[Mapping[S2Identifier, S2Model],
+                                    Iterable[Tuple[S2Identifier, S2Model]]],
+                 batch_size: int = 1000,
+                 ) -> None:
+        """ Set objects from a mapping or an iterable of key-value pairs.
+
+        Objects are written in batches: all objects of a batch are written to
+        temporary files, which (if ``fsync``) are synced, then renamed to
+        replace existing objects, before syncing each directory containing
+        them once. Each temporary file is still synced, as ``fsync`` only
+        guarantees the durability of a single file, but syncing them
+        back-to-back once they are all written, and syncing directories once
+        per batch instead of once per object, is several times faster than
+        setting objects one at a time. The manifest is updated once per
+        batch.
+
+        Args:
+            items (:obj:`Mapping` or :obj:`Iterable[Tuple]`):
+                Objects to set, by key.
+            batch_size (:obj:`int`, optional):
+                Number of objects per batch. Defaults to ``1000``.
+        """
+        if isinstance(items, Mapping):
+            items = items.items()
+        items = iter(items)
+        while True:
+            batch = list(islice(items, batch_size))
+            if not batch:
+                break
+            # validate and serialize the whole batch before writing
+            encoded = [(k, self._encode(k, v)) for k, v in batch]
+            files = {}
+            try:
+                for (k, b), (_, v) in zip(encoded, batch):
+                    f = self._path(k)
+                    if f in files:
+                        # same key set twice in a batch
+                        files.pop(f).unlink()
+                    files[f] = self._write_tmp(f, b)
+                    if self.skeleton:
+                        f = self._skeleton_path(f)
+                        if f in files:
+                            files.pop(f).unlink()
+                        files[f] = self._write_tmp(
+                            f, self._encode_skeleton(v))
+                if self.fsync:
+                    self._fsync(files.values())
+            except BaseException:
+                for tmp in files.values():
+                    tmp.unlink()
+                raise
+            with self._locked():
+                self._replace(files)
+                self._record(added=dict.fromkeys(k for k, _ in encoded))
+            if self.fsync:
+                self._fsync(set(f.parent for f in files))
 
+    def delete_many(self, keys: Iterable[S2Identifier]) -> None:
+        """ Delete the objects for ``keys``, ignoring keys that don't exist.
+        """
+        deleted = []
+        with self._locked():
+            for k in keys:
+                self._check_key_type(k)
+                try:
+                    self._path(k).unlink()
+                except FileNotFoundError:
+                    continue
+                self._unlink_skeleton(self._path(k))
+                deleted.append(k)
+            self._record(removed=deleted)
+        if self.fsync:
+            self._fsync(set(self._path(k).parent for k in deleted))
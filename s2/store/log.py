@@ -0,0 +1,325 @@
+from s2.store.base import SerializedDS, S2Identifier, S2ModelT, S2Model
+from s2.store.projection import parse_fields
+from s2.models import S2Paper
+import json
+import mmap
+import os
+import threading
+import weakref
+from collections import defaultdict
+
+from typing import (Union, Optional, Dict, Tuple, Iterator, Iterable,
+                    BinaryIO)
+from pathlib import Path
+
+# segment, offset and length of a value
+Position = Tuple[int, int, int]
+
+
+def _close_files(files: Dict) -> None:
+    for f in files.values():
+        f.close()
+    files.clear()
+
+
+class LogDS(SerializedDS):
+    """Dict-like interface to store S2 objects in append-only log segments.
+
+    Setting an object appends it to the active segment file in ``log_dir``
+    instead of creating a file per object as :class:`.JsonDS` does, which is
+    much faster for write-heavy workloads such as building large graphs.
+    Each record is a json header line (``{"k": key, "n": length}``) followed
+    by the serialized object on its own line, so segments remain readable
+    as JSON Lines (unless objects are compressed). An in-memory index maps
+    each key to the position of its latest value, which is read through a
+    memory map of its segment.
+
+    Overwritten and deleted objects are only reclaimed by :meth:`compact`,
+    which rewrites live objects into new segments. This happens
+    automatically when the active segment is full and more than
+    ``max_garbage`` of the stored bytes are garbage.
+
+    The index is saved to ``{log_dir}/index.json`` by :meth:`flush` and
+    :meth:`close` (also when pickling or using the datastore as a context
+    manager). Records appended after the index was last saved are recovered
+    by replaying the segments when the datastore is opened, so that no
+    objects are lost if it is not closed properly. Only one instance should
+    write to ``log_dir`` at a time.
+
+    Args:
+        log_dir (str or :class:`~pathlib.Path`):
+            Directory where segments are saved. If the directory does not
+            exist, it will be created.
+        enforce_id (`bool`, optional):
+            Enforce that a key be equal to the S2 identifier of the object
+            (if it exists; see :any:`saving_unknown`). Defaults to ``True``.
+        s2model (:class:`.S2Paper` or :class:`.S2Author`, optional):
+            Type of the stored objects; prefer using :meth:`load_papers` or
+            :meth:`load_authors`. Defaults to :class:`.S2Paper`.
+        trusted (`bool`, optional):
+            Skip validation when reading objects, see :class:`.JsonDS`.
+            Defaults to ``False``.
+        compression (`str`, optional):
+            Compress stored objects, see :class:`.JsonDS`.
+            Defaults to ``None``.
+        compression_level (`int`, optional):
+            Level of ``compression``. Defaults to the default level of the
+            compression library.
+        segment_size (`int`, optional):
+            Size in bytes beyond which a new segment is started.
+            Defaults to 64MB.
+        max_garbage (`float`, optional):
+            Fraction of garbage bytes beyond which the datastore is compacted
+            when starting a new segment, or ``None`` to only compact when
+            calling :meth:`compact`. Defaults to ``0.5``.
+    """
+    INDEX = "index.json"
+    SUFFIX = ".jsonl"
+
+    def __init__(self,
+                 log_dir: Union[str, Path],
+                 enforce_id: bool = True,
+                 s2model: S2ModelT = S2Paper,
+                 trusted: bool = False,
+                 compression: Optional[str] = None,
+                 compression_level: Optional[int] = None,
+                 segment_size: int = 2**26,
+                 max_garbage: Optional[float] = 0.5,
+                 ):
+        super().__init__(s2model, enforce_id, trusted, compression,
+                         compression_level)
+        self.log_dir = Path(log_dir).absolute()
+        self.log_dir.mkdir(exist_ok=True, parents=True)
+        self.segment_size = segment_size
+        self.max_garbage = max_garbage
+        self._open()
+
+    def _open(self):
+        self._lock = threading.RLock()
+        self._index: Dict[S2Identifier, Position] = {}
+        self._sizes: Dict[int, int] = {}
+        self._garbage: Dict[int, int] = defaultdict(int)
+        # open files and memory maps, closed when garbage collected
+        self._files: Dict = {}
+        self._finalizer = weakref.finalize(self, _close_files, self._files)
+        self._compacting = False
+
+        indexed = {}
+        try:
+            state = json.loads((self.log_dir / self.INDEX).read_text())
+        except FileNotFoundError:
+            state = None
+        if state is not None:
+            indexed = {int(s): n for s, n in state['sizes'].items()}
+            self._index = {k: tuple(p) for k, p in state['index'].items()}
+            self._garbage.update(
+                (int(s), n) for s, n in state['garbage'].items())
+        last_indexed = max(indexed, default=-1)
+        for seg in sorted(int(f.stem) for f in self.log_dir.glob(
+                f"*{self.SUFFIX}")):
+            if seg < last_indexed and seg not in indexed:
+                # leftover from a compaction interrupted after saving the
+                # index, whose objects were all copied to newer segments
+                self._segment_path(seg).unlink()
+                continue
+            self._sizes[seg] = indexed.get(seg, 0)
+            self._replay(seg)
+        if not self._sizes:
+            self._sizes[0] = 0
+        self._active = max(self._sizes)
+        self._writer: BinaryIO = open(self._segment_path(self._active), 'ab')
+        self._files['writer'] = self._writer
+
+    def _segment_path(self, seg: int) -> Path:
+        return self.log_dir / f"{seg:08d}{self.SUFFIX}"
+
+    def _replay(self, seg: int) -> None:
+        """ Index records of ``seg`` after the size it had when indexed. """
+        f = self._segment_path(seg)
+        offset = self._sizes[seg]
+        with open(f, 'rb') as fh:
+            fh.seek(offset)
+            while True:
+                header = fh.readline()
+                try:
+                    header = json.loads(header)
+                    n = header.get('n')
+                    # deleted objects are recorded with an empty value
+                    value = fh.read((n or 0) + 1)
+                    if len(value) != (n or 0) + 1 or value[-1:] != b'\n':
+                        raise ValueError
+                except ValueError:
+                    break
+                end = fh.tell()
+                self._update(header['k'], None if n is None else
+                             (seg, end - n - 1, n))
+                self._sizes[seg] = offset = end
+        if offset < f.stat().st_size:
+            # drop a record interrupted while being appended
+            with open(f, 'r+b') as fh:
+                fh.truncate(offset)
+
+    def _update(self, k: S2Identifier, position: Optional[Position]) -> None:
+        old = self._index.pop(k, None)
+        if old is not None:
+            self._garbage[old[0]] += old[2]
+        if position is not None:
+            self._index[k] = position
+
+    def _append(self, k: S2Identifier, value: Optional[bytes]) -> None:
+        n = None if value is None else len(value)
+        header = json.dumps({'k': k, 'n': n}).encode('utf-8') + b'\n'
+        record = header + (value or b'') + b'\n'
+        self._writer.write(record)
+        offset = self._sizes[self._active] + len(header)
+        self._sizes[self._active] += len(record)
+        self._update(k, None if value is None else (self._active, offset, n))
+        if self._sizes[self._active] >= self.segment_size:
+            self._roll()
+
+    def _roll(self) -> None:
+        """ Start a new active segment, compacting if needed. """
+        self._writer.close()
+        self._active += 1
+        self._sizes[self._active] = 0
+        self._writer = open(self._segment_path(self._active), 'ab')
+        self._files['writer'] = self._writer
+        if self.max_garbage is not None and not self._compacting and \
+                self.garbage > self.max_garbage:
+            self.compact()
+
+    def _read(self, position: Position) -> bytes:
+        seg, offset, n = position
+        if seg == self._active:
+            self._writer.flush()
+        m = self._files.get(seg)
+        if m is None or len(m) < offset + n:
+            if m is not None:
+                m.close()
+            with open(self._segment_path(seg), 'rb') as fh:
+                m = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            self._files[seg] = m
+        return m[offset:offset + n]
+
+    @property
+    def garbage(self) -> float:
+        """ Fraction of stored bytes used by overwritten or deleted objects.
+        """
+        size = sum(self._sizes.values())
+        return sum(self._garbage.values()) / size if size else 0.0
+
+    def compact(self) -> None:
+        """ Reclaim space used by overwritten or deleted objects, by copying
+        live objects to new segments and deleting previous segments.
+        """
+        with self._lock:
+            self._compacting = True
+            try:
+                self._roll()
+                first = self._active
+                sealed = [s for s in self._sizes if s < first]
+                for k, position in list(self._index.items()):
+                    if position[0] < first:
+                        self._append(k, self._read(position))
+                self.flush()
+                for seg in sealed:
+                    m = self._files.pop(seg, None)
+                    if m is not None:
+                        m.close()
+                    self._segment_path(seg).unlink()
+                    del self._sizes[seg]
+                    self._garbage.pop(seg, None)
+                self.flush()
+            finally:
+                self._compacting = False
+
+    def sync(self) -> None:
+        """ Write appended objects to disk with :func:`os.fsync`. """
+        with self._lock:
+            self._writer.flush()
+            os.fsync(self._writer.fileno())
+
+    def flush(self) -> None:
+        """ Sync appended objects and save the index. """
+        with self._lock:
+            self.sync()
+            state = {
+                'sizes': self._sizes,
+                'garbage': {s: n for s, n in self._garbage.items()
+                            if s in self._sizes},
+                'index': self._index,
+            }
+            f = self.log_dir / self.INDEX
+            tmp = f.with_name(f"{f.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(state))
+            os.replace(str(tmp), str(f))
+
+    def close(self) -> None:
+        """ Save the index and close open segments. """
+        with self._lock:
+            self.flush()
+            self._finalizer()
+
+    def __enter__(self) -> 'LogDS':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __getstate__(self):
+        # files can't be pickled (e.g. when saving an S2GraphBuilder)
+        self.flush()
+        state = self.__dict__.copy()
+        for k in ('_lock', '_index', '_sizes', '_garbage', '_files',
+                  '_finalizer', '_compacting', '_active', '_writer'):
+            del state[k]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._open()
+
+    def __contains__(self, k):
+        return k in self._index
+
+    def __delitem__(self, k):
+        self._check_key_type(k)
+        with self._lock:
+            if k not in self._index:
+                raise KeyError(k)
+            self._append(k, None)
+
+    def __getitem__(self, k):
+        self._check_key_type(k)
+        with self._lock:
+            position = self._index.get(k)
+            if position is None:
+                raise KeyError(k)
+            b = self._read(position)
+        return self._decode(b)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[S2Identifier]:
+        return iter(list(self._index))
+
+    def __setitem__(self, k: S2Identifier, v: S2Model):
+        b = self._encode(k, v)
+        with self._lock:
+            self._append(k, b)
+
+    def get_many(self, keys: Iterable[S2Identifier],
+                 fields: Optional[Iterable[str]] = None,
+                 ) -> Dict[S2Identifier, S2Model]:
+        """ Get the objects for ``keys``, omitting keys that don't exist.
+        See :meth:`get` for ``fields``.
+        """
+        projection = None if fields is None else parse_fields(fields)
+        found = {}
+        with self._lock:
+            for k in keys:
+                position = self._index.get(k)
+                if position is not None:
+                    found[k] = self._read(position)
+        return {k: self._decode(b, projection) for k, b in found.items()}
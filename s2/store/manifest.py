@@ -0,0 +1,168 @@
+import os
+from pathlib import Path
+
+from typing import Union, Set, Iterable, List, Callable
+
+import logging
+logger = logging.getLogger("s2")
+
+
+class KeyManifest:
+    """ Persistent set of the keys of a datastore, so that opening it does not
+    require listing a (potentially huge) directory.
+
+    The manifest is an append-only text file with one record per line:
+    ``+{k}`` when a key is added and ``-{k}`` when it is removed. Records
+    are replayed when loading the manifest, which is compacted into one
+    record per key once it contains mostly superseded records, when loaded
+    or by :meth:`compact` as keys are added or removed. Records appended by
+    other instances can be replayed with :meth:`update`.
+
+    The manifest is stale if its directory was modified after it (e.g. a
+    file was added outside of PyS2), which is checked by :meth:`keys` by
+    comparing their modification times. Note that this only detects files
+    added or removed directly in the directory, not in its subdirectories.
+
+    Args:
+        path (str or :class:`~pathlib.Path`):
+            Path of the manifest file.
+    """
+    _ADD = '+'
+    _REMOVE = '-'
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path).absolute()
+        # identity of the file and number of bytes read by load/update
+        self._inode = None
+        self._position = 0
+        # number of records read or written, and appended since
+        self._records = 0
+        self._appended = 0
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def fresh(self) -> bool:
+        """ Whether the manifest was modified after its directory. """
+        return self.path.stat().st_mtime_ns >= \
+            self.path.parent.stat().st_mtime_ns
+
+    def touch(self) -> None:
+        """ Mark the manifest as fresh after modifying its directory without
+        adding or removing keys (e.g. writing other files).
+        """
+        try:
+            os.utime(str(self.path))
+        except FileNotFoundError:
+            pass
+
+    def keys(self, scan: Callable[[], Set[str]]) -> Set[str]:
+        """ Load the keys of the manifest if it is fresh. Otherwise, the keys
+        are listed with ``scan`` and the stale manifest is rewritten. If
+        there is no manifest, it isn't created, so that directories that are
+        only read aren't modified; it can be created with :meth:`write`
+        when keys are first added or removed.
+        """
+        if not self.exists():
+            return scan()
+        if self.fresh():
+            return self.load()
+        logger.warning(f"{self.path} is older than its directory, which was "
+                       f"modified outside of PyS2; rebuilding it")
+        keys = scan()
+        self.write(keys)
+        return keys
+
+    def _replay(self, records: List[str], keys: Set[str]) -> None:
+        if not any(r[:1] == self._REMOVE for r in records):
+            keys.update(r[1:] for r in records)
+            return
+        for r in records:
+            if r[:1] == self._ADD:
+                keys.add(r[1:])
+            else:
+                keys.discard(r[1:])
+
+    def load(self) -> Set[str]:
+        """ Replay the manifest into the set of existing keys. """
+        with open(self.path, 'rb') as f:
+            self._inode = os.fstat(f.fileno()).st_ino
+            data = f.read()
+        # the last record is incomplete if interrupted while appended
+        end = data.rfind(b'\n') + 1
+        self._position = end
+        records = data[:end].decode('utf-8').split('\n')[:-1]
+        keys = set()
+        self._replay(records, keys)
+        self._records, self._appended = len(records), 0
+        if end < len(data):
+            self.write(keys)
+        else:
+            self.compact(keys)
+        return keys
+
+    def compact(self, keys: Set[str]) -> None:
+        """ Rewrite the manifest with one record per key if it contains
+        mostly superseded records. ``keys`` must be up to date with the
+        manifest (e.g. after :meth:`update`, while holding the lock of
+        the datastore if it is shared).
+        """
+        if self._records + self._appended > 2 * len(keys) + 1024:
+            self.write(keys)
+
+    def update(self, keys: Set[str]) -> bool:
+        """ Replay records appended (e.g. by other processes) since the
+        manifest was last loaded or updated into ``keys``.
+
+        Returns:
+            :obj:`bool`: ``False`` if the manifest was replaced since (e.g.
+            compacted) and must be loaded again instead.
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if st.st_ino != self._inode or st.st_size < self._position:
+            return False
+        if st.st_size == self._position:
+            return True
+        with open(self.path, 'rb') as f:
+            f.seek(self._position)
+            data = f.read()
+        end = data.rfind(b'\n') + 1
+        self._position += end
+        records = data[:end].decode('utf-8').split('\n')[:-1]
+        self._replay(records, keys)
+        # records appended by this instance were read back
+        self._records, self._appended = self._records + len(records), 0
+        return True
+
+    def _append(self, records: str) -> None:
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(records)
+
+    def add(self, *keys: str) -> None:
+        """ Record that ``keys`` were added. """
+        if keys:
+            self._append(''.join(f"{self._ADD}{k}\n" for k in keys))
+            self._appended += len(keys)
+
+    def remove(self, *keys: str) -> None:
+        """ Record that ``keys`` were removed. """
+        if keys:
+            self._append(''.join(f"{self._REMOVE}{k}\n" for k in keys))
+            self._appended += len(keys)
+
+    def write(self, keys: Iterable[str]) -> None:
+        """ Atomically replace the manifest with ``keys``. """
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        records = [f"{self._ADD}{k}\n" for k in keys]
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.writelines(records)
+            f.flush()
+            st = os.fstat(f.fileno())
+        os.replace(str(tmp), str(self.path))
+        # the rename modified the directory after the manifest
+        self.touch()
+        self._inode, self._position = st.st_ino, st.st_size
+        self._records, self._appended = len(records), 0
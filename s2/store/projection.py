@@ -0,0 +1,62 @@
+from s2.models import construct_trusted
+from pydantic import BaseModel
+from typing import Dict, Iterable, Optional, FrozenSet, Any, TypeVar
+
+ModelT = TypeVar('ModelT', bound=BaseModel)
+
+# top-level field -> nested fields to keep, or None to keep all of them
+Projection = Dict[str, Optional[FrozenSet[str]]]
+
+
+def parse_fields(fields: Iterable[str]) -> Projection:
+    """ Parse the fields of a projection, e.g. ``["paperId", "year",
+    "references.paperId"]``, where ``"references.paperId"`` keeps only the
+    ``paperId`` of each reference.
+    """
+    nested: Dict[str, Optional[set]] = {}
+    for f in fields:
+        name, _, sub = f.partition('.')
+        if not sub:
+            nested[name] = None
+        elif name not in nested:
+            nested[name] = {sub}
+        elif nested[name] is not None:
+            nested[name].add(sub)
+    return {name: None if sub is None else frozenset(sub)
+            for name, sub in nested.items()}
+
+
+def covers(available: Projection, projection: Projection) -> bool:
+    """ Whether data projected on ``available`` contains ``projection``. """
+    for name, sub in projection.items():
+        if name not in available:
+            return False
+        if available[name] is not None and (
+                sub is None or not sub <= available[name]):
+            return False
+    return True
+
+
+def _project_value(x: Any, sub: FrozenSet[str]) -> Any:
+    if isinstance(x, dict):
+        return {s: x[s] for s in sub if s in x}
+    if isinstance(x, list):
+        return [_project_value(y, sub) for y in x]
+    return x
+
+
+def project(d: Dict, projection: Projection) -> Dict:
+    """ Keep the fields of ``projection`` of a serialized object. """
+    projected = {}
+    for name, sub in projection.items():
+        if name not in d:
+            continue
+        x = d[name]
+        projected[name] = x if sub is None else _project_value(x, sub)
+    return projected
+
+
+def project_model(m: ModelT, projection: Projection) -> ModelT:
+    """ Copy of an object with only the fields of ``projection``. """
+    d = project(m.dict(include=set(projection)), projection)
+    return construct_trusted(type(m), d)
@@ -0,0 +1,241 @@
+from s2.store.base import SerializedDS, S2Identifier, S2ModelT, S2Model
+from s2.store.projection import parse_fields
+from s2.models import S2Paper
+import sqlite3
+import threading
+import weakref
+from itertools import islice
+
+from typing import (Union, Optional, Dict, Iterator, Iterable, Mapping,
+                    Tuple)
+from pathlib import Path
+
+
+def _flush(conn: sqlite3.Connection, table: str, pending: Dict) -> None:
+    if pending:
+        with conn:
+            conn.executemany(f"INSERT OR REPLACE INTO {table} (k, v) "
+                             f"VALUES (?, ?)", pending.items())
+        pending.clear()
+
+
+def _close(conn: sqlite3.Connection, table: str, pending: Dict) -> None:
+    try:
+        _flush(conn, table, pending)
+    finally:
+        conn.close()
+
+
+class SqliteDS(SerializedDS):
+    """Dict-like interface to store S2 objects in a single SQLite database.
+
+    Unlike :class:`.JsonDS`, opening the datastore doesn't require listing
+    its keys, which are indexed as the primary key of a table named after the
+    stored model (e.g. ``s2paper``), so that papers and authors can share the
+    same database file. The database uses write-ahead logging so that other
+    processes can read while objects are written.
+
+    Objects are set in batches of ``batch_size`` which are each inserted in a
+    single transaction; pending objects are readable from this instance but
+    only written to the database once the batch is full, or when calling
+    :meth:`flush` or :meth:`close` (also called when the datastore is garbage
+    collected, pickled, or used as a context manager).
+
+    .. code-block:: python
+
+        from s2.graph import S2Graph
+        from s2.store import SqliteDS
+
+        graph = S2Graph(papers=SqliteDS.load_papers("papers.sqlite"))
+
+    Args:
+        db_path (str or :class:`~pathlib.Path`):
+            Path of the SQLite database. If it does not exist, it will be
+            created.
+        enforce_id (`bool`, optional):
+            Enforce that a key be equal to the S2 identifier of the object
+            (if it exists; see :any:`saving_unknown`). Defaults to ``True``.
+        s2model (:class:`.S2Paper` or :class:`.S2Author`, optional):
+            Type of the stored objects; prefer using :meth:`load_papers` or
+            :meth:`load_authors`. Defaults to :class:`.S2Paper`.
+        trusted (`bool`, optional):
+            Skip validation when reading objects, see :class:`.JsonDS`.
+            Defaults to ``False``.
+        compression (`str`, optional):
+            Compress stored objects, see :class:`.JsonDS`.
+            Defaults to ``None``.
+        compression_level (`int`, optional):
+            Level of ``compression``. Defaults to the default level of the
+            compression library.
+        batch_size (`int`, optional):
+            Number of objects written per transaction. Use ``1`` to write
+            every object immediately. Defaults to ``1000``.
+        timeout (`float`, optional):
+            Seconds to wait for a lock held by another connection to the
+            database before raising an error. Defaults to ``30``.
+    """
+    def __init__(self,
+                 db_path: Union[str, Path],
+                 enforce_id: bool = True,
+                 s2model: S2ModelT = S2Paper,
+                 trusted: bool = False,
+                 compression: Optional[str] = None,
+                 compression_level: Optional[int] = None,
+                 batch_size: int = 1000,
+                 timeout: float = 30,
+                 ):
+        super().__init__(s2model, enforce_id, trusted, compression,
+                         compression_level)
+        self.db_path = Path(db_path).absolute()
+        self.db_path.parent.mkdir(exist_ok=True, parents=True)
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.table = s2model.__name__.lower()
+        self._connect()
+
+    def _connect(self):
+        self._lock = threading.RLock()
+        self._pending: Dict[S2Identifier, bytes] = {}
+        self._conn = sqlite3.connect(str(self.db_path), timeout=self.timeout,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # in WAL mode, commits are durable across application crashes
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} "
+                               f"(k TEXT PRIMARY KEY, v BLOB NOT NULL) "
+                               f"WITHOUT ROWID")
+        self._finalizer = weakref.finalize(self, _close, self._conn,
+                                           self.table, self._pending)
+
+    def flush(self) -> None:
+        """ Write pending objects to the database. """
+        with self._lock:
+            _flush(self._conn, self.table, self._pending)
+
+    def close(self) -> None:
+        """ Write pending objects and close the database connection. """
+        with self._lock:
+            self._finalizer()
+
+    def __enter__(self) -> 'SqliteDS':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __getstate__(self):
+        # connections can't be pickled (e.g. when saving an S2GraphBuilder)
+        self.flush()
+        state = self.__dict__.copy()
+        for k in ('_lock', '_pending', '_conn', '_finalizer'):
+            del state[k]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._connect()
+
+    def __contains__(self, k):
+        with self._lock:
+            if k in self._pending:
+                return True
+            row = self._conn.execute(
+                f"SELECT 1 FROM {self.table} WHERE k = ?", (k,)).fetchone()
+        return row is not None
+
+    def __delitem__(self, k):
+        self._check_key_type(k)
+        with self._lock:
+            pending = self._pending.pop(k, None)
+            with self._conn:
+                cur = self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE k = ?", (k,))
+        if pending is None and cur.rowcount == 0:
+            raise KeyError(k)
+
+    def __getitem__(self, k):
+        self._check_key_type(k)
+        with self._lock:
+            b = self._pending.get(k)
+            if b is None:
+                row = self._conn.execute(
+                    f"SELECT v FROM {self.table} WHERE k = ?", (k,)
+                ).fetchone()
+                if row is None:
+                    raise KeyError(k)
+                b = row[0]
+        return self._decode(b)
+
+    def __len__(self):
+        with self._lock:
+            self.flush()
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def __iter__(self) -> Iterator[S2Identifier]:
+        with self._lock:
+            self.flush()
+            # keys are fetched upfront so the datastore can be modified
+            # while iterating
+            rows = self._conn.execute(
+                f"SELECT k FROM {self.table}").fetchall()
+        return (k for k, in rows)
+
+    def __setitem__(self, k: S2Identifier, v: S2Model):
+        b = self._encode(k, v)
+        with self._lock:
+            self._pending[k] = b
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def get_many(self, keys: Iterable[S2Identifier],
+                 fields: Optional[Iterable[str]] = None,
+                 ) -> Dict[S2Identifier, S2Model]:
+        """ Get the objects for ``keys``, omitting keys that don't exist.
+        See :meth:`get` for ``fields``.
+        """
+        projection = None if fields is None else parse_fields(fields)
+        found = {}
+        keys = iter(keys)
+        with self._lock:
+            while True:
+                # stay below the maximum number of sql variables
+                chunk = list(islice(keys, 500))
+                if not chunk:
+                    break
+                for k in chunk:
+                    if k in self._pending:
+                        found[k] = self._pending[k]
+                query = ",".join("?" * len(chunk))
+                for k, b in self._conn.execute(
+                        f"SELECT k, v FROM {self.table} WHERE k IN ({query})",
+                        chunk):
+                    found.setdefault(k, b)
+        return {k: self._decode(b, projection) for k, b in found.items()}
+
+    def set_many(self, items: Union[Mapping[S2Identifier, S2Model],
+                                    Iterable[Tuple[S2Identifier, S2Model]]]
+                 ) -> None:
+        """ Set objects from a mapping or an iterable of key-value pairs,
+        in transactions of at least ``batch_size`` objects.
+        """
+        if isinstance(items, Mapping):
+            items = items.items()
+        for k, v in items:
+            self[k] = v
+        self.flush()
+
+    def delete_many(self, keys: Iterable[S2Identifier]) -> None:
+        """ Delete the objects for ``keys``, ignoring keys that don't exist.
+        """
+        keys = list(keys)
+        for k in keys:
+            self._check_key_type(k)
+        with self._lock:
+            for k in keys:
+                self._pending.pop(k, None)
+            with self._conn:
+                self._conn.executemany(
+                    f"DELETE FROM {self.table} WHERE k = ?",
+                    ((k,) for k in keys))
@@ -46,12 +46,23 @@ setup(
         "pydantic >=1.8, <2.0",
     ],
     extras_require={
+        "aio": [
+            "aiohttp >=3.6, <4.0",
+        ],
+        "orjson": [
+            "orjson >=3.0",
+        ],
+        "numpy": [
+            "numpy >=1.15",
+        ],
         "readthedocs": [
             "sphinx >= 3, <4.0",
             "sphinx-autodoc-typehints >= 1.11, <2.0 "
         ],
         "test": [
+            "aiohttp >=3.6, <4.0",
             "betamax >=0.8, <0.9",
+            "numpy >=1.15",
             "pytest >=6, <7",
         ],
     },
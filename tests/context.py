@@ -5,11 +5,11 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 import s2
 from s2 import api, models
 from s2.db import JsonS2PaperDB, JsonS2AuthorDB
-from s2.store import JsonDS
+from s2.store import JsonDS, SqliteDS, LogDS, CachedDS, IndexedDS
 from s2.graph import S2Graph
 from s2.graph import (GraphHopper, MaxHopHopper, MaxPaperHopper, BowtieHopper,
                       LivingLitReviewHopper)
-from s2.graph import S2GraphBuilder
+from s2.graph import S2GraphBuilder, CSRGraph
 from pathlib import Path
 
 
@@ -0,0 +1,96 @@
+from unittest import TestCase
+from ..context import S2Graph, S2GraphBuilder, MaxHopHopper, CSRGraph
+from .test_builder import load_s2graph
+import pytest
+
+np = pytest.importorskip("numpy")
+from s2.graph.analytics import (CitationGraph, in_degree, out_degree,
+                                pagerank, hits, k_core, cocitation, coupling)
+
+
+def citation_graph(cites):
+    nodes = sorted(set(cites) | set(v for vs in cites.values() for v in vs))
+    src = [nodes.index(u) for u, vs in cites.items() for _ in vs]
+    dst = [nodes.index(v) for vs in cites.values() for v in vs]
+    return CitationGraph(nodes, src, dst)
+
+
+def pagerank_python(cites, nodes, damping=0.85, n_iter=100):
+    n = len(nodes)
+    r = dict.fromkeys(nodes, 1 / n)
+    for _ in range(n_iter):
+        dangling = sum(r[u] for u in nodes if not cites.get(u))
+        r_new = dict.fromkeys(nodes, (damping * dangling + 1 - damping) / n)
+        for u, vs in cites.items():
+            for v in vs:
+                r_new[v] += damping * r[u] / len(vs)
+        r = r_new
+    return r
+
+
+class TestAnalytics(TestCase):
+    def setUp(self):
+        self.cites = {'a': ['b', 'c'], 'b': ['c'], 'c': ['a'], 'd': ['c'],
+                      'e': ['a', 'b', 'd']}
+        self.cg = citation_graph(self.cites)
+
+    def test_from_graph(self):
+        builder = S2GraphBuilder(graph=load_s2graph(), hopper=MaxHopHopper(2))
+        builder.from_paper_id('8d8844106e7bc83d49ea3544ab2dfc74cd8f258a')
+        edges = builder.graph.edges
+        cites = set()
+        for pid, neighbours in edges.items():
+            cites.update((pid, t) for t, _ in neighbours['reference'])
+            cites.update((t, pid) for t, _ in neighbours['citation'])
+        cg = CitationGraph.from_graph(builder.graph)
+        assert cg.num_edges == len(cites)
+        assert cg.as_dict(in_degree(cg)) == {
+            pid: sum(v == pid for _, v in cites) for pid in cg.nodes}
+        cg_csr = CitationGraph.from_graph(CSRGraph.from_s2graph(builder.graph))
+        assert (cg_csr.out_indices == cg.out_indices).all()
+        assert CitationGraph.from_graph(S2Graph()).num_edges == 0
+
+    def test_degrees(self):
+        cg = self.cg
+        assert cg.as_dict(in_degree(cg)) == \
+            {'a': 2, 'b': 2, 'c': 3, 'd': 1, 'e': 0}
+        assert cg.as_dict(out_degree(cg)) == \
+            {'a': 2, 'b': 1, 'c': 1, 'd': 1, 'e': 3}
+        # duplicated edges are merged
+        cg = CitationGraph(['a', 'b'], [0, 0, 1], [1, 1, 0])
+        assert cg.num_edges == 2
+
+    def test_pagerank(self):
+        r = pagerank(self.cg, tol=1e-10)
+        assert r.sum() == pytest.approx(1)
+        expected = pagerank_python(self.cites, self.cg.nodes)
+        for pid, x in self.cg.as_dict(r).items():
+            assert x == pytest.approx(expected[pid], abs=1e-8)
+        # dangling papers
+        cg = citation_graph({'a': ['b'], 'c': ['b']})
+        expected = pagerank_python({'a': ['b'], 'c': ['b']}, cg.nodes)
+        for pid, x in cg.as_dict(pagerank(cg, tol=1e-10)).items():
+            assert x == pytest.approx(expected[pid], abs=1e-8)
+
+    def test_hits(self):
+        cg = citation_graph({'a': ['c'], 'b': ['c', 'd']})
+        h, a = hits(cg)
+        assert cg.as_dict(a)['c'] > cg.as_dict(a)['d'] > 0
+        assert cg.as_dict(h)['b'] > cg.as_dict(h)['a'] > 0
+        assert a[cg.node_id('a')] == h[cg.node_id('c')] == 0
+        assert h.sum() == pytest.approx(1) and a.sum() == pytest.approx(1)
+
+    def test_k_core(self):
+        cg = citation_graph({'a': ['b', 'c', 'a'], 'b': ['c', 'a'],
+                             'd': ['a'], 'e': []})
+        assert cg.as_dict(k_core(cg)) == \
+            {'a': 2, 'b': 2, 'c': 2, 'd': 1, 'e': 0}
+
+    def test_similarity(self):
+        cg = citation_graph({'x': ['a', 'b'], 'y': ['a', 'b', 'c'],
+                             'z': ['a', 'd']})
+        assert cocitation(cg)['a'] == [('b', 2), ('c', 1), ('d', 1)]
+        assert cocitation(cg, k=1, papers=['c']) == {'c': [('a', 1)]}
+        assert cocitation(cg)['x'] == []
+        assert coupling(cg)['y'] == [('x', 2), ('z', 1)]
+        assert coupling(cg, papers=['z']) == {'z': [('x', 1), ('y', 1)]}
@@ -1,5 +1,6 @@
 from pathlib import Path
-from unittest import TestCase
+from collections import deque
+from unittest import TestCase, mock
 from ..context import models, rm_tree
 from ..context import JsonDS, S2Graph, S2GraphBuilder, MaxHopHopper
 
@@ -7,6 +8,8 @@ from betamax import Betamax
 from requests import Session
 from requests.exceptions import HTTPError
 import pytest
+import threading
+import time
 
 with Betamax.configure() as config:
     config.cassette_library_dir = 'tests/fixtures/cassettes'
@@ -69,3 +72,144 @@ class TestGraphBuilder(TestCase):
         with pytest.raises(RecursionError):
             self.builder._get_gpath(self.root_paperId)
 
+
+    def test_journal(self):
+        journal_path = Path('tests/fixtures/graph/tmp_builder.journal')
+        self.addCleanup(lambda: rm_tree(journal_path))
+
+        def new_builder(**kwargs):
+            return S2GraphBuilder(graph=load_s2graph(), hopper=MaxHopHopper(2),
+                                  queue=deque(), journal_path=journal_path,
+                                  journal_every=5, save_path=self.save_path,
+                                  **kwargs)
+
+        def state(builder):
+            return (list(builder.queue), builder.discovered_from,
+                    dict(builder.graph.edges), builder.not_found)
+
+        # uninterrupted build, then replayed
+        self.builder.from_paper_id(self.root_paperId)
+        expected = state(self.builder)
+        builder = new_builder()
+        builder.from_paper_id(self.root_paperId)
+        assert state(builder) == expected
+        builder.close()
+        assert builder._journal is None
+        with new_builder() as builder:
+            assert state(builder) == expected
+        # builders with default graphs and queues don't share them
+        with S2GraphBuilder(journal_path=journal_path) as a, \
+                S2GraphBuilder(journal_path=journal_path) as b:
+            assert state(a) == state(b) == expected
+            assert a.graph is not b.graph and a.queue is not b.queue
+        rm_tree(journal_path)
+
+        # killed while building
+        get_paper = S2GraphBuilder._get_paper
+        calls = []
+
+        def killed_get_paper(builder, pid):
+            calls.append(pid)
+            if len(calls) == 23:
+                raise SystemExit
+            return get_paper(builder, pid)
+
+        killed = mock.patch.object(S2GraphBuilder, '_get_paper', autospec=True,
+                                   side_effect=killed_get_paper)
+        builder = new_builder()
+        with killed, pytest.raises(SystemExit):
+            builder.from_paper_id(self.root_paperId)
+        # steps after the last write (every 5 steps, including queuing the
+        # root paper) are lost
+        resumed = new_builder()
+        assert len(resumed.graph.edges) == 19
+        resumed.from_paper_id(self.root_paperId)
+        assert state(resumed) == expected
+
+        # saved builders replay the journal from where it was when saved
+        rm_tree(journal_path)
+        builder = new_builder()
+        calls.clear()
+        with killed, pytest.raises(SystemExit):
+            builder.from_paper_id(self.root_paperId)
+        builder.save()
+        n_saved = len(builder.graph.edges)
+        calls.clear()
+        with killed, pytest.raises(SystemExit):
+            builder.build_from_queue()
+        # step interrupted while being written
+        with open(journal_path, 'ab') as f:
+            f.write(b'{"p": "trunc')
+        loaded = S2GraphBuilder.load(self.save_path)
+        assert len(loaded.graph.edges) == n_saved + 20
+        assert journal_path.read_bytes().endswith(b'}\n')
+        loaded.build_from_queue()
+        assert state(loaded) == expected
+
+        # interrupted halfway through adding a paper, after queuing some of
+        # its neighbours
+        rm_tree(journal_path)
+        add_to_queue = S2GraphBuilder._add_to_queue
+        calls.clear()
+
+        def interrupted_add_to_queue(builder, ref, source, edge_type):
+            add_to_queue(builder, ref, source, edge_type)
+            calls.append(source)
+            if len(calls) > 30 and 'q' in builder._step:
+                raise KeyboardInterrupt
+
+        interrupted = mock.patch.object(
+            S2GraphBuilder, '_add_to_queue', autospec=True,
+            side_effect=interrupted_add_to_queue)
+        builder = new_builder()
+        with interrupted, pytest.raises(KeyboardInterrupt):
+            builder.from_paper_id(self.root_paperId)
+        # the paper is added again when resumed
+        assert builder.queue[0] == calls[-1]
+        assert calls[-1] not in builder.graph.edges
+        loaded = S2GraphBuilder.load(self.save_path)
+        assert state(loaded) == state(builder)
+        loaded.build_from_queue()
+        assert state(loaded) == expected
+        assert state(new_builder()) == expected
+        builder.build_from_queue()
+        assert state(builder) == expected
+
+    def test_workers(self):
+        fetched = load_s2graph().papers
+        missing = 'c4e3be316ce0d5dfc9ec7b19298e9483484cc252'
+        active, max_active = [0], [0]
+        lock = threading.Lock()
+
+        def get_s2paper(pid, **kwargs):
+            # simulated API with latency
+            with lock:
+                active[0] += 1
+                max_active[0] = max(max_active[0], active[0])
+            time.sleep(0.005)
+            with lock:
+                active[0] -= 1
+            if pid == missing:
+                response = mock.Mock(status_code=404)
+                raise HTTPError(response=response)
+            return fetched[pid]
+
+        def build(workers):
+            graph = load_s2graph()
+            # papers that are not in the datastore are fetched from the api
+            for pid in list(graph.papers)[1::2]:
+                if pid != self.root_paperId:
+                    del graph.papers[pid]
+            graph.papers[self.root_paperId].references[0].paperId = missing
+            builder = S2GraphBuilder(graph=graph, hopper=MaxHopHopper(2),
+                                     queue=deque(), workers=workers)
+            with mock.patch('s2.api._get_s2paper', side_effect=get_s2paper):
+                builder.from_paper_id(self.root_paperId)
+            return (list(builder.queue), builder.discovered_from,
+                    dict(builder.graph.edges), builder.not_found)
+
+        expected = build(workers=1)
+        assert expected[3] == {missing}
+        assert max_active[0] == 1
+        assert build(workers=8) == expected
+        assert max_active[0] > 1
@@ -0,0 +1,90 @@
+from pathlib import Path
+from unittest import TestCase
+from ..context import rm_tree, S2GraphBuilder, MaxHopHopper, CSRGraph
+from .test_builder import load_s2graph
+from s2.graph.csr import pack_meta, unpack_meta
+import pickle
+import pytest
+
+
+class TestCSRGraph(TestCase):
+    def setUp(self):
+        self.root_paperId = '8d8844106e7bc83d49ea3544ab2dfc74cd8f258a'
+        builder = S2GraphBuilder(graph=load_s2graph(), hopper=MaxHopHopper(2))
+        builder.from_paper_id(self.root_paperId)
+        self.graph = builder.graph
+
+    def test_meta(self):
+        for meta in [{'intent': None, 'isInfluential': None},
+                     {'intent': [], 'isInfluential': False},
+                     {'intent': ['background', 'result'],
+                      'isInfluential': True}]:
+            assert unpack_meta(pack_meta(meta)) == meta
+        meta = {'intent': ['result', 'unknown'], 'isInfluential': True}
+        assert unpack_meta(pack_meta(meta)) == {'intent': ['result'],
+                                                'isInfluential': True}
+
+    def test_csr(self):
+        edges = self.graph.edges
+        csr = CSRGraph.from_s2graph(self.graph)
+        assert set(csr) == set(edges)
+        assert len(csr) == len(edges)
+        assert csr.nodes == sorted(csr.nodes)
+        n_edges = sum(len(n[t]) for n in edges.values() for t in n)
+        assert csr.num_edges() == n_edges
+        assert csr.nbytes < 6 * n_edges + 9 * 3 * (csr.num_nodes + 1)
+
+        for pid, neighbours in edges.items():
+            for edge_type, edge_list in neighbours.items():
+                assert list(csr.neighbours(pid, edge_type)) == \
+                    [t for t, _ in edge_list]
+                assert csr.degree(pid, edge_type) == len(edge_list)
+                for (t, meta), (t_csr, meta_csr) in zip(
+                        edge_list, csr.edges(pid, edge_type)):
+                    assert t == t_csr
+                    assert meta_csr['isInfluential'] == meta['isInfluential']
+                    assert set(meta_csr['intent']) == set(meta['intent'])
+        i = csr.node_id(self.root_paperId)
+        assert csr.paper_id(i) == self.root_paperId
+        assert [csr.paper_id(j) for j in csr.neighbour_ids(i, 'citation')] \
+            == list(csr.neighbours(self.root_paperId, 'citation'))
+        assert 'missing' not in csr
+        with pytest.raises(KeyError):
+            csr.node_id('missing')
+
+        # round trip, up to the order of intents
+        edges_csr = CSRGraph.from_s2graph(self.graph).to_edges()
+        assert CSRGraph.from_s2graph(
+            type(self.graph)(edges=edges_csr)).to_edges() == edges_csr
+        assert set(edges_csr) == set(edges)
+
+        csr = CSRGraph.from_s2graph(self.graph, edge_types=['citation'])
+        assert list(csr.adjacency) == ['citation']
+        assert csr.num_edges() == sum(len(n['citation'])
+                                      for n in edges.values())
+
+    def test_save_load(self):
+        path = Path("tests/fixtures/graph/tmp_graph.csr")
+        self.addCleanup(lambda: rm_tree(path))
+        csr = CSRGraph.from_s2graph(self.graph)
+        csr.save(path)
+        for mmap_mode in (True, False):
+            loaded = CSRGraph.load(path, mmap_mode=mmap_mode)
+            assert list(loaded.nodes) == list(csr.nodes)
+            assert loaded.to_edges() == csr.to_edges()
+            assert list(loaded.neighbours(self.root_paperId, 'citation')) == \
+                list(csr.neighbours(self.root_paperId, 'citation'))
+            assert loaded.nbytes == csr.nbytes
+            assert (loaded.path is not None) == mmap_mode
+            # memory-mapped graphs are reopened when unpickled
+            unpickled = pickle.loads(pickle.dumps(loaded))
+            assert unpickled.to_edges() == csr.to_edges()
+        assert loaded.nodes[-1] == csr.nodes[-1]
+        assert loaded.nodes[:2] == csr.nodes[:2]
+        # saving a loaded graph
+        loaded = CSRGraph.load(path)
+        loaded.save(path)
+        assert CSRGraph.load(path).to_edges() == csr.to_edges()
+        path.write_bytes(b"not a graph")
+        with pytest.raises(ValueError):
+            CSRGraph.load(path)
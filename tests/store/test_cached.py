@@ -0,0 +1,85 @@
+from pathlib import Path
+from unittest import TestCase
+import pickle
+import pytest
+from ..context import rm_tree, JsonDS, CachedDS
+
+
+class TestCached(TestCase):
+    def setUp(self):
+        fixtures = Path("tests/fixtures/store/json")
+        self.pds_path = fixtures / "s2papers"
+        self.pds_path_tmp = fixtures / "s2papers_cached_tmp"
+        assert not self.pds_path_tmp.exists()
+        self.addCleanup(lambda: rm_tree(self.pds_path_tmp))
+
+    def test_lru(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        keys = list(pds)
+        cds = CachedDS(pds, max_entries=2)
+        for k in keys[:2] * 3:
+            assert cds[k] == pds[k]
+        assert cds[keys[0]] is cds[keys[0]]
+        assert (cds.stats.hits, cds.stats.misses) == (6, 2)
+        # least recently used object is evicted
+        _ = cds[keys[0]]
+        _ = cds[keys[2]]
+        assert cds.stats.evictions == 1
+        assert cds.get_many(keys[::-1]) == pds.get_many(keys)
+        assert (cds.stats.hits, cds.stats.misses) == (9, 4)
+        assert cds.stats.hit_rate == 9 / 13
+        with pytest.raises(KeyError):
+            _ = cds["missing"]
+        assert len(cds) == len(pds)
+        assert set(cds) == set(pds)
+
+        # bounded by approximate size
+        sizes = {k: cds.sizeof(pds[k]) for k in keys}
+        cds = CachedDS(pds, max_entries=None, max_bytes=max(sizes.values()))
+        for k in keys:
+            _ = cds[k]
+        assert len(cds._cache) == 1
+        assert cds.size == sizes[keys[-1]]
+        assert cds.stats.evictions == len(keys) - 1
+
+        # projected objects are read from the cache, but not cached
+        cds = CachedDS(pds, max_entries=2)
+        _ = cds[keys[0]]
+        fields = ["year", "citations.paperId"]
+        assert cds.get_many(keys, fields=fields) == \
+            pds.get_many(keys, fields=fields)
+        assert (cds.stats.hits, cds.stats.misses) == (1, len(keys))
+        assert list(cds._cache) == keys[:1]
+
+    def test_write(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        keys = list(pds)
+        pds_tmp = JsonDS.load_papers(self.pds_path_tmp)
+        cds = CachedDS(pds_tmp, max_entries=2)
+        p = pds[keys[0]]
+        cds[keys[0]] = p
+        assert keys[0] in pds_tmp
+        assert cds[keys[0]] is p
+        assert cds.stats.hits == 1
+        del cds[keys[0]]
+        assert keys[0] not in pds_tmp and keys[0] not in cds
+        with pytest.raises(KeyError):
+            del cds[keys[0]]
+
+        # write-back only writes evicted or flushed objects
+        cds = CachedDS(pds_tmp, max_entries=2, write_back=True)
+        cds.set_many((k, pds[k]) for k in keys)
+        assert set(pds_tmp) == set(keys[:1])
+        assert set(cds) == set(keys)
+        cds[keys[0]] = pds[keys[0]]
+        del cds[keys[0]]
+        with pytest.raises(KeyError):
+            cds[keys[0][:-1]] = pds[keys[0]]
+        cds[keys[0]] = pds[keys[0]]
+        cds_pickled = pickle.loads(pickle.dumps(cds))
+        assert set(pds_tmp) == set(keys)
+        assert cds_pickled[keys[0]] == pds[keys[0]]
+        cds[keys[1]] = pds[keys[1]]
+        del cds
+        # written when garbage collected
+        assert JsonDS.load_papers(self.pds_path_tmp)[keys[1]] == pds[keys[1]]
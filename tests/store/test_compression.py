@@ -0,0 +1,48 @@
+from pathlib import Path
+from unittest import TestCase
+import pytest
+from ..context import rm_tree, JsonDS, SqliteDS, LogDS
+from s2.store.compression import COMPRESSIONS, compress, decompress
+
+
+class TestCompression(TestCase):
+    def setUp(self):
+        fixtures = Path("tests/fixtures/store")
+        self.pds_path = fixtures / "json" / "s2papers"
+        self.tmp = fixtures / "compression_tmp"
+        assert not self.tmp.exists()
+        self.addCleanup(lambda: rm_tree(self.tmp))
+
+    def test_compress(self):
+        b = JsonDS.load_papers(self.pds_path)[
+            "bdfa1a62c964f19b5ce000d7812ba9f66456a4a4"].json().encode()
+        assert compress(b) is b
+        assert decompress(b) is b
+        for compression in COMPRESSIONS:
+            for level in (None, 1):
+                c = compress(b, compression, level)
+                assert len(c) < len(b)
+                assert decompress(c) == b
+        with pytest.raises(ValueError):
+            compress(b, 'bz2')
+        with pytest.raises(ValueError):
+            JsonDS.load_papers(self.tmp / "json", compression='bz2')
+
+    def test_mixed_stores(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        stores = [
+            lambda **kw: JsonDS.load_papers(self.tmp / "json", **kw),
+            lambda **kw: SqliteDS.load_papers(self.tmp / "s2.sqlite", **kw),
+            lambda **kw: LogDS.load_papers(self.tmp / "log", **kw),
+        ]
+        for load in stores:
+            # each object is written with a different compression
+            for k, compression in zip(pds, (None,) + COMPRESSIONS):
+                ds = load(compression=compression)
+                ds[k] = pds[k]
+                if hasattr(ds, 'close'):
+                    ds.close()
+            ds = load()
+            assert set(ds) == set(pds)
+            for k in pds:
+                assert ds[k] == pds[k]
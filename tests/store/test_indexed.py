@@ -0,0 +1,89 @@
+from pathlib import Path
+from unittest import TestCase
+import pickle
+import pytest
+from ..context import rm_tree, JsonDS, SqliteDS, IndexedDS
+
+
+class TestIndexed(TestCase):
+    def setUp(self):
+        fixtures = Path("tests/fixtures/store/json")
+        self.pds_path = fixtures / "s2papers"
+        self.ads_path = fixtures / "s2authors"
+        self.pds_path_tmp = fixtures / "s2papers_indexed_tmp"
+        self.index_path = fixtures / "s2papers_indexed_tmp.sqlite"
+        assert not self.pds_path_tmp.exists()
+        self.addCleanup(lambda: rm_tree(self.pds_path_tmp))
+        for suffix in ("", "-wal", "-shm"):
+            p = self.index_path.with_name(self.index_path.name + suffix)
+            self.addCleanup(lambda p=p: rm_tree(p))
+
+    def test_find(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        ids = IndexedDS(pds, self.index_path)
+        assert ids.find(doi="10.1056/nejmp2003762") == {
+            "bdfa1a62c964f19b5ce000d7812ba9f66456a4a4"}
+        assert ids.find(corpusId=37297538) == {
+            "c656a68a2bf155fa1a8ef4dd38a0af2cac3911da"}
+        assert ids.find(authorId="144794037") == set(pds)
+        assert ids.find(authorId="144794037", year=range(1990, 2010)) == {
+            "c656a68a2bf155fa1a8ef4dd38a0af2cac3911da",
+            "a04fc380c61040c7ffa21375bf2a0c9d30b674a4"}
+        assert ids.find(authorId="2896803", year=2020) == set()
+        assert ids.find(arxivId="1407.5648") == set()
+        # values are converted to the indexed type of their field
+        assert ids.find(year="2007") == ids.find(year=2007) != set()
+        assert ids.find(corpusId="37297538") == {
+            "c656a68a2bf155fa1a8ef4dd38a0af2cac3911da"}
+        assert ids.find(doi="10.1056/NEJMP2003762") == {
+            "bdfa1a62c964f19b5ce000d7812ba9f66456a4a4"}
+        with pytest.raises(TypeError):
+            ids.find(year="two thousand")
+        with pytest.raises(TypeError):
+            ids.find(venue=[2007])
+        # empty venues aren't indexed
+        assert ids.value_counts("venue") == {
+            "Scientific American": 1, "The New England journal of medicine": 1}
+        assert ids.value_counts("year") == {1997: 1, 2007: 1, 2020: 1}
+        # still a mapping of the wrapped store
+        assert sorted(p.paperId for p in ids.values()) == sorted(pds)
+        with pytest.raises(ValueError):
+            ids.find(title="Scientific American")
+        with pytest.raises(ValueError):
+            ids.find()
+        with pytest.raises(TypeError):
+            IndexedDS(JsonDS.load_authors(self.ads_path), self.index_path)
+        ids.close()
+
+    def test_write(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        keys = list(pds)
+        ids = IndexedDS(SqliteDS.load_papers(self.pds_path_tmp / "pds.sqlite"),
+                        self.index_path, fields=("year", "authorId"))
+        ids[keys[0]] = pds[keys[0]]
+        ids.set_many((k, pds[k]) for k in keys[1:])
+        assert set(ids) == set(pds)
+        assert ids.find(authorId="144794037") == set(pds)
+        with pytest.raises(ValueError):
+            ids.find(doi="10.1056/nejmp2003762")
+
+        # postings are replaced when a paper is set again
+        p = pds[keys[0]].copy()
+        p.year = 1900
+        ids[keys[0]] = p
+        assert ids.find(year=1900) == {keys[0]}
+        assert ids.find(year=pds[keys[0]].year) == set()
+
+        del ids[keys[0]]
+        ids.delete_many(keys[1:2])
+        assert ids.find(authorId="144794037") == set(keys[2:])
+        assert ids.value_counts("year") == {pds[keys[2]].year: 1}
+
+        # indexes persist, and are rebuilt when fields change
+        ids = pickle.loads(pickle.dumps(ids))
+        assert ids.find(authorId="144794037") == set(keys[2:])
+        ids.close()
+        ids = IndexedDS(SqliteDS.load_papers(self.pds_path_tmp / "pds.sqlite"),
+                        self.index_path)
+        assert ids.find(doi=pds[keys[2]].doi.upper()) == {keys[2]}
+        ids.close()
@@ -1,9 +1,19 @@
 from pathlib import Path
+import os
 from unittest import TestCase
 import pytest
+from concurrent.futures import ProcessPoolExecutor
 from ..context import rm_tree, JsonDS
 
 
+def _write_copies(json_dir: Path, paper_path: Path, prefix: str, n: int):
+    paper = JsonDS.load_papers(paper_path.parent)[paper_path.stem]
+    pds = JsonDS.load_papers(json_dir, enforce_id=False, multi_writer=True)
+    for i in range(n):
+        pds[f"{prefix}{i}"] = paper
+    del pds[f"{prefix}0"]
+
+
 class TestJson(TestCase):
     def setUp(self):
         fixtures = Path("tests/fixtures/store/json")
@@ -92,4 +102,236 @@ class TestJson(TestCase):
                 ads_tmp[k] = invalid_value
         for invalid_key in [0, None]:
             with pytest.raises(TypeError):
-                _ = ads_tmp[invalid_key]
\ No newline at end of file
+                _ = ads_tmp[invalid_key]
+
+    def test_trusted(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        pds_trusted = JsonDS.load_papers(self.pds_path, trusted=True)
+        for k in pds:
+            p, p_trusted = pds[k], pds_trusted[k]
+            assert p == p_trusted
+            assert p.__fields_set__ == p_trusted.__fields_set__
+            assert [type(r) for r in p_trusted.citations] == \
+                [type(r) for r in p.citations]
+            assert p_trusted.obtained_utc == p.obtained_utc
+        ads_trusted = JsonDS.load_authors(self.ads_path, trusted=True)
+        for k in ads_trusted:
+            assert ads_trusted[k] == JsonDS.load_authors(self.ads_path)[k]
+
+    def test_manifest(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        # datastores that are only read don't create a manifest
+        assert not pds.manifest.exists()
+        pds_tmp = JsonDS.load_papers(self.pds_path_tmp)
+        for k, v in pds.items():
+            pds_tmp[k] = v
+        k = next(iter(pds))
+        del pds_tmp[k]
+        # keys are loaded from the manifest instead of listing the directory
+        (self.pds_path_tmp / f"{k}.json").write_text(pds[k].json())
+        assert set(pds_tmp) == set(pds) - {k}
+        assert pds_tmp.check_manifest() == {'missing': {k}, 'stale': set()}
+        pds_tmp.rebuild_manifest()
+        assert set(pds_tmp) == set(pds)
+        # manifests older than the directory are rebuilt when opened
+        del pds_tmp[k]
+        manifest = pds_tmp.manifest.path
+        st = manifest.stat()
+        os.utime(str(manifest), ns=(st.st_atime_ns, st.st_mtime_ns - 10**9))
+        (self.pds_path_tmp / f"{k}.json").write_text(pds[k].json())
+        pds_tmp = JsonDS.load_papers(self.pds_path_tmp)
+        assert set(pds_tmp) == set(pds)
+        assert pds_tmp.manifest.fresh()
+        assert set(JsonDS.load_papers(self.pds_path_tmp)) == set(pds)
+        assert pds_tmp.check_manifest() == {'missing': set(), 'stale': set()}
+        (self.pds_path_tmp / f"{k}.json").unlink()
+        assert pds_tmp.check_manifest() == {'missing': set(), 'stale': {k}}
+
+        # interrupted records are ignored and removed
+        with open(pds_tmp.manifest.path, 'a') as f:
+            f.write("+interrupted")
+        pds_tmp = JsonDS.load_papers(self.pds_path_tmp)
+        assert "interrupted" not in pds_tmp
+        assert pds_tmp.manifest.path.read_text().endswith("\n")
+
+        # superseded records are compacted
+        for _ in range(600):
+            pds_tmp.manifest.add(k)
+            pds_tmp.manifest.remove(k)
+        n_lines = len(pds_tmp.manifest.path.read_text().splitlines())
+        assert n_lines > 1200
+        pds_tmp = JsonDS.load_papers(self.pds_path_tmp)
+        n_lines = len(pds_tmp.manifest.path.read_text().splitlines())
+        assert n_lines == len(pds_tmp) == len(pds) - 1
+
+    def test_shard(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        pds_tmp = JsonDS.load_papers(self.pds_path_tmp, shard_depth=2)
+        for k, v in pds.items():
+            pds_tmp[k] = v
+        assert not list(self.pds_path_tmp.glob("*.json"))
+        assert len(list(self.pds_path_tmp.glob("??/??/*.json"))) == len(pds)
+
+        # the layout is saved and can only be changed by migrating
+        pds_tmp = JsonDS.load_papers(self.pds_path_tmp)
+        assert pds_tmp.shard_depth == 2
+        for k in pds:
+            assert pds_tmp[k] == pds[k]
+        with pytest.raises(ValueError):
+            JsonDS.load_papers(self.pds_path_tmp, shard_depth=0)
+
+        # migrate to a flat layout and back
+        pds_tmp.migrate(0)
+        assert len(list(self.pds_path_tmp.glob("*.json"))) == len(pds)
+        assert not [d for d in self.pds_path_tmp.iterdir() if d.is_dir()]
+        pds_tmp = JsonDS.load_papers(self.pds_path_tmp, shard_depth=0)
+        assert pds_tmp.check_manifest() == {'missing': set(), 'stale': set()}
+        pds_tmp.migrate(1)
+        assert len(list(self.pds_path_tmp.glob("??/*.json"))) == len(pds)
+        assert set(pds_tmp) == set(pds)
+        for k in pds:
+            assert pds_tmp[k] == pds[k]
+
+        # interrupted migrations are resumed
+        k = next(iter(pds))
+        pds_tmp._write_layout({'shard_depth': 2, 'migrating_from': 1})
+        src, dst = pds_tmp._path(k, 1), pds_tmp._path(k, 2)
+        dst.parent.mkdir(parents=True)
+        src.rename(dst)
+        pds_tmp = JsonDS.load_papers(self.pds_path_tmp)
+        assert pds_tmp.shard_depth == 2
+        assert pds_tmp.check_manifest() == {'missing': set(), 'stale': set()}
+        for k in pds:
+            assert pds_tmp[k] == pds[k]
+
+    def test_many(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        keys = list(pds)
+        pds_tmp = JsonDS.load_papers(self.pds_path_tmp, shard_depth=1,
+                                     fsync=True)
+        pds_tmp.set_many(pds.get_many(keys[:2]))
+        pds_tmp.set_many([(keys[2], pds[keys[2]]), (keys[2], pds[keys[2]])],
+                         batch_size=1)
+        assert set(pds_tmp) == set(keys)
+        assert pds_tmp.get_many(keys + ["missing"]) == pds.get_many(keys)
+        pds_tmp = JsonDS.load_papers(self.pds_path_tmp)
+        assert pds_tmp.check_manifest() == {'missing': set(), 'stale': set()}
+
+        # invalid batches are not written
+        p = pds[keys[0]]
+        p_modified = p.copy(update={'title': 'modified'})
+        with pytest.raises(KeyError):
+            pds_tmp.set_many({keys[0]: p_modified, keys[1]: p})
+        assert pds_tmp[keys[0]] == p
+        assert not list(self.pds_path_tmp.glob("**/*.tmp"))
+
+        pds_tmp.delete_many(keys[1:] + ["missing"])
+        assert set(pds_tmp) == {keys[0]}
+        pds_tmp = JsonDS.load_papers(self.pds_path_tmp)
+        assert pds_tmp.check_manifest() == {'missing': set(), 'stale': set()}
+        assert set(pds_tmp) == {keys[0]}
+
+    def test_multi_writer(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        keys = list(pds)
+        pds_a = JsonDS.load_papers(self.pds_path_tmp, multi_writer=True)
+        pds_b = JsonDS.load_papers(self.pds_path_tmp, multi_writer=True)
+        # keys set by one instance are observed by the other
+        pds_a[keys[0]] = pds[keys[0]]
+        assert keys[0] in pds_b
+        assert pds_b[keys[0]] == pds[keys[0]]
+        pds_b.set_many({k: pds[k] for k in keys[1:]})
+        assert len(pds_a) == len(keys)
+        assert set(pds_a) == set(keys)
+        del pds_a[keys[0]]
+        pds_b.delete_many(keys[1:2])
+        assert set(pds_b) == set(pds_a) == set(keys[2:])
+        # a key deleted by another instance and set again is recorded
+        pds_a[keys[0]] = pds[keys[0]]
+        del pds_b[keys[0]]
+        pds_a[keys[0]] = pds[keys[0]]
+        assert keys[0] in JsonDS.load_papers(self.pds_path_tmp)
+        # compaction by another instance
+        pds_b.manifest.write(pds_b.s2ids - {keys[0]})
+        pds_b.manifest.remove(keys[2])
+        assert set(pds_a) == set()
+
+        # long-running writers compact the manifest
+        small = type(pds[keys[0]])(paperId=keys[0])
+        for _ in range(600):
+            pds_a[keys[0]] = small
+            del pds_b[keys[0]]
+        n_lines = len(pds_a.manifest.path.read_text().splitlines())
+        assert n_lines <= 2 * len(pds_a) + 1024
+        assert keys[0] not in JsonDS.load_papers(self.pds_path_tmp)
+
+    def test_multi_process(self):
+        paper_path = next(self.pds_path.glob("*.json"))
+        n_procs, n = 4, 20
+        with ProcessPoolExecutor(n_procs) as executor:
+            futures = [executor.submit(_write_copies, self.pds_path_tmp,
+                                       paper_path, f"p{i}_", n)
+                       for i in range(n_procs)]
+            for f in futures:
+                f.result()
+        pds_tmp = JsonDS.load_papers(self.pds_path_tmp, enforce_id=False)
+        expected = {f"p{i}_{j}" for i in range(n_procs) for j in range(1, n)}
+        assert set(pds_tmp) == expected
+        assert pds_tmp.check_manifest() == {'missing': set(), 'stale': set()}
+
+    def test_projection(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        k = "a04fc380c61040c7ffa21375bf2a0c9d30b674a4"
+        p = pds[k]
+        fields = ["paperId", "year", "references.paperId"]
+        pp = pds.get(k, fields=fields)
+        assert (pp.paperId, pp.year) == (p.paperId, p.year)
+        assert [r.paperId for r in pp.references] == \
+            [r.paperId for r in p.references]
+        assert all(r.title is None for r in pp.references)
+        assert pp.title is None and pp.citations is None
+        assert pds.get("missing", fields=fields) is None
+        projected = dict(pds.project(["year"]))
+        assert {k: v.year for k, v in projected.items()} == \
+            {k: v.year for k, v in pds.items()}
+
+    def test_skeleton(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        keys = list(pds)
+        fields = ["paperId", "year", "references.paperId",
+                  "citations.paperId"]
+        pds_tmp = JsonDS.load_papers(self.pds_path_tmp, skeleton=fields)
+        pds_tmp[keys[0]] = pds[keys[0]]
+        pds_tmp.set_many((k, pds[k]) for k in keys[1:])
+        sidecars = sorted(self.pds_path_tmp.glob("*.skeleton"))
+        assert [f.stem for f in sidecars] == sorted(keys)
+        assert set(JsonDS.load_papers(self.pds_path_tmp)) == set(keys)
+
+        # covered projections are read from sidecars
+        for f in sidecars:
+            (self.pds_path_tmp / f"{f.stem}.json").write_text("corrupted")
+        projected = dict(pds_tmp.project(["year", "citations.paperId"]))
+        assert {k: v.year for k, v in projected.items()} == \
+            {k: pds[k].year for k in keys}
+        assert [c.paperId for c in projected[keys[0]].citations] == \
+            [c.paperId for c in pds[keys[0]].citations]
+        with pytest.raises(ValueError):
+            pds_tmp.get(keys[0], fields=["title"])
+        pds_tmp.set_many(pds)
+
+        # sidecars are removed with their objects, and moved when migrating
+        del pds_tmp[keys[0]]
+        pds_tmp.delete_many(keys[1:2])
+        assert [f.stem for f in self.pds_path_tmp.glob("*.skeleton")] == \
+            keys[2:]
+        pds_tmp.migrate(1)
+        assert [f.stem for f in self.pds_path_tmp.glob("*/*.skeleton")] == \
+            keys[2:]
+
+        # skeleton fields are saved with the datastore
+        pds_tmp = JsonDS.load_papers(self.pds_path_tmp)
+        assert pds_tmp.skeleton == fields
+        pds_tmp = JsonDS.load_papers(self.pds_path_tmp, skeleton=[])
+        assert pds_tmp.skeleton is None
+        assert not list(self.pds_path_tmp.glob("**/*.skeleton"))
+        assert pds_tmp.get(keys[2], fields=["year"]).year == pds[keys[2]].year
@@ -0,0 +1,145 @@
+from pathlib import Path
+from unittest import TestCase
+import pickle
+import pytest
+from ..context import rm_tree, JsonDS, LogDS
+
+
+class TestLog(TestCase):
+    def setUp(self):
+        fixtures = Path("tests/fixtures/store")
+        self.pds_path = fixtures / "json" / "s2papers"
+        self.ads_path = fixtures / "json" / "s2authors"
+        self.log_dir_tmp = fixtures / "log_tmp"
+        assert self.pds_path.exists()
+        assert self.ads_path.exists()
+        assert not self.log_dir_tmp.exists()
+        self.addCleanup(lambda: rm_tree(self.log_dir_tmp))
+
+    def test_pds(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        pds_tmp = LogDS.load_papers(self.log_dir_tmp)
+        assert len(pds_tmp) == 0
+
+        # copy values into temp pds; testing iter, set, and get methods
+        for k, v in pds.items():
+            pds_tmp[k] = v
+        assert len(pds_tmp) == len(pds) == 3
+        for k in pds_tmp.keys():
+            assert k in pds_tmp
+            assert pds[k] == pds_tmp[k]
+
+        # values persist across instances
+        pds_tmp.close()
+        pds_tmp = LogDS.load_papers(self.log_dir_tmp)
+        assert set(pds_tmp) == set(pds)
+        for k in pds:
+            assert pds[k] == pds_tmp[k]
+
+        # delete key and check for keyerrors
+        p = pds_tmp.pop(k)
+        assert k not in pds_tmp
+        assert len(pds_tmp) == 2
+        with pytest.raises(KeyError):
+            _ = pds_tmp[k]
+        with pytest.raises(KeyError):
+            del pds_tmp[k]
+
+        # enforce_id behavior
+        with pytest.raises(KeyError):
+            wrong_key = k[:-1]
+            pds_tmp[wrong_key] = p
+
+        # check for type errors
+        for invalid_value in [k, 0, None, p.dict(), p.json()]:
+            with pytest.raises(TypeError):
+                pds_tmp[k] = invalid_value
+        for invalid_key in [0, None]:
+            with pytest.raises(TypeError):
+                _ = pds_tmp[invalid_key]
+
+    def test_ads(self):
+        ads = JsonDS.load_authors(self.ads_path)
+        with LogDS.load_authors(self.log_dir_tmp) as ads_tmp:
+            for k, v in ads.items():
+                ads_tmp[k] = v
+        ads_tmp = LogDS.load_authors(self.log_dir_tmp, trusted=True)
+        assert set(ads_tmp) == set(ads)
+        for k in ads:
+            assert ads_tmp[k] == ads[k]
+
+    def test_recovery(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        keys = list(pds)
+        pds_tmp = LogDS.load_papers(self.log_dir_tmp)
+        pds_tmp[keys[0]] = pds[keys[0]]
+        pds_tmp.flush()
+        # records appended after the index was saved are replayed
+        pds_tmp[keys[1]] = pds[keys[1]]
+        pds_tmp[keys[2]] = pds[keys[2]]
+        del pds_tmp[keys[0]]
+        pds_tmp.sync()
+        segment = pds_tmp._segment_path(pds_tmp._active)
+        # simulate a crash while appending a record
+        with open(segment, 'ab') as f:
+            f.write(b'{"k": "interrupted", "n": 1000}\n{"paperId"')
+        del pds_tmp
+        pds_tmp = LogDS.load_papers(self.log_dir_tmp)
+        assert set(pds_tmp) == set(keys[1:])
+        for k in keys[1:]:
+            assert pds_tmp[k] == pds[k]
+        # the interrupted record is truncated before appending new records
+        pds_tmp[keys[0]] = pds[keys[0]]
+        pds_tmp.close()
+        (self.log_dir_tmp / LogDS.INDEX).unlink()
+        pds_tmp = LogDS.load_papers(self.log_dir_tmp)
+        assert set(pds_tmp) == set(keys)
+        # pickling saves the index (e.g. when saving a graph builder)
+        pds_pickled = pickle.loads(pickle.dumps(pds_tmp))
+        assert set(pds_pickled) == set(keys)
+
+    def test_compact(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        keys = list(pds)
+        pds_tmp = LogDS.load_papers(self.log_dir_tmp, segment_size=1,
+                                    max_garbage=None)
+        for _ in range(3):
+            for k in keys:
+                pds_tmp[k] = pds[k]
+        del pds_tmp[keys[0]]
+        segments = list(self.log_dir_tmp.glob("*.jsonl"))
+        assert len(segments) > len(keys)
+        assert pds_tmp.garbage > 0.5
+        pds_tmp.compact()
+        assert pds_tmp.garbage == 0
+        # one segment per live object, plus the empty active segment
+        n_segments = len(list(self.log_dir_tmp.glob("*.jsonl")))
+        assert n_segments == len(keys) - 1 + 1
+        assert not set(self.log_dir_tmp.glob("*.jsonl")) & set(segments)
+        for k in keys[1:]:
+            assert pds_tmp[k] == pds[k]
+        pds_tmp.close()
+        pds_tmp = LogDS.load_papers(self.log_dir_tmp)
+        assert set(pds_tmp) == set(keys[1:])
+
+        # compaction happens automatically when starting new segments
+        pds_tmp = LogDS.load_papers(self.log_dir_tmp, segment_size=1,
+                                    max_garbage=0.5)
+        for _ in range(3):
+            for k in keys[1:]:
+                pds_tmp[k] = pds[k]
+        assert pds_tmp.garbage <= 0.5
+        for k in keys[1:]:
+            assert pds_tmp[k] == pds[k]
+
+    def test_many(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        keys = list(pds)
+        pds_tmp = LogDS.load_papers(self.log_dir_tmp)
+        pds_tmp.set_many(pds)
+        assert pds_tmp.get_many(keys + ["missing"]) == pds.get_many(keys)
+        fields = ["year", "references.paperId"]
+        assert pds_tmp.get_many(keys, fields=fields) == \
+            pds.get_many(keys, fields=fields)
+        pds_tmp.delete_many(keys[:2] + ["missing"])
+        assert set(pds_tmp) == set(keys[2:])
@@ -0,0 +1,121 @@
+from pathlib import Path
+from unittest import TestCase
+import pickle
+import sqlite3
+import pytest
+from ..context import rm_tree, JsonDS, SqliteDS
+
+
+class TestSqlite(TestCase):
+    def setUp(self):
+        fixtures = Path("tests/fixtures/store")
+        self.pds_path = fixtures / "json" / "s2papers"
+        self.ads_path = fixtures / "json" / "s2authors"
+        self.db_dir_tmp = fixtures / "sqlite_tmp"
+        self.db_path_tmp = self.db_dir_tmp / "s2.sqlite"
+        assert self.pds_path.exists()
+        assert self.ads_path.exists()
+        assert not self.db_dir_tmp.exists()
+        self.addCleanup(lambda: rm_tree(self.db_dir_tmp))
+
+    def test_pds(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        pds_tmp = SqliteDS.load_papers(self.db_path_tmp)
+        assert pds_tmp.db_path.exists()
+        assert len(pds_tmp) == 0
+
+        # copy values into temp pds; testing iter, set, and get methods
+        for k, v in pds.items():
+            pds_tmp[k] = v
+        assert len(pds_tmp) == len(pds) == 3
+        for k in pds_tmp.keys():
+            assert k in pds_tmp
+            assert pds[k] == pds_tmp[k]
+
+        # values persist across instances
+        pds_tmp.close()
+        pds_tmp = SqliteDS.load_papers(self.db_path_tmp)
+        assert set(pds_tmp) == set(pds)
+
+        # delete key and check for keyerrors
+        p = pds_tmp.pop(k)
+        assert k not in pds_tmp
+        assert len(pds_tmp) == 2
+        with pytest.raises(KeyError):
+            _ = pds_tmp[k]
+        with pytest.raises(KeyError):
+            del pds_tmp[k]
+
+        # enforce_id behavior
+        with pytest.raises(KeyError):
+            wrong_key = k[:-1]
+            pds_tmp[wrong_key] = p
+
+        # check for type errors
+        for invalid_value in [k, 0, None, p.dict(), p.json()]:
+            with pytest.raises(TypeError):
+                pds_tmp[k] = invalid_value
+        for invalid_key in [0, None]:
+            with pytest.raises(TypeError):
+                _ = pds_tmp[invalid_key]
+
+    def test_ads(self):
+        ads = JsonDS.load_authors(self.ads_path)
+        pds = JsonDS.load_papers(self.pds_path)
+        # authors and papers can share a database
+        with SqliteDS.load_authors(self.db_path_tmp) as ads_tmp, \
+                SqliteDS.load_papers(self.db_path_tmp) as pds_tmp:
+            for k, v in ads.items():
+                ads_tmp[k] = v
+            for k, v in pds.items():
+                pds_tmp[k] = v
+            assert set(ads_tmp) == set(ads)
+            assert set(pds_tmp) == set(pds)
+            for k in ads:
+                assert ads_tmp[k] == ads[k]
+        ads_trusted = SqliteDS.load_authors(self.db_path_tmp, trusted=True)
+        for k in ads:
+            assert ads_trusted[k] == ads[k]
+
+    def test_batch(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        pds_tmp = SqliteDS.load_papers(self.db_path_tmp, batch_size=2)
+
+        def n_written():
+            conn = sqlite3.connect(str(self.db_path_tmp))
+            try:
+                return conn.execute("SELECT COUNT(*) FROM s2paper").fetchone()[0]
+            finally:
+                conn.close()
+
+        keys = list(pds)
+        pds_tmp[keys[0]] = pds[keys[0]]
+        # pending objects are visible from the datastore but not yet written
+        assert keys[0] in pds_tmp
+        assert pds_tmp[keys[0]] == pds[keys[0]]
+        assert n_written() == 0
+        pds_tmp[keys[1]] = pds[keys[1]]
+        assert n_written() == 2
+        pds_tmp[keys[2]] = pds[keys[2]]
+        assert n_written() == 2
+        # pickling writes pending objects (e.g. when saving a graph builder)
+        pds_pickled = pickle.loads(pickle.dumps(pds_tmp))
+        assert n_written() == 3
+        assert set(pds_pickled) == set(pds)
+        pds_tmp[keys[2]] = pds[keys[2]]
+        del pds_tmp
+        assert n_written() == 3
+
+    def test_many(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        keys = list(pds)
+        pds_tmp = SqliteDS.load_papers(self.db_path_tmp, batch_size=2)
+        pds_tmp.set_many(pds.items())
+        assert pds_tmp.get_many(keys + ["missing"]) == pds.get_many(keys)
+        fields = ["year", "references.paperId"]
+        assert pds_tmp.get_many(keys, fields=fields) == \
+            pds.get_many(keys, fields=fields)
+        pds_tmp[keys[0]] = pds[keys[0]]
+        assert pds_tmp.get_many(keys[:1]) == pds.get_many(keys[:1])
+        pds_tmp.delete_many(keys[:2] + ["missing"])
+        assert set(pds_tmp) == set(keys[2:])
@@ -0,0 +1,111 @@
+from unittest import TestCase, mock
+from pathlib import Path
+import asyncio
+import json
+import pytest
+from .context import api
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from s2 import aio
+from s2.retry import RetryPolicy
+
+
+def load_cassette_routes():
+    """ Serve the responses recorded in the betamax cassettes. """
+    routes = {}
+    for f in Path('tests/fixtures/cassettes').glob('*.json'):
+        for i in json.loads(f.read_text())['http_interactions']:
+            path = i['request']['uri'].replace(api.API_URL, '')
+            routes.setdefault(path, []).append(i['response'])
+    return routes
+
+
+class TestAio(TestCase):
+    def setUp(self):
+        self.paperId = "c4e3be316ce0d5dfc9ec7b19298e9483484cc252"
+        self.paperId_404 = 'paper'
+        self.authorId = "144794037"
+        self.authorId_404 = 'author'
+        self.rate_limited = set()
+        self.unavailable = set()
+        self.routes = load_cassette_routes()
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    async def handler(self, request):
+        if request.path in self.unavailable:
+            self.unavailable.remove(request.path)
+            return web.Response(status=503, headers={'Retry-After': '0'})
+        responses = self.routes[request.path]
+        if request.path in self.rate_limited:
+            responses = [r for r in responses if r['status']['code'] == 429]
+        else:
+            responses = [r for r in responses if r['status']['code'] != 429]
+        r = responses[0]
+        return web.Response(status=r['status']['code'],
+                            body=r['body']['string'],
+                            content_type='application/json')
+
+    def run_with_server(self, coro_fn):
+        async def run():
+            app = web.Application()
+            app.router.add_get('/{endpoint}/{s2id}', self.handler)
+            async with TestServer(app) as server:
+                url = str(server.make_url('')).rstrip('/')
+                with mock.patch.object(api, 'API_URL', url):
+                    return await coro_fn()
+        return self.loop.run_until_complete(run())
+
+    def test_get_paper(self):
+        p = self.run_with_server(lambda: aio.get_paper(self.paperId))
+        assert p.paperId == self.paperId
+        p = self.run_with_server(lambda: aio.get_paper(self.paperId,
+                                                       return_json=True))
+        assert p['paperId'] == self.paperId
+
+    def test_get_author(self):
+        a = self.run_with_server(lambda: aio.get_author(self.authorId))
+        assert a.authorId == self.authorId
+
+    def test_get_paper_with_404(self):
+        with pytest.raises(aiohttp.ClientResponseError):
+            self.run_with_server(lambda: aio.get_paper(self.paperId_404))
+
+    def test_get_paper_with_429(self):
+        self.rate_limited.add(f'/paper/{self.paperId}')
+        with pytest.raises(aiohttp.ClientResponseError):
+            self.run_with_server(lambda: aio.get_paper(self.paperId, wait=0,
+                                                       retries=1))
+
+    def test_get_paper_with_503(self):
+        self.unavailable.add(f'/paper/{self.paperId}')
+        p = self.run_with_server(
+            lambda: aio.get_paper(self.paperId, retry=RetryPolicy(wait=0)))
+        assert p.paperId == self.paperId
+
+    def test_get_papers(self):
+        paperIds = [self.paperId, self.paperId_404] * 3
+
+        async def collect():
+            return [r async for r in aio.get_papers(paperIds, concurrency=2)]
+
+        results = self.run_with_server(collect)
+        assert len(results) == len(paperIds)
+        for pid, p in results:
+            if pid == self.paperId:
+                assert p.paperId == self.paperId
+            else:
+                assert isinstance(p, aiohttp.ClientResponseError)
+
+    def test_get_authors(self):
+        authorIds = [self.authorId, self.authorId_404]
+
+        async def collect():
+            return dict([r async for r in aio.get_authors(authorIds)])
+
+        results = self.run_with_server(collect)
+        assert results[self.authorId].authorId == self.authorId
+        assert isinstance(results[self.authorId_404],
+                          aiohttp.ClientResponseError)
@@ -1,9 +1,15 @@
 from betamax import Betamax
 from requests import Session
 from requests.exceptions import HTTPError
-from unittest import TestCase
+from unittest import TestCase, mock
+from concurrent.futures import ThreadPoolExecutor
+import json
+import threading
+import time
 import pytest
-from .context import api
+from .context import api, models
+from s2.ratelimit import RateLimiter
+from s2.retry import RetryPolicy
 
 
 with Betamax.configure() as config:
@@ -25,6 +31,61 @@ class TestApi(TestCase):
             p = api.get_paper(self.paperId, session=self.session)
             assert p.paperId == self.paperId
 
+    def test_get_paper_with_rate_limiter(self):
+        limiter = RateLimiter(rate=1, period=1)
+        with Betamax(self.session).use_cassette('paper'):
+            p = api.get_paper(self.paperId, session=self.session,
+                              rate_limiter=limiter)
+            assert p.paperId == self.paperId
+        # the token was consumed by the request
+        assert limiter.reserve() > 0
+
+    def test_get_paper_with_lazy(self):
+        with Betamax(self.session).use_cassette('paper'):
+            p = api.get_paper(self.paperId, session=self.session, lazy=True)
+        with Betamax(self.session).use_cassette('paper'):
+            p2 = api.get_paper(self.paperId, session=self.session)
+        assert isinstance(p.citations, models.LazyReferences)
+        pids = p.citations.paperIds()
+        assert pids == [r.paperId for r in p2.citations]
+        p.obtained_utc = p2.obtained_utc
+        assert p == p2 and p.json() == p2.json()
+        assert p.citations[-1] == p2.citations[-1]
+        assert p.citations[:2] == p2.citations[:2]
+        assert list(reversed(p.references)) == list(reversed(p2.references))
+        assert p2.references[0] in p.references
+        assert p.references.pop() == p2.references[-1]
+
+    def test_lazy_references_methods(self):
+        # methods inherited from list validate all references first
+        with Betamax(self.session).use_cassette('paper'):
+            d = api.get_paper(self.paperId, session=self.session,
+                              return_json=True)
+        p = models.lazy_paper(d)
+        p2 = models.S2Paper(**d)
+        p.citations.sort(key=lambda r: r.paperId or "")
+        p2.citations.sort(key=lambda r: r.paperId or "")
+        assert p.citations == p2.citations
+        p, p2 = models.lazy_paper(d), models.S2Paper(**d)
+        assert (p.citations + [])[0] == p2.citations[0]
+        assert ([] + p.references) == p2.references
+        assert p.citations * 2 == p2.citations * 2
+        p = models.lazy_paper(d)
+        ref = p2.references[-1]
+        assert p.references.index(ref) == len(p2.references) - 1
+        assert p.references.count(ref) == 1
+        p.references.remove(ref)
+        assert ref not in p.references
+
+    def test_get_paper_with_trusted(self):
+        with Betamax(self.session).use_cassette('paper'):
+            p = api.get_paper(self.paperId, session=self.session, trusted=True)
+        with Betamax(self.session).use_cassette('paper'):
+            p2 = api.get_paper(self.paperId, session=self.session)
+        p.obtained_utc = p2.obtained_utc
+        assert p == p2
+        assert isinstance(p.citations[0], models.S2Reference)
+
     def test_get_paper_with_return_json(self):
         with Betamax(self.session).use_cassette('paper'):
             p = api.get_paper(self.paperId, session=self.session,
@@ -42,6 +103,25 @@ class TestApi(TestCase):
                 api.get_paper(self.paperId, session=self.session,
                               wait=0, retries=1)
 
+    def test_get_paper_with_503(self):
+        with Betamax(self.session).use_cassette('paper_503'):
+            p = api.get_paper(self.paperId, session=self.session,
+                              retry=RetryPolicy(wait=0))
+            assert p.paperId == self.paperId
+        with Betamax(self.session).use_cassette('paper_503'):
+            with pytest.raises(HTTPError):
+                api.get_paper(self.paperId, session=self.session,
+                              retry=RetryPolicy(statuses=[429]))
+
+    def test_get_paper_with_503_default_retry(self):
+        # transient errors aren't retried after the rate limit wait
+        with Betamax(self.session).use_cassette('paper_503'), \
+                mock.patch('time.sleep') as sleep:
+            p = api.get_paper(self.paperId, session=self.session)
+            assert p.paperId == self.paperId
+        (wait_s,), _ = sleep.call_args
+        assert 0 < wait_s <= 1
+
     def test_get_author(self):
         with Betamax(self.session).use_cassette('author'):
             a = api.get_author(self.authorId, session=self.session)
@@ -64,6 +144,126 @@ class TestApi(TestCase):
                 api.get_author(self.authorId, session=self.session,
                                wait=0, retries=1)
 
+    def test_get_papers(self):
+        paperIds = [self.paperId, self.paperId_404]
+        with Betamax(self.session).use_cassette('papers'):
+            results = dict(api.get_papers(paperIds, session=self.session))
+        assert set(results) == set(paperIds)
+        assert results[self.paperId].paperId == self.paperId
+        assert isinstance(results[self.paperId_404], HTTPError)
+
+    def test_get_authors(self):
+        authorIds = [self.authorId, self.authorId_404]
+        with Betamax(self.session).use_cassette('authors'):
+            results = dict(api.get_authors(authorIds, session=self.session,
+                                           return_json=True))
+        assert set(results) == set(authorIds)
+        assert results[self.authorId]['authorId'] == self.authorId
+        assert isinstance(results[self.authorId_404], HTTPError)
+
+    def test_get_papers_closes_client(self):
+        # batches without a session close their connection pool when done
+        def get(url, **kwargs):
+            r = mock.Mock(ok=True, status_code=200)
+            r.content = json.dumps({'paperId': url.rsplit('/', 1)[-1]})
+            return r
+
+        paperIds = [str(i) for i in range(20)]
+        with mock.patch.object(Session, 'get', side_effect=get), \
+                mock.patch.object(api.S2Client, 'close') as close:
+            results = dict(api.get_papers(paperIds, max_workers=2))
+            assert set(results) == set(paperIds)
+            assert close.call_count == 1
+            results = api.get_authors(paperIds, max_workers=2)
+            next(results)
+            assert close.call_count == 1
+            results.close()
+            assert close.call_count == 2
+            # sessions passed by the caller aren't closed
+            dict(api.get_papers(paperIds, session=self.session))
+            assert close.call_count == 2
+
+    def test_client(self):
+        client = api.S2Client(session=self.session, retry=RetryPolicy(wait=0))
+        with Betamax(self.session).use_cassette('paper_503'):
+            p = client.get_paper(self.paperId)
+            assert p.paperId == self.paperId
+        with Betamax(self.session).use_cassette('authors'):
+            results = dict(client.get_authors([self.authorId,
+                                               self.authorId_404]))
+            assert results[self.authorId].authorId == self.authorId
+            assert isinstance(results[self.authorId_404], HTTPError)
+        # default client has a connection pool and is reused
+        assert api.default_client() is api.default_client()
+        with api.S2Client(pool_maxsize=16) as client:
+            adapter = client.session.get_adapter(api.API_URL)
+            assert adapter._pool_maxsize == 16
+
+    def test_client_with_api_key(self):
+        # api key is sent with the request without modifying the session
+        client = api.S2Client(api_key='123', session=self.session)
+        with mock.patch.object(self.session, 'get') as get:
+            get.return_value.ok = True
+            get.return_value.content = json.dumps({'paperId': self.paperId})
+            client.get_paper(self.paperId)
+            client.get_paper(self.paperId, api_key='456')
+        (url,), kwargs = get.call_args_list[0]
+        assert url == api.build_url(self.paperId, 'paper', partner=True)
+        assert kwargs['headers']['x-api-key'] == '123'
+        (url,), kwargs = get.call_args_list[1]
+        assert kwargs['headers']['x-api-key'] == '456'
+        assert 'x-api-key' not in self.session.headers
+
+    def test_client_single_flight(self):
+        client = api.S2Client(session=self.session, api_key='123')
+        release = threading.Event()
+
+        def get(url, **kwargs):
+            release.wait(5)
+            r = mock.Mock(ok=True, status_code=200)
+            r.content = json.dumps({'paperId': self.paperId})
+            return r
+
+        with mock.patch.object(self.session, 'get', side_effect=get) as m:
+            with ThreadPoolExecutor(5) as executor:
+                futures = [executor.submit(client.get_paper, self.paperId)
+                           for _ in range(4)]
+                # requests with another api key aren't coalesced
+                futures.append(executor.submit(
+                    client.get_paper, self.paperId, api_key='456'))
+                while client.single_flight.coalesced < 3 or \
+                        client.single_flight.calls < 2:
+                    time.sleep(0.01)
+                release.set()
+                papers = [f.result() for f in futures]
+        assert m.call_count == 2
+        assert client.single_flight.calls == 2
+        assert all(p.paperId == self.paperId for p in papers)
+
+    def test_single_flight_copies(self):
+        single_flight = api.SingleFlight()
+        release = threading.Event()
+
+        def fn():
+            release.wait(5)
+            return {'paperId': self.paperId, 'authors': []}
+
+        with ThreadPoolExecutor(3) as executor:
+            leader = executor.submit(single_flight.do, 'k', fn)
+            while single_flight.calls < 1:
+                time.sleep(0.01)
+            followers = [executor.submit(single_flight.do, 'k', fn)
+                         for _ in range(2)]
+            while single_flight.coalesced < 2:
+                time.sleep(0.01)
+            release.set()
+            # the leader's caller mutates its result while followers copy it
+            leader.result()['authors'].extend(range(10000))
+            results = [f.result() for f in followers]
+        assert all(r == {'paperId': self.paperId, 'authors': []}
+                   for r in results)
+        assert results[0] is not results[1]
+
     def test_build_url(self):
         # public paper endpoint
         url = api.build_url(self.paperId, 'paper')
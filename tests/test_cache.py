@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import TestCase, mock
+from betamax import Betamax
+from requests import Session
+from .context import api, rm_tree
+from s2.cache import ResponseCache
+
+with Betamax.configure() as config:
+    config.cassette_library_dir = 'tests/fixtures/cassettes'
+
+
+class TestCache(TestCase):
+    def setUp(self):
+        self.cache_dir = Path('tests/fixtures/tmp_cache')
+        assert not self.cache_dir.exists()
+        self.addCleanup(lambda: rm_tree(self.cache_dir))
+        self.session = Session()
+        self.paperId = "c4e3be316ce0d5dfc9ec7b19298e9483484cc252"
+
+    def test_cache(self):
+        cache = ResponseCache(self.cache_dir, ttl=60)
+        url = api.build_url(self.paperId)
+        assert cache.get(url) is None
+        cache.set(url, None, b'{"paperId": "a"}', etag='"1"')
+        entry = cache.get(url)
+        assert entry.fresh and entry.json()['paperId'] == 'a'
+        assert entry.conditional_headers() == {'If-None-Match': '"1"'}
+        # params are part of the key
+        params = dict(include_unknown_references=True)
+        assert cache.get(url, params) is None
+        # entries are stale after ttl
+        old = datetime.utcnow() - timedelta(seconds=120)
+        cache.set(url, params, b'{"paperId": "b"}', obtained_utc=old)
+        entry = cache.get(url, params)
+        assert not entry.fresh
+        assert entry.json()['obtained_utc'].replace(microsecond=0) == \
+            old.replace(microsecond=0)
+        assert cache.refresh(url, params, entry).fresh
+        assert cache.get(url, params).fresh
+        # reloading the cache keeps entries; exceeding max_size evicts the
+        # least recently used entry (url without params)
+        size = cache.size
+        cache = ResponseCache(self.cache_dir, ttl=60, max_size=size + 50)
+        assert len(cache) == 2 and cache.size == size
+        cache.get(url)
+        cache.set(url + "2", None, b'{}')
+        assert len(cache) == 2 and cache.size <= size + 50
+        assert cache.get(url, params) is None
+        assert cache.get(url) is not None
+        cache.clear()
+        assert len(cache) == 0 and cache.get(url) is None
+
+    def test_get_paper_with_cache(self):
+        cache = ResponseCache(self.cache_dir)
+        with Betamax(self.session).use_cassette('paper'):
+            p = api.get_paper(self.paperId, session=self.session, cache=cache)
+        # cached response is returned without a request
+        with mock.patch.object(self.session, 'get') as get:
+            p2 = api.get_paper(self.paperId, session=self.session, cache=cache)
+            assert not get.called
+        assert p == p2
+        # stale response is revalidated with a conditional request
+        cache.ttl = timedelta(0)
+        cache.set(api.build_url(self.paperId), None,
+                  cache.get(api.build_url(self.paperId)).body, etag='"1"',
+                  obtained_utc=datetime(2020, 1, 1))
+        with mock.patch.object(self.session, 'get') as get:
+            get.return_value.status_code = 304
+            p3 = api.get_paper(self.paperId, session=self.session, cache=cache)
+            (url,), kwargs = get.call_args
+            assert kwargs['headers']['If-None-Match'] == '"1"'
+        assert p3.paperId == self.paperId
+        assert p3.obtained_utc > datetime(2020, 1, 1)
@@ -0,0 +1,75 @@
+from datetime import datetime
+from pathlib import Path
+from unittest import TestCase
+import pytest
+from .context import rm_tree, JsonDS
+from s2 import codec
+from s2.codec import CODECS, StdlibCodec, get_codec, set_codec
+
+
+def available_codecs():
+    codecs = []
+    for name, cls in CODECS.items():
+        try:
+            codecs.append(cls())
+        except ImportError:
+            pass
+    return codecs
+
+
+class TestCodec(TestCase):
+    def setUp(self):
+        fixtures = Path("tests/fixtures/store/json")
+        self.pds_path = fixtures / "s2papers"
+        self.pds_path_tmp = fixtures / "s2papers_codec_tmp"
+        assert not self.pds_path_tmp.exists()
+        self.addCleanup(lambda: rm_tree(self.pds_path_tmp))
+        self.addCleanup(set_codec, get_codec())
+
+    def test_roundtrip(self):
+        obj = {'title': "Graphes — café/α", 'year': 2020, 'fields': None,
+               'obtained_utc': datetime(2021, 1, 2, 3, 4, 5, 678)}
+        expected = dict(obj, obtained_utc='2021-01-02T03:04:05.000678')
+        for c in available_codecs():
+            s = c.dumps(obj)
+            assert isinstance(s, bytes)
+            for c2 in available_codecs():
+                assert c2.loads(s) == expected
+                assert c2.loads(s.decode('utf-8')) == expected
+
+    def test_model(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        k = next(iter(pds))
+        p = pds[k]
+        p.obtained_utc = datetime.utcnow()
+        for c in available_codecs():
+            assert type(p)(**c.loads(c.dumps_model(p))) == p
+            assert c.loads(c.dumps_model(p)) == codec.loads(p.json())
+
+    def test_set_codec(self):
+        previous = set_codec('json')
+        assert isinstance(get_codec(), StdlibCodec)
+        assert set_codec(previous).name == 'json'
+        assert get_codec() is previous
+        # auto prefers orjson, then ujson, then the standard library
+        names = [c.name for c in available_codecs()]
+        set_codec('auto')
+        assert get_codec().name == min(
+            names, key=['orjson', 'ujson', 'json'].index)
+        with pytest.raises(ValueError):
+            set_codec('yaml')
+        # codecs must implement loads and dumps
+        with pytest.raises(TypeError):
+            set_codec(codec.JsonCodec())
+
+    def test_store_across_codecs(self):
+        pds = JsonDS.load_papers(self.pds_path)
+        for c in available_codecs():
+            set_codec(c)
+            pds_tmp = JsonDS.load_papers(self.pds_path_tmp)
+            for k, v in pds.items():
+                pds_tmp[k] = v
+            for c2 in available_codecs():
+                set_codec(c2)
+                for k in pds:
+                    assert pds_tmp[k] == pds[k]
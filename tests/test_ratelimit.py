@@ -0,0 +1,39 @@
+from pathlib import Path
+from unittest import TestCase
+import pickle
+import pytest
+from .context import rm_tree
+from s2.ratelimit import RateLimiter, FileRateLimiter
+
+
+class TestRateLimit(TestCase):
+    def setUp(self):
+        self.path = Path('tests/fixtures/tmp_ratelimit')
+        assert not self.path.exists()
+        self.addCleanup(lambda: rm_tree(self.path))
+
+    def test_rate_limiter(self):
+        with pytest.raises(ValueError):
+            RateLimiter(rate=0)
+        limiter = RateLimiter(rate=100, period=300, burst=2)
+        # burst tokens are available immediately, then requests are spaced
+        # by period / rate seconds in order of reservation
+        assert limiter.reserve() == 0
+        assert limiter.reserve() == 0
+        assert limiter.reserve() == pytest.approx(3, abs=0.01)
+        assert limiter.reserve() == pytest.approx(6, abs=0.01)
+        # state survives pickling (e.g. in saved S2GraphBuilder.api_kwargs)
+        limiter = pickle.loads(pickle.dumps(limiter))
+        assert limiter.reserve() == pytest.approx(9, abs=0.01)
+        # acquire waits for the reserved token
+        RateLimiter(rate=1000, period=1).acquire()
+
+    def test_file_rate_limiter(self):
+        # two limiters on the same file (e.g. in two processes) share tokens
+        limiter1 = FileRateLimiter(self.path, rate=100, period=300)
+        limiter2 = FileRateLimiter(self.path, rate=100, period=300)
+        assert limiter1.reserve() == 0
+        assert limiter2.reserve() == pytest.approx(3, abs=0.01)
+        assert limiter1.reserve() == pytest.approx(6, abs=0.01)
+        limiter2 = pickle.loads(pickle.dumps(limiter2))
+        assert limiter2.reserve() == pytest.approx(9, abs=0.01)
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest import TestCase
+import pytest
+from s2.retry import RetryPolicy, parse_retry_after
+
+
+class TestRetry(TestCase):
+    def test_get_wait(self):
+        retry = RetryPolicy(wait=1, backoff=2, max_wait=5, jitter=0)
+        assert [retry.get_wait(i) for i in range(4)] == [1, 2, 4, 5]
+        # Retry-After is a lower bound on the wait
+        assert retry.get_wait(0, '30') == 30
+        assert retry.get_wait(3, '1') == 5
+        # jitter only ever shortens the wait
+        retry = RetryPolicy(wait=10, backoff=1, jitter=0.5)
+        for _ in range(100):
+            assert 5 <= retry.get_wait(0) <= 10
+        # get_paper(retries=2, wait=150) only waits 150s on rate limits
+        retry = RetryPolicy(retries=2, rate_limit_wait=150, jitter=0)
+        assert retry.get_wait(0, status=429) == \
+            retry.get_wait(1, status=403) == 150
+        assert retry.get_wait(0, '300', 429) == 300
+        assert retry.get_wait(0, status=503) == 1
+        assert retry.get_wait(1) == 2
+
+    def test_give_up(self):
+        retry = RetryPolicy(retries=2, max_elapsed=10)
+        assert not retry.give_up(0, 0, 1)
+        assert not retry.give_up(1, 0, 1)
+        assert retry.give_up(2, 0, 1)
+        assert retry.give_up(0, 8, 5)
+
+    def test_retry_status(self):
+        retry = RetryPolicy()
+        for status in [403, 429, 500, 502, 503, 504]:
+            assert retry.retry_status(status)
+        for status in [400, 404]:
+            assert not retry.retry_status(status)
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after('120') == 120
+        assert parse_retry_after('-1') == 0
+        assert parse_retry_after('not a date') == 0
+        date = datetime.now(timezone.utc) + timedelta(seconds=60)
+        assert parse_retry_after(format_datetime(date, usegmt=True)) == \
+            pytest.approx(60, abs=2)